@@ -0,0 +1,172 @@
+#AXOBOTL benchmark suite
+# Runs the routines and the primitives they're made of in the simulator and
+# compares cycle time, loop jitter and bus traffic against a stored baseline,
+# so a change that slows something down shows up before we get to the field.
+#
+#     python sim/bench.py                     # everything, compared to the baseline
+#     python sim/bench.py goTurn goCurve      # just these
+#     python sim/bench.py --save              # accept the current numbers as the baseline
+#
+# The simulator is deterministic (fixed seed, virtual clock), so any change in
+# virtual time, shots or bus operations comes from the code. Wall time depends
+# on the laptop and is only reported. Exits with 1 if anything regressed.
+
+import json
+import math
+import os
+import sys
+import time
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+if SIM_DIR not in sys.path: sys.path.insert(0, SIM_DIR)
+
+import simrun
+import vex
+
+BASELINE = os.path.join(SIM_DIR, "bench_baseline.json")
+
+# Each case: (setup, measured part). Only the measured part counts.
+CASES = {
+    "runNearGoal": (None, lambda auto: auto.runNearGoal()),
+    "autoLoop": (None, lambda auto: auto.autoLoop()),
+    "windCat": (None, lambda auto: auto.windCat()),
+    "releaseCat": (lambda auto: auto.windCat(), lambda auto: auto.releaseCat()),
+    "goStraight": (None, lambda auto: auto.goStraight(20, 50, 5)),
+    "goTurn": (None, lambda auto: auto.goTurn(40, 90)),
+    "goCurve": (None, lambda auto: auto.goCurve(30, 50, 1.0)),
+    # From START_POSE, like the "goto" and "path" routine steps
+    "goTo": (None, lambda auto: auto.goTo(800.0, 900.0, 50)),
+    "goPath": (None, lambda auto: auto.goPath(((250.0, 400.0), (400.0, 800.0), (800.0, 1000.0)), 50)),
+}
+
+# Simulator seconds a case gets before it counts as timed out. nearGoal runs
+# every autoLoop in its table, which takes well over a match.
+DEADLINE = 60.0
+DEADLINES = {"runNearGoal": 150.0}
+
+# What counts as worse: (metric, higher is worse, allowed relative change, allowed absolute change)
+LIMITS = (
+    ("virtual", True, 0.05, 0.05),
+    ("reads", True, 0.10, 50),
+    ("writes", True, 0.10, 10),
+    ("periodJitterMs", True, 0.25, 0.2),
+    ("periodWorstMs", True, 0.25, 1.0),
+    ("shots", False, 0.0, 0),
+    ("scores", False, 0.0, 0),
+)
+
+def periodStats(stamps):
+    # Mean, standard deviation and worst of the gaps between ticks (ms)
+    gaps = [(b - a) * 1000.0 for a, b in zip(stamps, stamps[1:])]
+    if not gaps: return 0.0, 0.0, 0.0
+    mean = sum(gaps) / len(gaps)
+    jitter = math.sqrt(sum((g - mean) ** 2 for g in gaps) / len(gaps))
+    return mean, jitter, max(gaps)
+
+def runCase(name: str, deadline: float = None):
+    setup, body = CASES[name]
+    deadline = deadline or DEADLINES.get(name, DEADLINE)
+    auto = simrun.loadAuto()
+    sim = vex.sim
+    stamps = []
+    tick = auto.scheduler.tick
+    def timedTick():
+        stamps.append(sim.now)
+        tick()
+    auto.scheduler.tick = timedTick
+    marks = {}
+    def routine():
+        if setup: setup(auto)
+        marks["start"] = (sim.now, sim.reads, sim.writes, sim.field.shots, sim.field.scores, len(stamps))
+        body(auto)
+        marks["end"] = sim.now
+    wallStart = time.perf_counter()
+    timedOut = False
+    try:
+        sim.run(routine, deadline)
+    except vex.SimTimeout:
+        timedOut = True
+    wall = time.perf_counter() - wallStart
+    start, reads, writes, shots, scores, firstTick = marks["start"]
+    end = marks.get("end", sim.now)
+    mean, jitter, worst = periodStats(stamps[firstTick:])
+    shots = sim.field.shots - shots
+    scores = sim.field.scores - scores
+    virtual = end - start
+    return {
+        "virtual": round(virtual, 3),
+        "wall": round(wall, 3),
+        "timedOut": timedOut,
+        "shots": shots,
+        "scores": scores,
+        "secondsPerShot": round(virtual / shots, 3) if shots else None,
+        "secondsPerScore": round(virtual / scores, 3) if scores else None,
+        "periodMeanMs": round(mean, 3),
+        "periodJitterMs": round(jitter, 3),
+        "periodWorstMs": round(worst, 3),
+        "reads": sim.reads - reads,
+        "writes": sim.writes - writes,
+    }
+
+def regressions(result, baseline):
+    # (metric, baseline, now) for everything that got worse than LIMITS allow.
+    # A case that ran out of time didn't finish, so its numbers mean nothing.
+    worse = []
+    if result["timedOut"]: worse.append(("timedOut", baseline.get("timedOut", False), True))
+    for metric, higherIsWorse, relative, absolute in LIMITS:
+        if metric not in baseline: continue
+        old, new = baseline[metric], result[metric]
+        change = new - old if higherIsWorse else old - new
+        if change > max(abs(old) * relative, absolute): worse.append((metric, old, new))
+    return worse
+
+def loadBaseline(path: str = BASELINE):
+    if not os.path.exists(path): return {}
+    with open(path) as f:
+        return json.load(f)
+
+def saveBaseline(results, path: str = BASELINE):
+    # Wall time isn't comparable between machines, so it isn't kept
+    kept = {name: {k: v for k, v in r.items() if k != "wall"} for name, r in results.items()}
+    with open(path, "w") as f:
+        json.dump(kept, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def formatResult(name: str, r) -> str:
+    perShot = "{:.2f}s/shot".format(r["secondsPerShot"]) if r["secondsPerShot"] else "-"
+    return ("{:12s} {:7.2f}s virtual {:6.3f}s wall {:>10s}  tick {:5.2f}ms +-{:4.2f} worst {:5.2f}  "
+            "reads {:6d} writes {:5d}{}".format(
+                name, r["virtual"], r["wall"], perShot, r["periodMeanMs"], r["periodJitterMs"],
+                r["periodWorstMs"], r["reads"], r["writes"], "  TIMED OUT" if r["timedOut"] else ""))
+
+def main(argv):
+    path = BASELINE
+    if "--baseline" in argv:
+        i = argv.index("--baseline")
+        path = argv[i + 1]
+        argv = argv[:i] + argv[i + 2:]
+    names = [a for a in argv if not a.startswith("--")] or list(CASES)
+    unknown = [n for n in names if n not in CASES]
+    if unknown:
+        print("unknown case(s): {}; choose from {}".format(", ".join(unknown), ", ".join(CASES)))
+        return 2
+    baseline = loadBaseline(path)
+    results = {}
+    failed = False
+    for name in names:
+        r = runCase(name)
+        results[name] = r
+        print(formatResult(name, r))
+        if name not in baseline: continue
+        for metric, old, new in regressions(r, baseline[name]):
+            print("  REGRESSION {}: {} -> {}".format(metric, old, new))
+            failed = True
+    if "--save" in argv:
+        saveBaseline(dict(baseline, **results), path)
+        print("saved baseline to {}".format(path))
+        return 0
+    if not baseline: print("no baseline yet: run with --save to keep these numbers")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,391 @@
+#AXOBOTL match planner
+# Searches for the order to collect balls, visit switches and shoot that
+# scores the most in a match, using how long each primitive takes in the
+# simulator, and prints the best as a routine table for src/auto.py.
+#
+#     python sim/plan.py                      # search, print the plan and its table
+#     python sim/plan.py --check              # ...then run the table in the simulator
+#     python sim/plan.py --width 400 --speed 80 --switch-points 2
+#
+# Durations come from running DriveStraight, TurnTo, windCat, FireCat,
+# releaseCat and the intake in the simulator first, fitting time against
+# distance and angle for the moves.
+# Field positions (balls, goal, switches, start) come from SimConfig.
+#
+# A plan is a list of blocks, each one table block in the routine:
+#   ball N     intake on (which rewinds the catapult if it needs it) while
+#              turning to the ball and driving over it
+#   switch N   drive so the front of the robot reaches the switch
+#   shoot      drive into range of the goal if we aren't, then shoot every ball
+#              we hold; the rewind after the last shot overlaps the next block
+# The search is a beam search: each round extends every plan in the beam by
+# every block that still fits in the match, keeps the most promising, and
+# remembers the best finished plan. Each first block is searched on its own
+# core. The simulator doesn't score switches; --switch-points says what
+# visiting one is worth here (nothing by default).
+
+import concurrent.futures
+import math
+import os
+import sys
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+if SIM_DIR not in sys.path: sys.path.insert(0, SIM_DIR)
+
+import simrun
+import vex
+
+MATCH_SECS = 60.0
+MM_PER_INCH = 25.4
+SETTLE_MS = 100           # Once the arm is down, for a waiting ball to drop into the basket (as autoLoop does)
+PICKUP_PAST_MM = 40.0     # Drive the intake this far past the ball's centre
+SHOOT_RANGE = 0.9         # Shoot from this fraction of the goal range, to be sure
+MIN_TURN_DEG = 2.0        # Smaller heading changes are left to the straight's yaw hold
+PICKUPS_PER_RUN = 2       # The ball handler stops the intake once one ball is loaded and the next is at the mouth
+HELD_WORTH = 0.9          # How much a ball we hold counts towards a plan's promise
+DEADLINE_SLACK = 1.5      # Step deadlines: this much over the predicted time...
+DEADLINE_EXTRA_MS = 500   # ...plus this
+
+# Durations measured in the simulator
+
+def fitLine(xs, ys):
+    # Least squares y = a + b*x
+    n = float(len(xs))
+    mx, my = sum(xs) / n, sum(ys) / n
+    sxx = sum((x - mx) ** 2 for x in xs)
+    b = sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / sxx if sxx else 0.0
+    return my - b * mx, b
+
+def timed(setup, body):
+    # Seconds of virtual time body takes, in a fresh simulator
+    auto = simrun.loadAuto()
+    marks = []
+    def routine():
+        if setup: setup(auto)
+        marks.append(vex.sim.now)
+        body(auto)
+        marks.append(vex.sim.now)
+    vex.sim.run(routine, 30.0)
+    return marks[1] - marks[0]
+
+def measureDurations(speed: float, turnSpeed: float):
+    inches = (6, 12, 24, 36, 48)
+    drive = [timed(None, lambda auto, d=d: auto.runCommand(auto.DriveStraight(d, speed))) for d in inches]
+    degrees = (20, 45, 90, 135, 180)
+    turn = [timed(None, lambda auto, a=a: auto.runCommand(auto.TurnTo(turnSpeed, a, relative=True)))
+            for a in degrees]
+    wound = lambda auto: auto.windCat()
+    def atMouth(auto):
+        auto.windCat()
+        vex.sim.field.path = [0.0]  # One ball just picked up
+    def feed(auto):
+        auto.startIntake()
+        vex.sim.waitFor(lambda: vex.sim.field.path[-1] >= vex.sim.config.topEyeZone)
+    return {
+        "speed": speed,
+        "turnSpeed": turnSpeed,
+        "drive": fitLine([d * MM_PER_INCH for d in inches], drive),  # Seconds = a + b*mm
+        "turn": fitLine(degrees, turn),                             # Seconds = a + b*degrees
+        "wind": timed(lambda auto: (auto.windCat(), auto.runCommand(auto.FireCat())), wound),
+        "fire": timed(wound, lambda auto: auto.runCommand(auto.FireCat())),
+        "release": timed(wound, lambda auto: auto.releaseCat()),
+        "feed": timed(atMouth, feed),  # Intake mouth to the basket
+    }
+
+def driveSecs(durations, mm: float) -> float:
+    a, b = durations["drive"]
+    return a + b * mm if mm > 0.0 else 0.0
+
+def reloadSecs(durations) -> float:
+    # The intake stops while the basket is full, so after a shot the next ball may
+    # be anywhere from the mouth up. Firing before it reaches the basket throws nothing.
+    return durations["feed"] + SETTLE_MS / 1000.0
+
+def turnSecs(durations, degrees: float) -> float:
+    a, b = durations["turn"]
+    return a + b * abs(degrees) if abs(degrees) >= MIN_TURN_DEG else 0.0
+
+# The field, as far as planning goes
+
+def fieldFromConfig(config: vex.SimConfig, switchPoints: float = 0.0):
+    # Balls queue down the path from the basket; one more fits while the first is at the mouth
+    capacity = 0
+    while 1.0 - capacity * config.ballSpacing >= 0.0: capacity += 1
+    return {
+        "start": config.startPose,
+        "balls": tuple(config.balls),
+        "goal": config.goal,
+        "range": config.goalRangeMM * SHOOT_RANGE,
+        "switches": tuple(config.switches),
+        "reach": config.intakeReachMM,
+        "pickupRadius": config.pickupRadiusMM,
+        "capacity": capacity,
+        "preload": config.preloadBalls,
+        "switchPoints": switchPoints,
+    }
+
+def wrap(degrees: float) -> float:
+    return (degrees + 180.0) % 360.0 - 180.0
+
+def bearing(x: float, y: float, tx: float, ty: float) -> float:
+    # Field heading from (x, y) to (tx, ty): 0 is +y, 90 is +x
+    return math.degrees(math.atan2(tx - x, ty - y))
+
+# A plan state is a tuple, so the search can keep thousands of them cheaply:
+# (time, x, y, heading, ballsLeft, switchesLeft, held, readyAt, cockedAt, points, blocks)
+# ballsLeft/switchesLeft are bit masks; readyAt is when the first ball we hold
+# can be in the basket, cockedAt when the catapult is wound (inf if it isn't).
+
+T, X, Y, HEADING, BALLS, SWITCHES, HELD, READY, COCKED, POINTS, BLOCKS = range(11)
+NEVER = math.inf
+
+def startState(field):
+    x, y, heading = field["start"]
+    # Preloads sit behind the unwound arm
+    return (0.0, x, y, heading, (1 << len(field["balls"])) - 1, (1 << len(field["switches"])) - 1,
+            field["preload"], 0.0, NEVER, 0.0, ())
+
+def moveLegs(durations, x, y, heading, tx, ty, stopShort: float, forwardOnly: bool):
+    # Turn towards (tx, ty), then drive to stopShort before it; backwards if that turns less
+    distance = math.hypot(tx - x, ty - y) - stopShort
+    if distance <= 0.0: return None
+    toward = bearing(x, y, tx, ty)
+    sign = 1.0
+    turn = wrap(toward - heading)
+    if not forwardOnly and abs(wrap(toward + 180.0 - heading)) < abs(turn):
+        turn = wrap(toward + 180.0 - heading)
+        sign = -1.0
+    legHeading = wrap(heading + turn)
+    nx = x + math.sin(math.radians(toward)) * distance
+    ny = y + math.cos(math.radians(toward)) * distance
+    return (turn, legHeading, distance, sign, nx, ny)
+
+def swept(field, x, y, nx, ny, balls):
+    # Balls left on the field that the intake mouth passes over going from (x, y) to (nx, ny)
+    length = math.hypot(nx - x, ny - y)
+    if length == 0.0: return []
+    ux, uy = (nx - x) / length, (ny - y) / length
+    reach = field["reach"]
+    hits = []
+    for i, (bx, by) in enumerate(field["balls"]):
+        if not balls & (1 << i): continue
+        along = (bx - x) * ux + (by - y) * uy - reach
+        across = abs((bx - x) * uy - (by - y) * ux)
+        if -field["pickupRadius"] <= along <= length and across <= field["pickupRadius"]:
+            hits.append((along, i))
+    return [i for _, i in sorted(hits)]
+
+def moveBlock(field, durations, state, kind: str, index: int, tx, ty, stopShort, forwardOnly):
+    # Moves to a target with the catapult rewinding alongside; None if it doesn't fit
+    legs = moveLegs(durations, state[X], state[Y], state[HEADING], tx, ty, stopShort, forwardOnly)
+    if legs is None: return None
+    turn, legHeading, distance, sign, nx, ny = legs
+    start = state[T]
+    turnTime = turnSecs(durations, turn)
+    legEnd = start + turnTime + driveSecs(durations, distance)
+    cockedAt = state[COCKED] if state[COCKED] != NEVER else start + durations["wind"]
+    end = max(legEnd, cockedAt)  # The next block waits for the rewind too
+    if end > MATCH_SECS: return None
+    held, readyAt = state[HELD], state[READY]
+    balls, switches, points = state[BALLS], state[SWITCHES], state[POINTS]
+    picked = []
+    if sign > 0.0:
+        # Driving forward with the intake on picks up whatever the mouth passes over
+        others = balls & ~(1 << index) if kind == "ball" else balls
+        picked = swept(field, state[X], state[Y], nx, ny, others)
+    if kind == "ball": picked.append(index)
+    for n, i in enumerate(picked):
+        if held >= field["capacity"] or n >= PICKUPS_PER_RUN:
+            if kind == "ball": return None  # Full before we get to the one we came for
+            break
+        balls &= ~(1 << i)
+        if held == 0: readyAt = legEnd + durations["feed"]
+        held += 1
+    if kind == "switch":
+        switches &= ~(1 << index)
+        points += field["switchPoints"]
+    block = (kind, index, start, end, turn if turnTime else None, legHeading, distance, sign,
+             state[COCKED] == NEVER, turnTime, legEnd - start - turnTime)
+    return (end, nx, ny, legHeading, balls, switches, held, readyAt, cockedAt, points,
+            state[BLOCKS] + (block,))
+
+def shootBlock(field, durations, state):
+    # Shoots everything we hold from here; None if the last shot misses the buzzer
+    start = state[T]
+    held = state[HELD]
+    windTime = 0.0
+    cockedAt = state[COCKED]
+    if cockedAt == NEVER:
+        windTime = durations["wind"]
+        cockedAt = start + windTime
+    # The first ball drops into the basket once it's here and the arm is down
+    first = max(start, state[READY], cockedAt + SETTLE_MS / 1000.0)
+    waitTime = first - start - windTime
+    end = first + (held - 1) * (durations["release"] + reloadSecs(durations)) + durations["fire"]
+    if end > MATCH_SECS: return None
+    block = ("shoot", held, start, end, windTime, waitTime)
+    return (end, state[X], state[Y], state[HEADING], state[BALLS], state[SWITCHES], 0, NEVER, NEVER,
+            state[POINTS] + held, state[BLOCKS] + (block,))
+
+def expand(field, durations, state):
+    children = []
+    if state[HELD] < field["capacity"]:
+        for i, (bx, by) in enumerate(field["balls"]):
+            if state[BALLS] & (1 << i):
+                child = moveBlock(field, durations, state, "ball", i, bx, by,
+                                  field["reach"] - PICKUP_PAST_MM, True)
+                if child: children.append(child)
+    for i, (sx, sy) in enumerate(field["switches"]):
+        if state[SWITCHES] & (1 << i) and field["switchPoints"] > 0:
+            child = moveBlock(field, durations, state, "switch", i, sx, sy, field["reach"], False)
+            if child: children.append(child)
+    if state[HELD] > 0:
+        gx, gy = field["goal"]
+        there = state
+        if math.hypot(gx - state[X], gy - state[Y]) > field["range"]:
+            there = moveBlock(field, durations, state, "goal", 0, gx, gy, field["range"], False)
+        child = shootBlock(field, durations, there) if there else None
+        if child: children.append(child)
+    return children
+
+def promise(state) -> float:
+    # Points (and nearly-points) per second so far: what the beam keeps
+    return (state[POINTS] + HELD_WORTH * state[HELD]) / (state[T] + 1.0)
+
+def better(a, b) -> bool:
+    return a[POINTS] > b[POINTS] or (a[POINTS] == b[POINTS] and a[T] < b[T])
+
+def stateKey(state):
+    # Plans that got to the same place with the same things done: keep the earliest
+    return (state[BALLS], state[SWITCHES], state[HELD], state[COCKED] == NEVER,
+            round(state[X] / 50.0), round(state[Y] / 50.0), round(state[HEADING] / 10.0))
+
+def beamSearch(field, durations, state, width: int):
+    best = state
+    beam = [state]
+    while beam:
+        earliest = {}
+        for s in beam:
+            for child in expand(field, durations, s):
+                key = stateKey(child)
+                if key not in earliest or child[T] < earliest[key][T]: earliest[key] = child
+        children = list(earliest.values())
+        for child in children:
+            if better(child, best): best = child
+        children.sort(key=lambda s: (-promise(s), s[T]))
+        beam = children[:width]
+    return best
+
+def plan(field, durations, width: int = 200, workers: int = None):
+    # Each first block gets its own beam search, spread over the cores
+    root = startState(field)
+    firsts = expand(field, durations, root)
+    best = root
+    workers = workers or os.cpu_count() or 1
+    with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+        futures = [pool.submit(beamSearch, field, durations, first, width) for first in firsts]
+        for future in futures:
+            result = future.result()
+            if better(result, best): best = result
+    return best
+
+# Output: the plan as a routine table
+
+def deadlineMs(seconds: float) -> int:
+    return int(round((seconds * DEADLINE_SLACK * 1000.0 + DEADLINE_EXTRA_MS) / 100.0)) * 100
+
+def routineRows(best, durations):
+    # (start, action, args, deadlineMs) rows, start as a name: "THEN", "NEXT" or "WITH"
+    rows = []
+    turnSpeed, speed = durations["turnSpeed"], durations["speed"]
+    for block in best[BLOCKS]:
+        if block[0] == "shoot":
+            _, held, start, end, windTime, waitTime = block
+            if windTime: rows.append(("THEN", "intake", (), 0))
+            if waitTime >= 0.05: rows.append(("THEN", "wait", (int(round(waitTime * 1000.0)),), 0))
+            for _ in range(held - 1):
+                rows.append(("THEN", "release", (), 0))
+                rows.append(("THEN", "intake", (), 0))
+                rows.append(("THEN", "wait", (int(round(reloadSecs(durations) * 1000.0)),), 0))
+            rows.append(("THEN", "fire", (), 0))
+            continue
+        kind, index, start, end, turn, heading, distance, sign, winds, turnTime, driveTime = block
+        first = len(rows)
+        # The intake feeds what we hold up to the basket, and rewinds the catapult if it needs it
+        if kind == "ball" or winds: rows.append(("THEN", "intake", (), 0))
+        if turn is not None:
+            rows.append(("WITH" if len(rows) > first else "THEN", "turn", (turnSpeed, round(heading, 1)),
+                         deadlineMs(turnTime)))
+        rows.append(("NEXT" if turn is not None else ("WITH" if len(rows) > first else "THEN"), "straight",
+                     (round(distance / MM_PER_INCH, 1), sign * speed, round(heading, 1)),
+                     deadlineMs(driveTime)))
+    if best[BLOCKS] and best[BLOCKS][-1][0] == "shoot": rows.append(("THEN", "wind", (), 0))
+    return rows
+
+def describe(block) -> str:
+    if block[0] == "shoot":
+        _, held, start, end, windTime, waitTime = block
+        return "{:5.2f}-{:5.2f}s shoot {} ball{}{}".format(start, end, held, "s" if held > 1 else "",
+                                                           ", waiting {:.2f}s".format(waitTime) if waitTime >= 0.05 else "")
+    kind, index, start, end, turn, heading, distance, sign, winds, turnTime, driveTime = block
+    what = kind if kind == "goal" else "{} {}".format(kind, index)
+    return "{:5.2f}-{:5.2f}s {:9s} turn {:6.1f}, {} {:5.1f}in{}".format(
+        start, end, what, turn or 0.0, "forward" if sign > 0 else "back", distance / MM_PER_INCH,
+        ", rewinding" if winds else "")
+
+def formatTable(rows, name: str = "PLANNED") -> str:
+    lines = ["{} = (".format(name)]
+    for start, action, args, deadline in rows:
+        lines.append("    ({}, \"{}\", {}, {}),".format(start, action, repr(tuple(args)), deadline))
+    lines.append(")")
+    return "\n".join(lines)
+
+def check(rows):
+    # Runs the table in the simulator: (seconds, shots, scores, timed out)
+    auto = simrun.loadAuto()
+    steps = tuple((getattr(auto, start), action, args, deadline) for start, action, args, deadline in rows)
+    routine = auto.loadRoutine("planned", steps)
+    timedOut = False
+    try:
+        vex.sim.run(lambda: auto.runCommand(routine), MATCH_SECS)
+    except vex.SimTimeout:
+        timedOut = True
+    return vex.sim.now, vex.sim.field.shots, vex.sim.field.scores, timedOut
+
+def main(argv):
+    options = {"--width": "200", "--speed": "65", "--turn-speed": "40", "--switch-points": "0",
+               "--workers": None}
+    i = 0
+    while i < len(argv):
+        if argv[i] in options:
+            options[argv[i]] = argv[i + 1]
+            i += 2
+        elif argv[i] == "--check":
+            i += 1
+        else:
+            print("usage: plan.py [--width N] [--speed PCT] [--turn-speed PCT] [--switch-points P] "
+                  "[--workers N] [--check]")
+            return 2
+    durations = measureDurations(float(options["--speed"]), float(options["--turn-speed"]))
+    a, b = durations["drive"]
+    print("measured: drive {:.2f}s + {:.2f}s/m, turn {:.2f}s + {:.2f}s/90deg, wind {:.2f}s, "
+          "fire {:.2f}s, release {:.2f}s, feed {:.2f}s".format(
+              a, b * 1000.0, durations["turn"][0], durations["turn"][1] * 90.0,
+              durations["wind"], durations["fire"], durations["release"], durations["feed"]))
+    field = fieldFromConfig(vex.SimConfig(), float(options["--switch-points"]))
+    workers = int(options["--workers"]) if options["--workers"] else None
+    best = plan(field, durations, int(options["--width"]), workers)
+    for block in best[BLOCKS]:
+        print("  " + describe(block))
+    print("{:.0f} points in {:.2f}s ({:.3f} points/s)".format(best[POINTS], best[T],
+                                                             best[POINTS] / best[T] if best[T] else 0.0))
+    rows = routineRows(best, durations)
+    print(formatTable(rows))
+    if "--check" in argv:
+        seconds, shots, scores, timedOut = check(rows)
+        print("simulator: {:.2f}s, {} shots, {} scored{}".format(seconds, shots, scores,
+                                                                "  TIMED OUT" if timedOut else ""))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,509 @@
+#AXOBOTL trace replay
+# When TRACE_TELEMETRY is on, auto.py writes every goStraight/goTurn/goCurve as a
+# #TRACE block on the console. This reads those traces and replays them on the
+# PC with NumPy, so a controller change can be checked against hundreds of
+# recorded moves in seconds instead of another session on the field.
+#
+#     python sim/replay.py record traces.npz runNearGoal autoLoop --vary 20
+#     python sim/replay.py record traces.npz --log console.txt
+#     python sim/replay.py check traces.npz
+#     python sim/replay.py sweep traces.npz goStraight kP=1,2,3 adjust=0.3,0.55,0.8
+#
+# record: run routines in the simulator (or read a robot console log) and save
+#   the traces. --vary N repeats each routine with a jittered simulator.
+# check: feed each trace's recorded inputs through today's controller and
+#   report where the commands differ from what was recorded.
+# sweep: fit a simple drivetrain model to the traces, then drive every trace's
+#   move in closed loop with each combination of gains. Reports time to
+#   target, overshoot and final error.
+#
+# Needs numpy (host only, the robot never imports this).
+
+import contextlib
+import io
+import itertools
+import os
+import random
+import sys
+
+import numpy as np
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+if SIM_DIR not in sys.path: sys.path.insert(0, SIM_DIR)
+
+import simrun
+import vex
+
+# One recorded move: data is rows x fields (the first field is "ms").
+# dropped counts the samples from the start of the move that the robot's
+# buffer had already overwritten when it was written out.
+class Trace:
+    def __init__(self, name: str, fields, params, data, dropped: int = 0):
+        self.name = name
+        self.fields = tuple(fields)
+        self.params = np.asarray(params, dtype=np.float64)
+        self.data = np.asarray(data, dtype=np.float64).reshape(-1, len(self.fields))
+        self.dropped = dropped
+
+    def column(self, field: str):
+        return self.data[:, self.fields.index(field)]
+
+    def __len__(self):
+        return self.data.shape[0]
+
+def parseTraces(lines):
+    traces = []
+    header = None
+    rows = []
+    for line in lines:
+        line = line.strip()
+        if line.startswith("#TRACE"):
+            header = line.split(" ")
+            rows = []
+        elif line == "#END" and header is not None:
+            name, fields = header[1], header[2].split(",")
+            params = [float(p) for p in header[4].split(",") if p] if len(header) > 4 else []
+            # Logs from before the header had the recorded count can't tell
+            recorded = int(header[5]) if len(header) > 5 else int(header[3])
+            data = np.frombuffer(bytes.fromhex("".join(rows)), dtype="<f4")
+            traces.append(Trace(name, fields, params, data, max(recorded - int(header[3]), 0)))
+            header = None
+        elif header is not None:
+            rows.append(line)
+    return traces
+
+def saveTraces(traces, path: str):
+    arrays = {}
+    for i, t in enumerate(traces):
+        arrays["{}.meta".format(i)] = np.array([t.name, ",".join(t.fields), str(t.dropped)])
+        arrays["{}.params".format(i)] = t.params
+        arrays["{}.data".format(i)] = t.data.astype(np.float32)
+    np.savez_compressed(path, **arrays)
+
+def loadTraces(path: str):
+    traces = []
+    with np.load(path) as f:
+        for i in range(len(f.files) // 3):
+            meta = f["{}.meta".format(i)]
+            dropped = int(meta[2]) if len(meta) > 2 else 0
+            traces.append(Trace(str(meta[0]), str(meta[1]).split(","),
+                                f["{}.params".format(i)], f["{}.data".format(i)], dropped))
+    return traces
+
+def jitteredConfig(rng: random.Random):
+    # Same robot, slightly different carpet, battery and sensor
+    config = vex.SimConfig()
+    config.seed = rng.randrange(1 << 30)
+    config.driveTau *= rng.uniform(0.8, 1.25)
+    config.driveStaticPct *= rng.uniform(0.7, 1.3)
+    config.headingNoiseDeg *= rng.uniform(0.5, 2.0)
+    config.headingDriftDegPerSec = rng.uniform(-0.05, 0.05)
+    return config
+
+# The robot keeps 4 s of each move to save memory; here there's room for the
+# longest move a routine allows (a goto gets 9 s), so simulated traces are whole
+SIM_TRACE_SAMPLES = 1000
+
+def recordSim(routines, vary: int = 0, seed: int = 1, deadline: float = 60.0):
+    rng = random.Random(seed)
+    configs = [vex.SimConfig()] + [jitteredConfig(rng) for _ in range(vary)]
+    traces = []
+    for config in configs:
+        for name in routines:
+            auto = simrun.loadAuto(config)
+            auto.TRACE_TELEMETRY = True
+            for log in (auto.driveLog, auto.turnLog, auto.curveLog):
+                log.capacity = SIM_TRACE_SAMPLES  # Nothing recorded yet, so nothing allocated
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                try:
+                    vex.sim.run(getattr(auto, name), deadline)
+                except vex.SimTimeout:
+                    pass
+            traces += parseTraces(out.getvalue().splitlines())
+    return traces
+
+# The controllers, rewritten to work on whole arrays at once. They must match
+# the execute() methods in auto.py: check() is how we find out when they don't.
+
+def autoModule():
+    return sys.modules.get("auto") or simrun.loadAuto(startThreads=False)
+
+def profileTables(moves, periodMs: int):
+    # moves: (distance turns, max turns/s, accel, jerk) per batch entry.
+    # Returns position/velocity/acceleration tables padded with their last
+    # value (acceleration with 0), plus lengths.
+    auto = autoModule()
+    cache = {}
+    profiles = []
+    for move in moves:
+        key = tuple(float(m) for m in move)  # Exact: goto distances aren't round numbers
+        if key not in cache:
+            cache[key] = auto.MotionProfile(key[0], key[1], key[2], key[3], periodMs)
+        profiles.append(cache[key])
+    width = max(p.count for p in profiles)
+    position = np.zeros((len(profiles), width))
+    velocity = np.zeros((len(profiles), width))
+    acceleration = np.zeros((len(profiles), width))
+    counts = np.zeros(len(profiles), dtype=np.int64)
+    for b, p in enumerate(profiles):
+        n = p.count
+        position[b, :n] = p.position
+        position[b, n:] = p.position[n - 1]
+        velocity[b, :n] = p.velocity
+        acceleration[b, :n] = p.acceleration
+        counts[b] = n
+    return position, velocity, acceleration, counts
+
+def feedforward(side, turnsPerSec, acceleration, planned):
+    # auto.feedforward() over arrays: kS follows the planned velocity, or the
+    # planned acceleration from a standstill
+    ff = autoModule().DRIVE_FEEDFORWARD
+    percent = ff[side + 1] * turnsPerSec + ff[side + 2] * acceleration
+    direction = np.where(planned == 0.0, acceleration, planned)
+    return percent + np.sign(direction) * ff[side]
+
+def straightCommand(params, yawErr, turns, position, velocity, acceleration, direction, needed):
+    # DriveStraight.execute(); everything is an array over the batch
+    auto = autoModule()
+    adjustment = np.where(np.abs(yawErr) > params["deadband"], params["adjust"] * yawErr, 0.0)
+    arrived = np.abs(turns) >= needed
+    turnsPerSec = np.where(arrived, 0.0, direction * (velocity + params["kP"] * (position - np.abs(turns))))
+    acceleration = np.where(arrived, 0.0, direction * acceleration)
+    planned = np.where(arrived, 0.0, direction * velocity)
+    adjustment = np.where(arrived, 0.0, adjustment)
+    left = feedforward(auto.DRIVE_LEFT, turnsPerSec, acceleration, planned) - adjustment
+    right = feedforward(auto.DRIVE_RIGHT, turnsPerSec, acceleration, planned) + adjustment
+    return left, right, arrived
+
+def curveCommand(params, angleErr, revs, position, velocity, acceleration, lastCorrection, dt, direction, needed,
+                 finished):
+    # DriveCurve.execute(); finished = achieved revolutions or the profile has settled
+    auto = autoModule()
+    correction = np.clip(params["kP"] * angleErr, -params["angleSpeed"], params["angleSpeed"])
+    step = params["angleAccel"] * dt
+    correction = np.clip(correction, lastCorrection - step, lastCorrection + step)
+    finished = finished | (revs >= needed)
+    turnsPerSec = np.where(finished, 0.0, direction * (velocity + auto.DRIVE_KP * (position - revs)))
+    acceleration = np.where(finished, 0.0, direction * acceleration)
+    planned = np.where(finished, 0.0, direction * velocity)
+    leftBase = feedforward(auto.DRIVE_LEFT, turnsPerSec, acceleration, planned)
+    rightBase = feedforward(auto.DRIVE_RIGHT, turnsPerSec, acceleration, planned)
+    speed = (leftBase + rightBase) / 2.0
+    left = np.clip(leftBase - correction, -100.0, 100.0)
+    right = np.clip(rightBase + correction, -100.0, 100.0)
+    done = finished & (np.abs(angleErr) < params["tolerance"])
+    return left, right, correction, speed, done
+
+def turnCommand(params, error, position, velocity, acceleration, direction, distance):
+    # TurnTo.execute(); error is degrees to the target, distance the profile's
+    auto = autoModule()
+    behind = error - direction * (distance - position)  # Planned heading minus where we are
+    rate = direction * velocity + params["kP"] * behind
+    push = np.where(velocity == 0.0, error, direction * velocity)
+    push = np.where(np.abs(error) < params["settleDeg"] / 2.0, 0.0, push)
+    wheel = rate * auto.TURN_WHEEL_TURNS_PER_DEG
+    wheelAcceleration = direction * acceleration * auto.TURN_WHEEL_TURNS_PER_DEG
+    left = np.clip(feedforward(auto.DRIVE_LEFT, wheel, wheelAcceleration, push), -100.0, 100.0)
+    right = np.clip(feedforward(auto.DRIVE_RIGHT, -wheel, -wheelAcceleration, -push), -100.0, 100.0)
+    return left, right
+
+def straightDefaults(trace: Trace):
+    auto = autoModule()
+    turns, velocity, accel, jerk = trace.params[:4]
+    return {"kP": auto.DRIVE_KP, "adjust": auto.DRIVE_YAW_GAIN, "deadband": auto.DRIVE_YAW_DEADBAND,
+            "accel": accel, "jerk": jerk, "settleMs": auto.DRIVE_SETTLE_MS}
+
+def curveDefaults(trace: Trace):
+    auto = autoModule()
+    speed, revs, accel, angleSpeed, angleAccel, tolerance, kP, jerk = trace.params[:8]
+    return {"kP": kP, "angleSpeed": angleSpeed, "angleAccel": angleAccel, "tolerance": tolerance,
+            "accel": accel, "jerk": jerk, "settleMs": auto.DRIVE_SETTLE_MS}
+
+def turnDefaults(trace: Trace):
+    auto = autoModule()
+    delta, velocity, accel, jerk = trace.params[:4]
+    return {"kP": auto.TURN_KP, "accel": accel, "jerk": jerk, "settleDeg": auto.TURN_SETTLE_DEG,
+            "settleDps": auto.TURN_SETTLE_DPS, "settleMs": auto.TURN_SETTLE_MS}
+
+def turnDistance(trace: Trace):
+    # The turn its profile was planned for; traces from before that was
+    # logged only have the turn itself
+    return trace.params[4] if len(trace.params) > 4 else trace.params[0]
+
+DEFAULTS = {"goStraight": straightDefaults, "goCurve": curveDefaults, "goTurn": turnDefaults}
+
+def profileIndex(position, target):
+    # Which tick of the profile a recorded target came from. The trace holds
+    # it as float32, so look it up among float32 positions, or rounding up
+    # lands on the next tick (and the next tick's planned velocity).
+    return np.searchsorted(position.astype(np.float32), target.astype(np.float32))
+
+def check(traces, tolerance: float = 0.5):
+    # Replays recorded inputs open loop. Returns (trace, worst difference in percent)
+    # for every trace where today's controller commands something different,
+    # and how many traces it couldn't replay. The inputs were float32 on the
+    # robot too; tolerance covers what that rounding does to the commands.
+    auto = autoModule()
+    tickMs = auto.scheduler.tickMs
+    changed = []
+    skipped = 0
+    for t in traces:
+        if len(t) == 0 or t.name not in DEFAULTS:
+            skipped += 1
+            continue
+        p = {k: np.float64(v) for k, v in DEFAULTS[t.name](t).items()}
+        ms = t.column("ms")
+        if t.name == "goStraight":
+            turnsNeeded, velocity = t.params[0], t.params[1]
+            direction = 1.0 if velocity >= 0 else -1.0
+            maxSpeed = abs(velocity) * auto.DRIVE_TURNS_PER_SEC / 100.0
+            position, speed, accel, counts = profileTables([(turnsNeeded, maxSpeed, p["accel"], p["jerk"])],
+                                                           tickMs)
+            # The recorded target says exactly which tick of the profile was used
+            k = np.minimum(profileIndex(position[0], t.column("target")), counts[0] - 1)
+            turns = (t.column("left") + t.column("right")) / 2.0
+            left, right, _ = straightCommand(p, t.column("yawErr"), turns, position[0, k], speed[0, k],
+                                             accel[0, k], direction, turnsNeeded)
+            recorded = (t.column("vLeft"), t.column("vRight"))
+        elif t.name == "goTurn":
+            distance = turnDistance(t)
+            direction = 1.0 if distance >= 0 else -1.0
+            position, speed, accel, counts = profileTables(
+                [(distance, abs(t.params[1]) * auto.TURN_DEG_PER_SEC, p["accel"], p["jerk"])], tickMs)
+            # TurnTo picks its tick by time, and the log's clock starts with the move
+            k = np.minimum((ms // tickMs).astype(np.int64), counts[0] - 1)
+            left, right = turnCommand(p, t.column("error"), position[0, k], speed[0, k], accel[0, k],
+                                      direction, abs(distance))
+            recorded = (t.column("velocity"), right)  # Only the left wheel is logged
+        else:
+            targetSpeed, needed = t.params[0], t.params[1]
+            direction = 1.0 if targetSpeed >= 0 else -1.0
+            toTurns = auto.DRIVE_TURNS_PER_SEC / 100.0
+            position, speed, accel, counts = profileTables(
+                [(needed, abs(targetSpeed) * toTurns, p["accel"] * toTurns, p["jerk"] * toTurns)], tickMs)
+            k = np.minimum(profileIndex(position[0], t.column("target")), counts[0] - 1)
+            settled = ms - p["settleMs"] >= counts[0] * tickMs
+            lastCorrection = np.concatenate(([0.0], t.column("correction")[:-1]))
+            dt = np.diff(ms, prepend=ms[0] - tickMs) / 1000.0
+            left, right, _, _, _ = curveCommand(p, t.column("angleErr"), t.column("revs"), position[0, k],
+                                                speed[0, k], accel[0, k], lastCorrection, dt, direction,
+                                                needed, settled)
+            if "vLeft" in t.fields:
+                recorded = (t.column("vLeft"), t.column("vRight"))
+            else:  # Traces from before feedforward: same command on both sides
+                recorded = (t.column("speed") - t.column("correction"), t.column("speed") + t.column("correction"))
+        # Once the buffer wraps, the first row's previous tick is gone
+        first = 1 if t.dropped or ms[0] > 2 * tickMs else 0
+        worst = max(np.max(np.abs(left - recorded[0])[first:]), np.max(np.abs(right - recorded[1])[first:]))
+        if worst > tolerance: changed.append((t, worst))
+    return changed, skipped
+
+# Drivetrain model for closed-loop replay: two first-order channels, forward
+# (turns) and turning (degrees), each driven by a command in percent with a
+# static friction deadband: v' = a*v + b*max(|u| - deadband, 0)*sign(u)
+
+def channels(trace: Trace):
+    # (position, command) for the forward and turning channels; a turn in
+    # place has no forward channel
+    if trace.name == "goStraight":
+        vLeft, vRight = trace.column("vLeft"), trace.column("vRight")
+        forward = ((trace.column("left") + trace.column("right")) / 2.0, (vLeft + vRight) / 2.0)
+        turning = (np.unwrap(trace.column("yawErr"), period=360.0), (vLeft - vRight) / 2.0)
+    elif trace.name == "goCurve":
+        direction = 1.0 if trace.params[0] >= 0 else -1.0
+        forward = (direction * trace.column("revs"), trace.column("speed"))
+        turning = (trace.column("angleErr"), -trace.column("correction"))
+    elif trace.name == "goTurn":
+        forward = None
+        turning = (trace.column("rotation"), trace.column("velocity"))  # The right wheel mirrors the left
+    else:
+        return None
+    return forward, turning
+
+def deadzone(u, deadband):
+    return np.sign(u) * np.maximum(np.abs(u) - deadband, 0.0)
+
+def fitChannel(samples):
+    # Least squares for a and b at each deadband, keep the best fit
+    previous, speed, command = [np.concatenate(s) for s in zip(*samples)]
+    best = None
+    for deadband in np.arange(0.0, 15.0, 0.5):
+        A = np.column_stack((previous, deadzone(command, deadband)))
+        coeffs, residual, _, _ = np.linalg.lstsq(A, speed, rcond=None)
+        error = float(residual[0]) if len(residual) else float(np.sum((A @ coeffs - speed) ** 2))
+        if best is None or error < best[0]:
+            best = (error, float(np.clip(coeffs[0], 0.0, 0.999)), float(coeffs[1]), float(deadband))
+    return best[1:]
+
+def fitPlant(traces):
+    tickMs = autoModule().scheduler.tickMs
+    samples = ([], [])
+    for t in traces:
+        pair = channels(t)
+        if pair is None or len(t) < 4: continue
+        dt = np.maximum(np.diff(t.column("ms")), 1.0) / 1000.0
+        for n, channel in enumerate(pair):
+            if channel is None: continue
+            position, command = channel
+            speed = np.diff(position) / dt * (tickMs / 1000.0)  # Per tick
+            samples[n].append((speed[:-1], speed[1:], np.clip(command[1:-1], -100.0, 100.0)))
+    if not samples[1]: raise ValueError("no goStraight/goCurve/goTurn traces to fit")
+    # Turns alone say nothing about driving forward
+    return {"forward": fitChannel(samples[0]) if samples[0] else None, "turning": fitChannel(samples[1])}
+
+def grid(ranges):
+    # {"kP": [1, 2], "adjust": [0.5]} -> list of dicts, one per combination
+    names = list(ranges)
+    return [dict(zip(names, values)) for values in itertools.product(*(ranges[n] for n in names))]
+
+def simulate(name: str, traces, paramSets, plant, coastMs: int = 500):
+    # Drives every (trace, paramSet) pair at once. Returns per-pair arrays of
+    # timeMs (until the command finished), overshoot and error (turns, after
+    # coasting to a stop; degrees for goTurn) and final angle error (degrees),
+    # shaped [set, trace].
+    auto = autoModule()
+    tickMs = auto.scheduler.tickMs
+    dt = tickMs / 1000.0
+    # A truncated trace no longer starts where the move did
+    traces = [t for t in traces if t.name == name and len(t) > 0 and t.dropped == 0]
+    if not traces: raise ValueError("no {} traces".format(name))
+    rows = []
+    for params in paramSets:
+        for t in traces:
+            p = DEFAULTS[name](t)
+            p.update(params)
+            rows.append((p, t))
+    keys = list(rows[0][0])
+    P = {k: np.array([r[0][k] for r in rows], dtype=np.float64) for k in keys}
+    toTurns = auto.DRIVE_TURNS_PER_SEC / 100.0
+    if name == "goStraight":
+        needed = np.array([r[1].params[0] for r in rows])
+        direction = np.array([1.0 if r[1].params[1] >= 0 else -1.0 for r in rows])
+        maxSpeed = np.array([abs(r[1].params[1]) * toTurns for r in rows])
+        moves = zip(needed, maxSpeed, P["accel"], P["jerk"])
+        angle = np.array([r[1].column("yawErr")[0] for r in rows])
+    elif name == "goTurn":
+        # x is the degrees turned, needed the turn measured the way the profile goes
+        distance = np.array([turnDistance(r[1]) for r in rows])
+        direction = np.where(distance >= 0, 1.0, -1.0)
+        needed = direction * np.array([r[1].params[0] for r in rows])
+        maxSpeed = np.array([abs(r[1].params[1]) * auto.TURN_DEG_PER_SEC for r in rows])
+        moves = zip(np.abs(distance), maxSpeed, P["accel"], P["jerk"])
+        angle = np.zeros(len(rows))
+    else:
+        needed = np.array([r[1].params[1] for r in rows])
+        direction = np.array([1.0 if r[1].params[0] >= 0 else -1.0 for r in rows])
+        maxSpeed = np.array([abs(r[1].params[0]) * toTurns for r in rows])
+        moves = zip(needed, maxSpeed, P["accel"] * toTurns, P["jerk"] * toTurns)
+        angle = np.array([r[1].column("angleErr")[0] for r in rows])
+    position, velocity, acceleration, counts = profileTables(list(moves), tickMs)
+    settleTicks = (P["settleMs"] // tickMs).astype(np.int64)
+    deadlineTicks = auto.TURN_DEADLINE_MS // tickMs
+    steps = int(np.max(counts + settleTicks)) + max(200, deadlineTicks) + coastMs // tickMs
+    if name != "goTurn" and plant["forward"] is None: raise ValueError("no goStraight/goCurve traces to fit")
+    (fa, fb, fd), (ta, tb, td) = plant["forward"] or (0.0, 0.0, 0.0), plant["turning"]
+
+    batch = len(rows)
+    index = np.arange(batch)
+    x = np.zeros(batch)          # Signed turns travelled
+    v = np.zeros(batch)          # Turns per tick
+    w = np.zeros(batch)          # Degrees per tick
+    correction = np.zeros(batch)
+    finished = np.zeros(batch, dtype=bool)
+    finishTick = np.full(batch, steps)
+    peak = np.zeros(batch)
+    settledFor = np.zeros(batch, dtype=np.int64)  # goTurn: ticks inside the settle band
+    for k in range(steps):
+        kk = np.minimum(k, counts - 1)
+        pos, vel, acc = position[index, kk], velocity[index, kk], acceleration[index, kk]
+        settled = k - settleTicks >= counts
+        if name == "goStraight":
+            left, right, arrived = straightCommand(P, angle, x, pos, vel, acc, direction, needed)
+            done = arrived | settled
+        elif name == "goTurn":
+            error = direction * needed - x
+            left, right = turnCommand(P, error, pos, vel, acc, direction, np.abs(distance))
+            inBand = (np.abs(error) < P["settleDeg"]) & (np.abs(w) * 1000.0 / tickMs < P["settleDps"])
+            settledFor = np.where(inBand, settledFor + 1, 0)
+            done = (inBand & ((settledFor - 1) * tickMs >= P["settleMs"])) | (k >= counts + deadlineTicks)
+        else:
+            left, right, correction, _, done = curveCommand(P, angle, direction * x, pos, vel, acc,
+                                                            correction, dt, direction, needed, settled)
+        left = np.where(finished, 0.0, np.clip(left, -100.0, 100.0))
+        right = np.where(finished, 0.0, np.clip(right, -100.0, 100.0))
+        newlyDone = done & ~finished
+        finishTick[newlyDone] = k
+        finished |= newlyDone
+        v = fa * v + fb * deadzone((left + right) / 2.0, fd)
+        w = ta * w + tb * deadzone((left - right) / 2.0, td)
+        if name == "goTurn":
+            x += w
+        else:
+            x += v
+            angle = angle + w
+        peak = np.maximum(peak, direction * x)
+        if finished.all() and k > int(finishTick.max()) + coastMs // tickMs: break
+    shape = (len(paramSets), len(traces))
+    if name == "goTurn": angle = direction * x - needed
+    return {"timeMs": (finishTick * tickMs).reshape(shape),
+            "overshoot": (peak - needed).reshape(shape),
+            "error": (direction * x - needed).reshape(shape),
+            "angle": np.abs(angle).reshape(shape)}
+
+def parseRanges(args):
+    ranges = {}
+    for arg in args:
+        name, values = arg.split("=")
+        ranges[name] = [float(v) for v in values.split(",")]
+    return ranges
+
+def main(argv):
+    if len(argv) < 2:
+        print("usage: replay.py record|check|sweep traces.npz ...")
+        return
+    command, path, rest = argv[0], argv[1], argv[2:]
+    if command == "record":
+        if "--log" in rest:
+            with open(rest[rest.index("--log") + 1]) as f:
+                traces = parseTraces(f)
+        else:
+            vary = 0
+            if "--vary" in rest:
+                vary = int(rest.pop(rest.index("--vary") + 1))
+            names = [a for a in rest if not a.startswith("--")]
+            traces = recordSim(names or ["runNearGoal"], vary)
+        saveTraces(traces, path)
+        counts = {}
+        for t in traces: counts[t.name] = counts.get(t.name, 0) + 1
+        truncated = sum(1 for t in traces if t.dropped)
+        print("saved {} traces to {}: {}, {} truncated".format(len(traces), path, counts, truncated))
+    elif command == "check":
+        traces = loadTraces(path)
+        changed, skipped = check(traces)
+        for t, worst in changed:
+            print("{} {}: commands differ by up to {:.2f}%".format(t.name, t.params.tolist(), worst))
+        print("{} of {} replayable traces changed, {} skipped".format(len(changed), len(traces) - skipped, skipped))
+    elif command == "sweep":
+        traces = loadTraces(path)
+        if not rest or rest[0] not in DEFAULTS:
+            print("usage: replay.py sweep traces.npz {} [name=v1,v2 ...]".format("|".join(DEFAULTS)))
+            return
+        name, ranges = rest[0], parseRanges(rest[1:])
+        plant = fitPlant(traces)
+        if plant["forward"]:
+            print("plant: forward a={:.3f} b={:.5f} deadband={:.1f}%".format(*plant["forward"]))
+        print("plant: turning a={:.3f} b={:.4f} deadband={:.1f}%".format(*plant["turning"]))
+        paramSets = grid(ranges) if ranges else [{}]
+        result = simulate(name, traces, paramSets, plant)
+        unit = "deg" if name == "goTurn" else "turns"
+        for n, params in enumerate(paramSets):
+            print("{}: time {:.0f}ms (worst {:.0f}), overshoot {:.3f} {}, |error| {:.3f} (worst {:.3f}), angle {:.2f}deg".format(
+                params or "current", np.mean(result["timeMs"][n]), np.max(result["timeMs"][n]),
+                np.mean(np.maximum(result["overshoot"][n], 0.0)), unit, np.mean(np.abs(result["error"][n])),
+                np.max(np.abs(result["error"][n])), np.mean(np.abs(result["angle"][n]))))
+    else:
+        print("unknown command {}".format(command))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,71 @@
+#AXOBOTL host-side runner
+# Runs one of the routines from src/auto.py against the simulated `vex` module
+# and reports virtual time, wall time and what happened on the field.
+#
+#     python sim/simrun.py runNearGoal
+#     python sim/simrun.py autoLoop --echo
+#     python sim/simrun.py autoLoop --profile   # loop time histograms afterwards
+
+import importlib
+import os
+import sys
+import time
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(SIM_DIR), "src")
+for d in (SRC_DIR, SIM_DIR):
+    if d not in sys.path: sys.path.insert(0, d)
+
+import vex
+
+def loadAuto(config: vex.SimConfig = None, startThreads: bool = True):
+    # Fresh field and clock, then a fresh import of auto.py bound to it.
+    # Importing starts nothing; startThreads does what run() does on the robot.
+    # Not importlib.reload(): that keeps the old globals, so consolePrint would
+    # pick up auto's own print() (the brain screen) instead of the real one.
+    vex.sim.reset(config)
+    sys.modules.pop("auto", None)
+    auto = importlib.import_module("auto")
+    if startThreads: auto.startThreads()
+    return auto
+
+def runRoutine(name: str, config: vex.SimConfig = None, deadline: float = 60.0, profile: bool = False):
+    auto = loadAuto(config)
+    if profile: auto.profiler.enable()
+    routine = getattr(auto, name)
+    sim = vex.sim
+    wallStart = time.perf_counter()
+    timedOut = False
+    try:
+        sim.run(routine, deadline)
+    except vex.SimTimeout:
+        timedOut = True
+    wall = time.perf_counter() - wallStart
+    return {
+        "routine": name,
+        "virtual": sim.now,
+        "wall": wall,
+        "timedOut": timedOut,
+        "shots": sim.field.shots,
+        "scores": sim.field.scores,
+        "pickups": sim.field.pickups,
+        "reads": sim.reads,
+        "writes": sim.writes,
+        "screenOps": sim.screenOps,
+        "switches": sim.threadSwitches,
+        "errors": len(sim.errors),
+    }
+
+def main(argv):
+    names = [a for a in argv if not a.startswith("--")]
+    config = vex.SimConfig()
+    config.echoScreen = "--echo" in argv
+    for name in names or ["runNearGoal"]:
+        r = runRoutine(name, config, profile="--profile" in argv)
+        print("{routine}: virtual={virtual:.2f}s wall={wall:.3f}s timedOut={timedOut} "
+              "shots={shots} scores={scores} pickups={pickups} "
+              "reads={reads} writes={writes} screenOps={screenOps} errors={errors}".format(**r))
+        if "--profile" in argv: sys.modules["auto"].profiler.report(print)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
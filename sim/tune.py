@@ -0,0 +1,257 @@
+#AXOBOTL gain tuner
+# Searches goStraight/goCurve/goTurn settings for the best trade-off between
+# time to target and final error, spread over every CPU core.
+#
+#     python sim/tune.py goStraight --search random --samples 200
+#     python sim/tune.py goCurve --search refine --rounds 5 --samples 40
+#     python sim/tune.py goStraight --search grid kP=1,2,4 adjust=0.3,0.6
+#     python sim/tune.py goStraight --replay traces.npz --samples 2000
+#
+# Each candidate drives a short course in the simulator, or with --replay
+# re-drives recorded traces through replay.py's fitted drivetrain (much faster).
+# Searches:
+#   grid    every combination of the values given on the command line
+#   random  uniform samples over SPACES
+#   refine  random first, then each round samples around the current Pareto
+#           front with a shrinking spread, so later rounds spend their time
+#           where the good settings are
+# The result is the Pareto front: settings where nothing else tried was both
+# faster and more accurate. Pick from it depending on what the routine needs.
+
+import concurrent.futures
+import math
+import os
+import random
+import sys
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+if SIM_DIR not in sys.path: sys.path.insert(0, SIM_DIR)
+
+import simrun
+import vex
+
+# Ranges searched by random/refine, per move
+SPACES = {
+    "goStraight": {"kP": (0.5, 6.0), "adjust": (0.1, 1.5), "deadband": (0.0, 1.0),
+                   "accel": (0.5, 4.0), "jerk": (2.0, 40.0), "settleMs": (0.0, 500.0)},
+    "goCurve": {"kP": (0.2, 4.0), "angleSpeed": (10.0, 100.0), "angleAccel": (50.0, 1000.0),
+                "tolerance": (0.3, 3.0), "accel": (50.0, 400.0), "jerk": (300.0, 5000.0)},
+    "goTurn": {"kP": (1.0, 10.0), "accel": (200.0, 1500.0), "jerk": (1000.0, 20000.0),
+               "settleDeg": (0.3, 3.0), "settleMs": (0.0, 200.0)},
+}
+
+MM_PER_DEGREE = 10.0  # goCurve error: 1 degree off is about 10mm off over the next 600mm
+UNITS = {"goStraight": "mm", "goCurve": "mm", "goTurn": "deg"}  # Error per move
+
+# Simulator courses. Each runs inside the simulator with the candidate's
+# settings and returns (seconds per move, error per move). Moves go back and
+# forth so the robot stays clear of the walls.
+
+def settle(auto):
+    auto.wait(300, vex.MSEC)  # Let it coast to a stop before measuring
+
+def straightCourse(auto, params):
+    auto.DRIVE_KP = params.get("kP", auto.DRIVE_KP)
+    auto.DRIVE_YAW_GAIN = params.get("adjust", auto.DRIVE_YAW_GAIN)
+    auto.DRIVE_YAW_DEADBAND = params.get("deadband", auto.DRIVE_YAW_DEADBAND)
+    auto.DRIVE_SETTLE_MS = params.get("settleMs", auto.DRIVE_SETTLE_MS)
+    accel = params.get("accel", auto.DRIVE_MAX_ACCEL)
+    jerk = params.get("jerk", auto.DRIVE_MAX_JERK)
+    robot = vex.sim.robot
+    moves = [(20, 50), (20, -50), (10, 40), (10, -40), (4, 30), (4, -30)]
+    seconds = error = 0.0
+    for inches, velocity in moves:
+        x, y, yaw = robot.x, robot.y, math.radians(robot.yaw)
+        start = vex.sim.now
+        auto.runCommand(auto.DriveStraight(inches, velocity, 5, maxAcceleration=accel, maxJerk=jerk))
+        seconds += vex.sim.now - start
+        settle(auto)
+        travelled = (robot.x - x) * math.sin(yaw) + (robot.y - y) * math.cos(yaw)
+        error += abs(travelled - math.copysign(inches * 25.4, velocity))
+    return seconds / len(moves), error / len(moves)
+
+def curveCourse(auto, params):
+    settings = {"kP": params.get("kP", 1.0), "maxAngleSpeed": params.get("angleSpeed", 50.0),
+                "maxAngleAcceleration": params.get("angleAccel", 300.0),
+                "angleTolerance": params.get("tolerance", 1.0),
+                "maxAcceleration": params.get("accel", 150.0), "maxJerk": params.get("jerk", 1500.0)}
+    auto.DRIVE_SETTLE_MS = params.get("settleMs", auto.DRIVE_SETTLE_MS)
+    robot = vex.sim.robot
+    moves = [(45, 40, 1.0), (0, -40, 1.0), (-45, 40, 1.0), (0, -40, 1.0), (30, 60, 0.5), (0, -60, 0.5)]
+    seconds = error = 0.0
+    for angle, speed, revs in moves:
+        x, y = robot.x, robot.y
+        start = vex.sim.now
+        auto.runCommand(auto.DriveCurve(angle, speed, revs, **settings).withTimeout(6000))
+        seconds += vex.sim.now - start
+        settle(auto)
+        travelled = math.sqrt((robot.x - x) ** 2 + (robot.y - y) ** 2)
+        # Arc vs chord hardly matters for these gentle curves
+        error += abs(travelled - revs * auto.DRIVE_MM_PER_TURN) + MM_PER_DEGREE * abs(robot.yaw - angle)
+    return seconds / len(moves), error / len(moves)
+
+def turnCourse(auto, params):
+    auto.TURN_KP = params.get("kP", auto.TURN_KP)
+    auto.TURN_MAX_ACCEL = params.get("accel", auto.TURN_MAX_ACCEL)
+    auto.TURN_MAX_JERK = params.get("jerk", auto.TURN_MAX_JERK)
+    auto.TURN_SETTLE_DEG = params.get("settleDeg", auto.TURN_SETTLE_DEG)
+    auto.TURN_SETTLE_MS = params.get("settleMs", auto.TURN_SETTLE_MS)
+    robot = vex.sim.robot
+    moves = [(40, 90), (40, 0), (60, 45), (60, 0), (30, 20), (30, 0)]
+    seconds = error = 0.0
+    for velocity, angle in moves:
+        start = vex.sim.now
+        auto.runCommand(auto.TurnTo(velocity, angle).withTimeout(4000))
+        seconds += vex.sim.now - start
+        settle(auto)
+        error += abs((robot.yaw - angle + 180.0) % 360.0 - 180.0)
+    return seconds / len(moves), error / len(moves)
+
+COURSES = {"goStraight": straightCourse, "goCurve": curveCourse, "goTurn": turnCourse}
+
+def simScore(name, params):
+    auto = simrun.loadAuto()
+    result = []
+    def course():
+        auto.wait(50, vex.MSEC)
+        result.append(COURSES[name](auto, params))
+    try:
+        vex.sim.run(course, 120.0)
+    except vex.SimTimeout:
+        pass
+    return result[0] if result else (math.inf, math.inf)
+
+# Replay scoring: one worker scores a whole chunk of candidates in one batch
+
+replayState = {}
+
+def startReplayWorker(path):
+    import replay
+    traces = replay.loadTraces(path)
+    replayState["traces"] = traces
+    replayState["plant"] = replay.fitPlant(traces)
+
+def replayScores(name, paramSets):
+    import numpy as np
+    import replay
+    auto = replay.autoModule()
+    result = replay.simulate(name, replayState["traces"], paramSets, replayState["plant"])
+    if name == "goTurn":
+        error = np.abs(result["error"])
+    else:
+        error = np.abs(result["error"]) * auto.DRIVE_MM_PER_TURN
+    if name == "goCurve": error = error + MM_PER_DEGREE * result["angle"]
+    seconds = result["timeMs"] / 1000.0
+    return [(float(np.mean(seconds[n])), float(np.mean(error[n]))) for n in range(len(paramSets))]
+
+def simScores(name, paramSets):
+    return [simScore(name, params) for params in paramSets]
+
+# Search
+
+def paretoFront(results):
+    # results: (params, seconds, error). Keep the ones nothing else beats on both.
+    front = []
+    for r in sorted(results, key=lambda r: (r[1], r[2])):
+        if not front or r[2] < front[-1][2]: front.append(r)
+    return front
+
+def randomParams(space, rng):
+    return {k: rng.uniform(low, high) for k, (low, high) in space.items()}
+
+def nearParams(params, space, spread, rng):
+    near = {}
+    for k, (low, high) in space.items():
+        value = params.get(k, (low + high) / 2.0)
+        near[k] = min(high, max(low, rng.gauss(value, spread * (high - low))))
+    return near
+
+def gridParams(ranges):
+    sets = [{}]
+    for name, values in ranges.items():
+        sets = [dict(s, **{name: v}) for s in sets for v in values]
+    return sets
+
+class Tuner:
+    def __init__(self, name: str, replayPath: str = None, workers: int = None):
+        self.name = name
+        self.replayPath = replayPath
+        self.workers = workers or os.cpu_count() or 1
+        self.results = []
+        if replayPath:
+            self.pool = concurrent.futures.ProcessPoolExecutor(
+                self.workers, initializer=startReplayWorker, initargs=(replayPath,))
+            self.score = replayScores
+        else:
+            self.pool = concurrent.futures.ProcessPoolExecutor(self.workers)
+            self.score = simScores
+
+    def evaluate(self, paramSets):
+        # Split into one chunk per worker (a few more for balance) and gather
+        chunks = max(1, min(len(paramSets), self.workers * 4))
+        parts = [paramSets[i::chunks] for i in range(chunks)]
+        futures = [self.pool.submit(self.score, self.name, part) for part in parts]
+        for part, future in zip(parts, futures):
+            for params, (seconds, error) in zip(part, future.result()):
+                self.results.append((params, seconds, error))
+
+    def close(self):
+        self.pool.shutdown()
+
+def search(name, kind="random", samples=100, rounds=4, ranges=None, replayPath=None, seed=1):
+    rng = random.Random(seed)
+    space = SPACES[name]
+    tuner = Tuner(name, replayPath)
+    try:
+        if kind == "grid":
+            tuner.evaluate([{}] + gridParams(ranges or {}))
+        else:
+            tuner.evaluate([{}] + [randomParams(space, rng) for _ in range(samples)])
+            spread = 0.15
+            for _ in range(rounds - 1 if kind == "refine" else 0):
+                front = paretoFront(tuner.results)
+                tuner.evaluate([nearParams(front[rng.randrange(len(front))][0], space, spread, rng)
+                                for _ in range(samples)])
+                spread *= 0.6
+    finally:
+        tuner.close()
+    return tuner.results
+
+def main(argv):
+    if not argv or argv[0] not in SPACES:
+        print("usage: tune.py goStraight|goCurve|goTurn [--search grid|random|refine] [--samples N] "
+              "[--rounds N] [--replay traces.npz] [name=v1,v2 ...]")
+        return
+    name, args = argv[0], argv[1:]
+    options = {"--search": "random", "--samples": "100", "--rounds": "4", "--replay": None, "--seed": "1"}
+    ranges = {}
+    i = 0
+    while i < len(args):
+        if args[i] in options:
+            options[args[i]] = args[i + 1]
+            i += 2
+        else:
+            key, values = args[i].split("=")
+            ranges[key] = [float(v) for v in values.split(",")]
+            i += 1
+    if options["--replay"]:
+        # Find out here, not in every worker
+        import replay
+        traces = replay.loadTraces(options["--replay"])
+        if not any(t.name == name and len(t) > 0 and t.dropped == 0 for t in traces):
+            print("no whole {} traces in {}".format(name, options["--replay"]))
+            return
+    results = search(name, options["--search"], int(options["--samples"]), int(options["--rounds"]),
+                     ranges, options["--replay"], int(options["--seed"]))
+    baseline = results[0]
+    unit = UNITS[name]
+    print("{} candidates; current settings: {:.2f}s, error {:.1f}{}".format(len(results), baseline[1], baseline[2], unit))
+    front = paretoFront(results)
+    print("Pareto front, {} settings (seconds per move, error per move in {}):".format(len(front), unit))
+    step = max(1, len(front) // 20)  # Thin out long fronts
+    for params, seconds, error in front[::step]:
+        settings = ", ".join("{}={:.3g}".format(k, v) for k, v in sorted(params.items())) or "current"
+        print("  {:6.2f}s {:7.1f}{}  {}".format(seconds, error, unit, settings))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
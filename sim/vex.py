@@ -0,0 +1,1391 @@
+#AXOBOTL host-side simulator
+# Stand-in for the VEX IQ2 `vex` module so src/auto.py runs on a Linux box.
+#
+# Everything runs on a virtual clock. Robot threads are real Python threads but
+# only one of them runs at a time: wait() parks the caller and hands the baton to
+# whichever thread wakes next, stepping the physics model up to that moment.
+# A 60 second routine therefore simulates in a fraction of a second and gives the
+# same answer every time.
+#
+# Usage:
+#     import sys; sys.path.insert(0, "sim"); sys.path.insert(0, "src")
+#     import vex, auto
+#     vex.sim.reset()  # optional: new field, clock back to zero
+#
+# The physics model is deliberately simple: a differential drive with first-order
+# motors and a static friction band, a belt-wound catapult, and a one-lane ball
+# path through the intake. Numbers live in SimConfig so tools can change them.
+
+import heapq as _heapq
+import math as _math
+import random as _random
+import sys as _sys
+import threading as _threading
+import traceback as _traceback
+
+# ---------------------------------------------------------------------------
+# Enums and unit constants (mirrors the shape of the vexiq2 stubs)
+
+class _Value:
+    def __init__(self, name: str, value: int):
+        self.name = name
+        self.value = value
+
+    def __repr__(self):
+        return self.name
+
+    def __int__(self):
+        return self.value
+
+class DirectionType:
+    class DirectionType(_Value): pass
+    FORWARD = DirectionType("FORWARD", 0)
+    REVERSE = DirectionType("REVERSE", 1)
+    UNDEFINED = DirectionType("UNDEFINED", 2)
+
+class TurnType:
+    class TurnType(_Value): pass
+    LEFT = TurnType("LEFT", 0)
+    RIGHT = TurnType("RIGHT", 1)
+
+class BrakeType:
+    class BrakeType(_Value): pass
+    COAST = BrakeType("COAST", 0)
+    BRAKE = BrakeType("BRAKE", 1)
+    HOLD = BrakeType("HOLD", 2)
+
+class PercentUnits:
+    class PercentUnits(_Value): pass
+    PERCENT = PercentUnits("PERCENT", 0)
+
+class VelocityUnits:
+    class VelocityUnits(_Value): pass
+    PERCENT = PercentUnits.PERCENT
+    RPM = VelocityUnits("RPM", 1)
+    DPS = VelocityUnits("DPS", 2)
+
+class RotationUnits:
+    class RotationUnits(_Value): pass
+    DEG = RotationUnits("DEG", 0)
+    REV = RotationUnits("REV", 1)
+    RAW = RotationUnits("RAW", 99)
+
+class TimeUnits:
+    class TimeUnits(_Value): pass
+    SECONDS = TimeUnits("SECONDS", 0)
+    MSEC = TimeUnits("MSEC", 1)
+
+class DistanceUnits:
+    class DistanceUnits(_Value): pass
+    MM = DistanceUnits("MM", 0)
+    IN = DistanceUnits("IN", 1)
+    CM = DistanceUnits("CM", 2)
+
+class CurrentUnits:
+    class CurrentUnits(_Value): pass
+    AMP = CurrentUnits("AMP", 0)
+
+class VoltageUnits:
+    class VoltageUnits(_Value): pass
+    VOLT = VoltageUnits("VOLT", 0)
+    MV = VoltageUnits("MV", 1)
+
+class TorqueUnits:
+    class TorqueUnits(_Value): pass
+    NM = TorqueUnits("NM", 0)
+    INLB = TorqueUnits("INLB", 1)
+
+class TemperatureUnits:
+    class TemperatureUnits(_Value): pass
+    CELSIUS = TemperatureUnits("CELSIUS", 0)
+    FAHRENHEIT = TemperatureUnits("FAHRENHEIT", 1)
+
+class AxisType:
+    class AxisType(_Value): pass
+    XAXIS = AxisType("XAXIS", 0)
+    YAXIS = AxisType("YAXIS", 1)
+    ZAXIS = AxisType("ZAXIS", 2)
+
+class OrientationType:
+    class OrientationType(_Value): pass
+    ROLL = OrientationType("ROLL", 0)
+    PITCH = OrientationType("PITCH", 1)
+    YAW = OrientationType("YAW", 2)
+
+class CylinderType:
+    class CylinderType(_Value): pass
+    CYLINDER1 = CylinderType("CYLINDER1", 0)
+    CYLINDER2 = CylinderType("CYLINDER2", 1)
+    CYLINDERALL = CylinderType("CYLINDERALL", 2)
+
+class FontType:
+    class FontType(_Value): pass
+    MONO12 = FontType("MONO12", 0)
+    MONO15 = FontType("MONO15", 1)
+    MONO20 = FontType("MONO20", 2)
+    MONO30 = FontType("MONO30", 3)
+    MONO40 = FontType("MONO40", 4)
+    MONO60 = FontType("MONO60", 5)
+    PROP20 = FontType("PROP20", 6)
+    PROP30 = FontType("PROP30", 7)
+
+class SoundType:
+    class SoundType(_Value): pass
+    SIREN = SoundType("SIREN", 0)
+    WRONG_WAY = SoundType("WRONG_WAY", 1)
+    WRONG_WAY_SLOW = SoundType("WRONG_WAY_SLOW", 2)
+    ALARM = SoundType("ALARM", 3)
+    RATCHET = SoundType("RATCHET", 4)
+    POWER_DOWN = SoundType("POWER_DOWN", 5)
+    POWER_UP = SoundType("POWER_UP", 6)
+    TADA = SoundType("TADA", 7)
+    FILLUP = SoundType("FILLUP", 8)
+    DOOR_CLOSE = SoundType("DOOR_CLOSE", 9)
+    HEADLIGHTS_ON = SoundType("HEADLIGHTS_ON", 10)
+    HEADLIGHTS_OFF = SoundType("HEADLIGHTS_OFF", 11)
+
+class Color:
+    class DefinedColor(_Value): pass
+    BLACK = DefinedColor("BLACK", 0x000000)
+    WHITE = DefinedColor("WHITE", 0xFFFFFF)
+    RED = DefinedColor("RED", 0xFF0000)
+    GREEN = DefinedColor("GREEN", 0x00FF00)
+    BLUE = DefinedColor("BLUE", 0x0000FF)
+    YELLOW = DefinedColor("YELLOW", 0xFFFF00)
+    ORANGE = DefinedColor("ORANGE", 0xFF8000)
+    PURPLE = DefinedColor("PURPLE", 0x8000FF)
+    CYAN = DefinedColor("CYAN", 0x00FFFF)
+    RED_VIOLET = DefinedColor("RED_VIOLET", 0xFF0080)
+    VIOLET = DefinedColor("VIOLET", 0x8000FF)
+    BLUE_VIOLET = DefinedColor("BLUE_VIOLET", 0x4000FF)
+    BLUE_GREEN = DefinedColor("BLUE_GREEN", 0x00FF80)
+    YELLOW_GREEN = DefinedColor("YELLOW_GREEN", 0x80FF00)
+    YELLOW_ORANGE = DefinedColor("YELLOW_ORANGE", 0xFFC000)
+    RED_ORANGE = DefinedColor("RED_ORANGE", 0xFF4000)
+    TRANSPARENT = DefinedColor("TRANSPARENT", -1)
+
+class Ports:
+    PORT1 = _Value("PORT1", 1)
+    PORT2 = _Value("PORT2", 2)
+    PORT3 = _Value("PORT3", 3)
+    PORT4 = _Value("PORT4", 4)
+    PORT5 = _Value("PORT5", 5)
+    PORT6 = _Value("PORT6", 6)
+    PORT7 = _Value("PORT7", 7)
+    PORT8 = _Value("PORT8", 8)
+    PORT9 = _Value("PORT9", 9)
+    PORT10 = _Value("PORT10", 10)
+    PORT11 = _Value("PORT11", 11)
+    PORT12 = _Value("PORT12", 12)
+
+FORWARD = DirectionType.FORWARD
+REVERSE = DirectionType.REVERSE
+LEFT = TurnType.LEFT
+RIGHT = TurnType.RIGHT
+COAST = BrakeType.COAST
+BRAKE = BrakeType.BRAKE
+HOLD = BrakeType.HOLD
+PERCENT = PercentUnits.PERCENT
+RPM = VelocityUnits.RPM
+DPS = VelocityUnits.DPS
+DEGREES = RotationUnits.DEG
+TURNS = RotationUnits.REV
+SECONDS = TimeUnits.SECONDS
+MSEC = TimeUnits.MSEC
+MM = DistanceUnits.MM
+INCHES = DistanceUnits.IN
+AMP = CurrentUnits.AMP
+VOLT = VoltageUnits.VOLT
+XAXIS = AxisType.XAXIS
+YAXIS = AxisType.YAXIS
+ZAXIS = AxisType.ZAXIS
+ROLL = OrientationType.ROLL
+PITCH = OrientationType.PITCH
+YAW = OrientationType.YAW
+
+def _port(port) -> int:
+    return int(port)
+
+def _toSeconds(value: float, units) -> float:
+    return value / 1000.0 if units is MSEC else float(value)
+
+def _fromSeconds(seconds: float, units) -> float:
+    return seconds * 1000.0 if units is MSEC else seconds
+
+def _toMM(value: float, units) -> float:
+    if units is DistanceUnits.IN: return value * 25.4
+    if units is DistanceUnits.CM: return value * 10.0
+    return value
+
+def _fromMM(value: float, units) -> float:
+    if units is DistanceUnits.IN: return value / 25.4
+    if units is DistanceUnits.CM: return value / 10.0
+    return value
+
+# ---------------------------------------------------------------------------
+# Simulator configuration: robot layout and physics constants
+
+class SimConfig:
+    def __init__(self):
+        # Virtual time
+        self.physicsStep = 0.005        # Seconds per physics step
+        self.seed = 4028
+        self.busOpSecs = 0.00005        # CPU time for one smart-port read or write
+        self.screenOpSecs = 0.0005      # CPU time for one brain screen call
+
+        # Smart motor
+        self.motorFreeRPM = 120.0       # 100% at the motor shaft
+        self.motorStallAmps = 1.2
+        self.motorTau = 0.03            # First-order response, unloaded
+        self.driveTau = 0.09            # Response with the robot's mass on the wheels
+        self.driveStaticPct = 6.0       # Static friction band on carpet, in percent
+        self.spinForTolerance = 0.5     # Degrees
+
+        # Robot layout (ports match src/auto.py)
+        self.leftDrivePort = 7
+        self.rightDrivePort = 12
+        self.catBeltPorts = (3, 11)
+        self.intakePorts = (4, 1)
+        self.intakeEyePort = 6
+        self.topEyePort = 5
+        self.catEyePort = 2
+        self.bumperPort = 8
+
+        # Drive geometry
+        self.driveMMPerRev = 400.0      # Travel per reported output revolution
+        self.trackWidthMM = 246.0
+        self.robotRadiusMM = 150.0
+        self.intakeReachMM = 180.0      # Intake mouth ahead of the robot centre
+        self.pickupRadiusMM = 90.0
+        self.wallSlip = 0.0             # Fraction of wheel speed that keeps turning when pinned
+
+        # Inertial
+        self.calibrationSecs = 2.0
+        self.headingNoiseDeg = 0.02
+        self.headingDriftDegPerSec = 0.0
+
+        # Catapult: belt phase in degrees, one shot per cycle
+        self.catCycleDeg = 360.0
+        self.catCockDeg = 200.0         # Arm is down and visible to catEye from here...
+        self.catFireDeg = 330.0         # ...until here, where it releases
+        self.catWindLoad = 0.45         # Belt speed factor while stretching the bands
+
+        # Ball path through the robot, 0.0 = intake mouth, 1.0 = catapult basket
+        self.ballSpeed = 1.6            # Path lengths per second at full intake
+        self.ballSpacing = 0.45
+        self.intakeEyeZone = 0.35       # intakeEye sees balls below this
+        self.topEyeZone = 0.9           # topEye sees balls above this
+        self.ballBlockedAt = 0.85       # Where a ball waits while the arm is up
+        self.preloadBalls = 2
+
+        # Field, millimetres, origin at a corner, heading 0 faces +y
+        self.fieldWidthMM = 2438.0
+        self.fieldHeightMM = 1829.0
+        self.startPose = (250.0, 400.0, 0.0)
+        self.goal = (2330.0, 654.0)
+        self.goalRangeMM = 600.0
+        self.balls = [(900.0, 654.0), (1300.0, 654.0), (1700.0, 654.0),
+                      (1100.0, 654.0), (1500.0, 654.0), (700.0, 654.0)]
+        self.switches = [(1219.0, 150.0), (1219.0, 1679.0), (150.0, 914.0), (2288.0, 914.0)]
+
+        # Screen
+        self.echoScreen = False         # Also write brain screen prints to stdout
+
+class SimTimeout(Exception):
+    # Raised in the main thread when the clock passes Simulator.deadline
+    pass
+
+class _Killed(BaseException):
+    pass
+
+# ---------------------------------------------------------------------------
+# Cooperative scheduler on top of OS threads
+
+class _SimThread:
+    def __init__(self, sim, target=None, args=(), name: str = ""):
+        self.sim = sim
+        self.target = target
+        self.args = args
+        self.name = name
+        self.wake = 0.0
+        self.predicate = None
+        self.predicateTimeout = None
+        self.killed = False
+        self.done = False
+        self.baton = _threading.Lock()
+        self.baton.acquire()
+        self.os = None
+        if target is not None:
+            self.os = _threading.Thread(target=self._run, name=name, daemon=True)
+
+    def _run(self):
+        self.sim._tls.thread = self
+        self.baton.acquire()
+        try:
+            if not self.killed: self.target(*self.args)
+        except _Killed:
+            pass
+        except Exception:
+            self.sim.errors.append(_sys.exc_info()[1])
+            _sys.stderr.write("[sim] thread {} crashed at t={:.3f}s\n".format(self.name, self.sim.now))
+            _traceback.print_exc()
+        finally:
+            self.done = True
+            self.sim._finished(self)
+
+class Simulator:
+    def __init__(self, config: SimConfig = None):
+        self._lock = _threading.Lock()
+        self._tls = _threading.local()
+        self._threads = []
+        self.reset(config)
+
+    # --- lifecycle ---------------------------------------------------------
+
+    def reset(self, config: SimConfig = None):
+        # Unwind every parked robot thread, then start from a fresh field
+        for t in getattr(self, "_threads", []):
+            if t.os is not None and not t.done and t.os.is_alive():
+                t.killed = True
+                self._resetting = True
+                t.baton.release()
+                t.os.join(1.0)
+        self._resetting = False
+        self.config = config if config is not None else SimConfig()
+        self.now = 0.0
+        self.debt = 0.0                 # CPU time used by the running thread, not yet on the clock
+        self.busyUntil = 0.0            # Nobody else runs before this (CPU time already spent)
+        self.deadline = None
+        self.errors = []
+        self._seq = 0
+        self._ready = []
+        self._waiters = []
+        self._threads = []
+        self._tls = _threading.local()
+        self._rng = _random.Random(self.config.seed)
+        self.devices = {}
+        self.motors = []
+        self.brain = None
+        # Counters
+        self.reads = 0
+        self.writes = 0
+        self.screenOps = 0
+        self.threadSwitches = 0
+        self.physicsSteps = 0
+        self.sounds = []
+        self.screenLines = []
+        self.log = []                   # (time, text) for shots, scores, pickups...
+        self.robot = _RobotModel(self)
+        self.field = _FieldModel(self)
+
+    def current(self) -> _SimThread:
+        t = getattr(self._tls, "thread", None)
+        if t is None:
+            # First call from a host thread: adopt it as a robot thread
+            t = _SimThread(self, name=_threading.current_thread().name)
+            self._tls.thread = t
+            self._threads.append(t)
+        return t
+
+    # --- scheduling --------------------------------------------------------
+
+    def _push(self, t: _SimThread, wake: float):
+        t.wake = wake
+        self._seq += 1
+        _heapq.heappush(self._ready, (wake, self._seq, t))
+
+    def spawn(self, target, args=(), name: str = "") -> _SimThread:
+        self.current()
+        t = _SimThread(self, target, args, name or getattr(target, "__name__", "thread"))
+        self._threads.append(t)
+        t.os.start()
+        self._push(t, self.now)
+        return t
+
+    def clock(self) -> float:
+        # What the brain's timer reads: includes CPU time the running thread has used
+        return self.now + self.debt
+
+    def busy(self, seconds: float):
+        # The running thread spends CPU time; nobody else runs meanwhile
+        self.debt += seconds
+        if self.debt >= self.config.physicsStep: self._flush()
+
+    def _flush(self):
+        while self.debt > 1e-12:
+            dt = min(self.config.physicsStep, self.debt)
+            self.debt -= dt
+            self._step(dt)
+        self.debt = 0.0
+
+    def sleep(self, seconds: float):
+        # CPU time used so far just pushes our wake-up (and everyone else) back
+        me = self.current()
+        self.busyUntil = self.now + self.debt
+        self.debt = 0.0
+        self._push(me, self.busyUntil + max(0.0, seconds))
+        self._switch(me)
+
+    def waitFor(self, predicate, timeout: float = None):
+        # Park until predicate() is true; checked after every physics step
+        me = self.current()
+        self._flush()
+        if predicate(): return True
+        me.predicate = predicate
+        me.predicateTimeout = None if timeout is None else self.now + timeout
+        self._waiters.append(me)
+        self._switch(me)
+        return predicate()
+
+    def _next(self) -> _SimThread:
+        while True:
+            if self._ready and self._ready[0][0] <= self.now + 1e-9 and self.busyUntil <= self.now + 1e-9:
+                return _heapq.heappop(self._ready)[2]
+            if not self._ready and not self._waiters:
+                raise RuntimeError("Simulator deadlock: no runnable threads")
+            target = self._ready[0][0] if self._ready else self.now + self.config.physicsStep
+            if target < self.busyUntil: target = self.busyUntil
+            self._step(min(self.config.physicsStep, target - self.now))
+
+    def _switch(self, me: _SimThread):
+        nxt = self._next()
+        if nxt is not me:
+            self.threadSwitches += 1
+            nxt.baton.release()
+            me.baton.acquire()
+        if me.killed: raise _Killed()
+        if me.os is None and self.deadline is not None and self.now >= self.deadline:
+            raise SimTimeout("virtual clock passed {:.2f}s".format(self.deadline))
+
+    def _finished(self, t: _SimThread):
+        if self._resetting: return
+        try:
+            self._next().baton.release()
+        except RuntimeError:
+            pass
+
+    def kill(self, t: _SimThread):
+        if t is None or t.done: return
+        if t is self.current():
+            raise _Killed()
+        t.killed = True
+        if t in self._waiters: self._waiters.remove(t)
+        self._ready = [e for e in self._ready if e[2] is not t]
+        _heapq.heapify(self._ready)
+        self._push(t, self.now)
+
+    # --- physics -----------------------------------------------------------
+
+    def _step(self, dt: float):
+        if dt <= 0.0:
+            dt = 1e-6
+        self.now += dt
+        self.physicsSteps += 1
+        for m in self.motors:
+            m._step(dt)
+        self.robot.step(dt)
+        self.field.step(dt)
+        if self._waiters:
+            for t in list(self._waiters):
+                expired = t.predicateTimeout is not None and self.now >= t.predicateTimeout
+                if t.os is None and self.deadline is not None and self.now >= self.deadline:
+                    expired = True
+                if expired or t.predicate():
+                    self._waiters.remove(t)
+                    t.predicate = None
+                    self._push(t, self.now)
+
+    def run(self, routine, deadline: float = None):
+        # Run routine() in the calling thread; returns virtual seconds elapsed
+        self.current()
+        start = self.now
+        self.deadline = None if deadline is None else start + deadline
+        try:
+            routine()
+        finally:
+            self.deadline = None
+        return self.now - start
+
+    # --- device bookkeeping ------------------------------------------------
+
+    def register(self, device):
+        self.devices.setdefault(device.port, device)
+        if isinstance(device, Motor): self.motors.append(device)
+
+    def device(self, port: int):
+        return self.devices.get(port)
+
+    def note(self, text: str):
+        self.log.append((self.now, text))
+
+    def noise(self, sd: float) -> float:
+        return self._rng.gauss(0.0, sd) if sd > 0 else 0.0
+
+# ---------------------------------------------------------------------------
+# Physics models
+
+class _RobotModel:
+    # Differential drive on a walled field
+    def __init__(self, sim: Simulator):
+        self.sim = sim
+        c = sim.config
+        self.x, self.y, heading = c.startPose
+        self.yaw = heading              # Clockwise degrees, continuous
+        self.speed = 0.0                # mm/s along the heading
+        self.accel = 0.0                # mm/s^2 along the heading
+        self.yawRate = 0.0              # deg/s
+        self.pinned = False
+        self.rearContact = False
+
+    def heading(self) -> float:
+        return self.yaw % 360.0
+
+    def forward(self):
+        a = _math.radians(self.yaw)
+        return (_math.sin(a), _math.cos(a))
+
+    def step(self, dt: float):
+        sim = self.sim
+        c = sim.config
+        left = sim.device(c.leftDrivePort)
+        right = sim.device(c.rightDrivePort)
+        if not isinstance(left, Motor) or not isinstance(right, Motor):
+            return
+        vl = left._outputRPS() * c.driveMMPerRev
+        vr = right._outputRPS() * c.driveMMPerRev
+        v = (vl + vr) / 2.0
+        w = _math.degrees((vl - vr) / c.trackWidthMM)  # Clockwise positive
+        fx, fy = self.forward()
+        nx = self.x + fx * v * dt
+        ny = self.y + fy * v * dt
+        r = c.robotRadiusMM
+        cx = min(max(nx, r), c.fieldWidthMM - r)
+        cy = min(max(ny, r), c.fieldHeightMM - r)
+        self.pinned = (cx != nx or cy != ny) and abs(v) > 1.0
+        self.rearContact = self.pinned and v < 0
+        if self.pinned:
+            # Pushing into a wall: the wheels stall (or slip if configured)
+            slip = c.wallSlip
+            left._stall(slip, v)
+            right._stall(slip, v)
+            v = 0.0
+        self.x, self.y = cx, cy
+        self.yaw += w * dt
+        self.accel = (v - self.speed) / dt
+        self.speed = v
+        self.yawRate = w
+        bumper = sim.device(c.bumperPort)
+        if isinstance(bumper, Bumper): bumper._setDown(self.rearContact)
+
+class _FieldModel:
+    # Catapult, ball path and field balls
+    def __init__(self, sim: Simulator):
+        self.sim = sim
+        c = sim.config
+        self.balls = list(c.balls)
+        self.path = []                  # Positions along the ball path, ascending
+        for i in range(c.preloadBalls):
+            self.path.append(c.ballBlockedAt - i * c.ballSpacing)
+        self.path.sort()
+        self.catPhase = 0.0             # Belt degrees since boot
+        self.catWindStart = 0.0
+        self.hugging = False
+        self.shots = 0
+        self.scores = 0
+        self.pickups = 0
+        self.shotTimes = []
+        self.switchesHit = set()
+
+    def catCocked(self) -> bool:
+        c = self.sim.config
+        p = self.catPhase % c.catCycleDeg
+        return c.catCockDeg <= p < c.catFireDeg
+
+    def step(self, dt: float):
+        sim = self.sim
+        c = sim.config
+        self._stepCatapult()
+        # Intake flow: both rollers pull the ball in when spun REVERSE
+        a = sim.device(c.intakePorts[0])
+        b = sim.device(c.intakePorts[1])
+        flow = 0.0
+        if isinstance(a, Motor) and isinstance(b, Motor):
+            flow = (a._physicalPct() - b._physicalPct()) / 200.0
+        self._stepBalls(flow, dt)
+        if flow > 0.2: self._pickup()
+
+    def _stepCatapult(self):
+        sim = self.sim
+        c = sim.config
+        a = sim.device(c.catBeltPorts[0])
+        b = sim.device(c.catBeltPorts[1])
+        if not isinstance(a, Motor) or not isinstance(b, Motor):
+            return
+        phase = (a._physicalDeg() - b._physicalDeg()) / 2.0
+        before = self.catPhase
+        self.catPhase = phase
+        cycle = c.catCycleDeg
+        # Fire on every crossing of the release point
+        n0 = _math.floor((before - c.catFireDeg) / cycle)
+        n1 = _math.floor((phase - c.catFireDeg) / cycle)
+        if n1 > n0:
+            self._fire()
+
+    def _fire(self):
+        sim = self.sim
+        c = sim.config
+        self.shots += 1
+        self.shotTimes.append(sim.now)
+        launched = [s for s in self.path if s >= c.topEyeZone]
+        self.path = [s for s in self.path if s < c.topEyeZone]
+        if not launched:
+            sim.note("dry fire")
+            return
+        r = sim.robot
+        gx, gy = c.goal
+        inRange = _math.hypot(gx - r.x, gy - r.y) <= c.goalRangeMM
+        for _ in launched:
+            if inRange:
+                self.scores += 1
+                sim.note("score")
+            else:
+                sim.note("miss")
+
+    def _stepBalls(self, flow: float, dt: float):
+        c = self.sim.config
+        if not self.path: return
+        cocked = self.catCocked()
+        limit = 1.0 if cocked else c.ballBlockedAt
+        moved = []
+        ahead = None
+        # Move from the front of the path backwards so balls queue up
+        for s in reversed(self.path):
+            if s >= c.topEyeZone and not cocked and flow >= 0:
+                n = s  # Sitting in the basket
+            else:
+                n = s + flow * c.ballSpeed * dt
+                cap = limit if ahead is None else ahead - c.ballSpacing
+                if n > cap: n = max(s, cap) if flow > 0 else n
+                if s >= c.topEyeZone and cocked: n = max(n, s)
+            if n < -0.1:
+                self._eject()
+                continue
+            moved.append(n)
+            ahead = n
+        self.path = sorted(moved)
+
+    def _eject(self):
+        r = self.sim.robot
+        fx, fy = r.forward()
+        reach = self.sim.config.intakeReachMM + 60.0
+        self.balls.append((r.x + fx * reach, r.y + fy * reach))
+        self.sim.note("eject")
+
+    def _pickup(self):
+        sim = self.sim
+        c = sim.config
+        if self.path and self.path[0] < c.ballSpacing:
+            return
+        r = sim.robot
+        fx, fy = r.forward()
+        mx = r.x + fx * c.intakeReachMM
+        my = r.y + fy * c.intakeReachMM
+        for i, (bx, by) in enumerate(self.balls):
+            if _math.hypot(bx - mx, by - my) <= c.pickupRadiusMM:
+                del self.balls[i]
+                self.path.insert(0, 0.0)
+                self.pickups += 1
+                sim.note("pickup")
+                return
+
+    def eyeDistance(self, port: int) -> float:
+        c = self.sim.config
+        if port == c.intakeEyePort:
+            return 30.0 if any(s < c.intakeEyeZone for s in self.path) else 400.0
+        if port == c.topEyePort:
+            return 20.0 if any(s >= c.topEyeZone for s in self.path) else 250.0
+        if port == c.catEyePort:
+            return 40.0 if self.catCocked() else 180.0
+        return 1000.0
+
+sim = Simulator()
+
+# ---------------------------------------------------------------------------
+# vex API
+
+def wait(time: float, units=MSEC):
+    sim.sleep(_toSeconds(time, units))
+
+def sleep(time: float, units=MSEC):
+    sim.sleep(_toSeconds(time, units))
+
+class Thread:
+    def __init__(self, callback, args=()):
+        self._thread = sim.spawn(callback, tuple(args))
+
+    def stop(self):
+        sim.kill(self._thread)
+
+    @staticmethod
+    def sleep_for(duration: float, units=MSEC):
+        sim.sleep(_toSeconds(duration, units))
+
+class Event:
+    def __init__(self, callback=None, args=()):
+        self._handlers = []
+        if callback is not None: self._handlers.append((callback, tuple(args)))
+
+    def __call__(self, callback, args=()):
+        self._handlers.append((callback, tuple(args)))
+
+    def set(self, callback, args=()):
+        self._handlers.append((callback, tuple(args)))
+
+    def broadcast(self):
+        for callback, args in self._handlers:
+            sim.spawn(callback, args)
+
+    def broadcast_and_wait(self):
+        for callback, args in self._handlers:
+            callback(*args)
+
+class _Device:
+    def __init__(self, port):
+        self.port = _port(port) if port is not None else 0
+        self.reads = 0
+        self.writes = 0
+        sim.register(self)
+
+    def _read(self):
+        self.reads += 1
+        sim.reads += 1
+        sim.busy(sim.config.busOpSecs)
+
+    def _write(self):
+        self.writes += 1
+        sim.writes += 1
+        sim.busy(sim.config.busOpSecs)
+
+    def installed(self) -> bool:
+        self._read()
+        return True
+
+    def timestamp(self) -> int:
+        return int(sim.now * 1000)
+
+class Motor(_Device):
+    def __init__(self, port, *args):
+        super().__init__(port)
+        self.gearRatio = 1.0
+        self.reversed = False
+        for a in args:
+            if isinstance(a, bool): self.reversed = a
+            elif isinstance(a, (int, float)): self.gearRatio = float(a)
+        c = sim.config
+        self.isDrive = self.port in (c.leftDrivePort, c.rightDrivePort)
+        self.tau = c.driveTau if self.isDrive else c.motorTau
+        self.staticPct = c.driveStaticPct if self.isDrive else 0.0
+        self.motorRevs = 0.0            # Physical shaft revolutions
+        self.motorRPM = 0.0             # Physical shaft speed
+        self.zeroRevs = 0.0             # Reported position offset (output units)
+        self.velocityPct = 50.0
+        self.stopping = COAST
+        self.maxTorquePct = 100.0
+        self.timeoutSecs = 0.0
+        self.mode = "stop"              # "stop", "spin", "target"
+        self.commandPct = 0.0           # Physical, signed
+        self.targetRevs = 0.0           # Physical target for spin_for
+        self.holdRevs = 0.0
+        self.commandTime = 0.0
+        self.stallFactor = 1.0
+        self.amps = 0.0
+
+    # --- physics ---
+
+    def _sign(self) -> float:
+        return -1.0 if self.reversed else 1.0
+
+    def _physicalPct(self) -> float:
+        return 100.0 * self.motorRPM / sim.config.motorFreeRPM
+
+    def _physicalDeg(self) -> float:
+        return self.motorRevs * 360.0 / self.gearRatio
+
+    def _outputRPS(self) -> float:
+        # Signed like position(): positive drives the robot forward
+        return self.motorRPM * self._sign() / 60.0 / self.gearRatio
+
+    def _stall(self, factor: float, v: float):
+        self.stallFactor = factor
+
+    def _desiredPct(self) -> float:
+        if self.mode == "spin":
+            return self.commandPct
+        if self.mode == "target":
+            # Motor's internal position loop: cruise, then brake as hard as the load allows
+            remaining = self.targetRevs - self.motorRevs
+            speed = abs(self.velocityPct)
+            freeRPS = sim.config.motorFreeRPM / 60.0
+            decel = 0.5 * freeRPS / self.tau
+            p = _math.sqrt(2.0 * decel * abs(remaining)) / freeRPS * 100.0
+            p = min(speed, max(p, 2.0))
+            return p if remaining > 0 else -p
+        if self.stopping is HOLD:
+            p = (self.holdRevs - self.motorRevs) * 60.0 / 0.05 / sim.config.motorFreeRPM * 100.0
+            return max(-100.0, min(100.0, p))
+        return 0.0
+
+    def _step(self, dt: float):
+        c = sim.config
+        desired = self._desiredPct()
+        # Static friction: small commands don't move a loaded drive wheel
+        # (position moves run the motor's own integrator, which pushes through it)
+        if self.staticPct > 0.0 and self.mode == "spin":
+            if abs(desired) <= self.staticPct:
+                effective = 0.0
+            else:
+                effective = (abs(desired) - self.staticPct) * 100.0 / (100.0 - self.staticPct)
+                effective = effective if desired > 0 else -effective
+        else:
+            effective = desired
+        # Catapult belts slow down while stretching the bands
+        load = 1.0
+        if self.port in c.catBeltPorts and sim.field is not None:
+            winding = effective * (1.0 if self.port == c.catBeltPorts[0] else -1.0) >= 0.0
+            if winding and (sim.field.catPhase % c.catCycleDeg) < c.catFireDeg:
+                load = c.catWindLoad
+        targetRPM = effective / 100.0 * c.motorFreeRPM * load
+        if targetRPM * self.motorRPM > 0.0: targetRPM *= self.stallFactor  # Only blocked going the way it's pinned
+        tau = self.tau
+        if self.mode == "stop" and self.stopping is COAST:
+            tau *= 3.0
+        tau /= max(0.05, self.maxTorquePct / 100.0)
+        k = 1.0 - _math.exp(-dt / tau)
+        before = self.motorRPM
+        self.motorRPM += (targetRPM - self.motorRPM) * k
+        self.motorRevs += (before + self.motorRPM) / 2.0 / 60.0 * dt
+        # Current draw: effort not turned into speed, plus a little running load
+        effort = abs(effective) / 100.0
+        speed = abs(self.motorRPM) / c.motorFreeRPM
+        self.amps = c.motorStallAmps * min(1.0, max(0.0, effort - speed) + 0.1 * speed) * self.maxTorquePct / 100.0
+        self.stallFactor = 1.0
+        if self.mode == "target":
+            if abs(self.targetRevs - self.motorRevs) * 360.0 <= c.spinForTolerance:
+                self._finishTarget()
+            elif self.timeoutSecs > 0.0 and sim.now - self.commandTime >= self.timeoutSecs:
+                self._finishTarget()
+
+    def _finishTarget(self):
+        self.mode = "stop"
+        self.holdRevs = self.motorRevs
+
+    # --- API ---
+
+    def set_velocity(self, velocity: float, units=PERCENT):
+        self._write()
+        self.velocityPct = self._toPct(velocity, units)
+        if self.mode == "spin":
+            self.commandPct = self.velocityPct * self._sign() * self._dirSign
+
+    def set_stopping(self, mode):
+        self._write()
+        self.stopping = mode
+
+    def set_max_torque(self, value: float, units=PERCENT):
+        self._write()
+        self.maxTorquePct = max(0.0, min(100.0, float(value)))
+
+    def set_timeout(self, value: float, units=MSEC):
+        self._write()
+        self.timeoutSecs = _toSeconds(value, units)
+
+    def get_timeout(self) -> float:
+        return self.timeoutSecs * 1000.0
+
+    def set_reversed(self, value: bool):
+        self._write()
+        self.reversed = bool(value)
+
+    def set_position(self, value: float, units=DEGREES):
+        self._write()
+        out = value / 360.0 if units is not TURNS else float(value)
+        self.zeroRevs = self._rawOutputRevs() - out
+
+    def reset_position(self):
+        self.set_position(0, DEGREES)
+
+    def _rawOutputRevs(self) -> float:
+        return self.motorRevs * self._sign() / self.gearRatio
+
+    def _toPct(self, velocity: float, units) -> float:
+        if units is RPM:
+            return velocity * self.gearRatio / sim.config.motorFreeRPM * 100.0
+        if units is DPS:
+            return velocity / 6.0 * self.gearRatio / sim.config.motorFreeRPM * 100.0
+        return float(velocity)
+
+    _dirSign = 1.0
+
+    def spin(self, direction, velocity: float = None, units=PERCENT):
+        self._write()
+        if velocity is not None:
+            self.velocityPct = self._toPct(velocity, units)
+        self._dirSign = -1.0 if direction is REVERSE else 1.0
+        self.mode = "spin"
+        self.commandPct = self.velocityPct * self._sign() * self._dirSign
+        self.commandTime = sim.now
+
+    def spin_for(self, direction, value: float, units=DEGREES, velocity: float = None,
+                 units_v=PERCENT, wait: bool = True):
+        self._write()
+        if velocity is not None:
+            self.velocityPct = self._toPct(velocity, units_v)
+        revs = value / 360.0 if units is not TURNS else float(value)
+        d = -1.0 if direction is REVERSE else 1.0
+        if self.velocityPct < 0: d = -d
+        self.mode = "target"
+        self.targetRevs = self.motorRevs + d * self._sign() * revs * self.gearRatio
+        self.commandTime = sim.now
+        if wait:
+            sim.waitFor(self._isDone)
+        return True
+
+    def spin_to_position(self, rotation: float, units=DEGREES, velocity: float = None,
+                         units_v=PERCENT, wait: bool = True):
+        current = self.position(units)
+        delta = rotation - current
+        return self.spin_for(FORWARD if delta >= 0 else REVERSE, abs(delta), units, velocity, units_v, wait)
+
+    def _isDone(self) -> bool:
+        return self.mode != "target"
+
+    def stop(self, mode=None):
+        self._write()
+        if mode is not None: self.stopping = mode
+        self.mode = "stop"
+        self.holdRevs = self.motorRevs
+
+    def is_done(self) -> bool:
+        self._read()
+        return self._isDone()
+
+    def is_spinning(self) -> bool:
+        self._read()
+        return self.mode != "stop" or abs(self.motorRPM) > 0.5
+
+    def position(self, units=DEGREES) -> float:
+        self._read()
+        revs = self._rawOutputRevs() - self.zeroRevs
+        return revs if units is TURNS else revs * 360.0
+
+    def velocity(self, units=PERCENT) -> float:
+        self._read()
+        rpm = self.motorRPM * self._sign() / self.gearRatio
+        if units is RPM: return rpm
+        if units is DPS: return rpm * 6.0
+        return rpm * self.gearRatio / sim.config.motorFreeRPM * 100.0
+
+    def current(self, units=AMP) -> float:
+        self._read()
+        return self.amps
+
+    def power(self, units=None) -> float:
+        self._read()
+        return self.amps * 7.2
+
+    def torque(self, units=None) -> float:
+        self._read()
+        return self.amps * 0.3
+
+    def efficiency(self, units=PERCENT) -> float:
+        self._read()
+        return 0.0 if self.amps <= 0 else min(100.0, 100.0 * abs(self.motorRPM) / sim.config.motorFreeRPM)
+
+    def temperature(self, units=None) -> float:
+        self._read()
+        return 25.0
+
+    def direction(self):
+        self._read()
+        return FORWARD if self.motorRPM * self._sign() >= 0 else REVERSE
+
+class Distance(_Device):
+    def object_distance(self, units=MM) -> float:
+        self._read()
+        return _fromMM(sim.field.eyeDistance(self.port), units)
+
+    def is_object_detected(self) -> bool:
+        self._read()
+        return sim.field.eyeDistance(self.port) < 1000.0
+
+    def object_rawsize(self) -> int:
+        self._read()
+        return 0
+
+    def object_velocity(self) -> float:
+        self._read()
+        return 0.0
+
+class Inertial(_Device):
+    def __init__(self, port=None):
+        super().__init__(port)
+        self.calibratingUntil = 0.0
+        self.headingOffset = 0.0
+        self.rotationOffset = 0.0
+
+    def _yaw(self) -> float:
+        c = sim.config
+        return sim.robot.yaw + c.headingDriftDegPerSec * sim.now + sim.noise(c.headingNoiseDeg)
+
+    def calibrate(self):
+        self._write()
+        self.calibratingUntil = sim.now + sim.config.calibrationSecs
+        self.headingOffset = sim.robot.yaw
+        self.rotationOffset = sim.robot.yaw
+
+    def is_calibrating(self) -> bool:
+        self._read()
+        return sim.now < self.calibratingUntil
+
+    def heading(self, units=DEGREES) -> float:
+        self._read()
+        return (self._yaw() - self.headingOffset) % 360.0
+
+    def rotation(self, units=DEGREES) -> float:
+        self._read()
+        return self._yaw() - self.rotationOffset
+
+    def set_heading(self, value: float, units=DEGREES):
+        self._write()
+        self.headingOffset = sim.robot.yaw - value
+
+    def set_rotation(self, value: float, units=DEGREES):
+        self._write()
+        self.rotationOffset = sim.robot.yaw - value
+
+    def reset_heading(self):
+        self.set_heading(0)
+
+    def reset_rotation(self):
+        self.set_rotation(0)
+
+    def gyro_rate(self, axis=ZAXIS, units=DPS) -> float:
+        self._read()
+        return sim.robot.yawRate if axis is ZAXIS else 0.0
+
+    def acceleration(self, axis=XAXIS) -> float:
+        # In g; the Y axis points out of the front of the robot
+        self._read()
+        return sim.robot.accel / 9806.65 if axis is YAXIS else 0.0
+
+    def orientation(self, axis=YAW, units=DEGREES) -> float:
+        self._read()
+        if axis is YAW:
+            y = self.heading()
+            return y - 360.0 if y > 180.0 else y
+        return 0.0
+
+class Pneumatic(_Device):
+    def __init__(self, port):
+        super().__init__(port)
+        self.pumping = False
+        self.extended = [False, False]
+
+    def pump_on(self):
+        self._write()
+        self.pumping = True
+
+    def pump_off(self):
+        self._write()
+        self.pumping = False
+
+    def pump(self, state: bool):
+        self._write()
+        self.pumping = bool(state)
+
+    def extend(self, cylinder=CylinderType.CYLINDERALL):
+        self._write()
+        self._set(cylinder, True)
+
+    def retract(self, cylinder=CylinderType.CYLINDERALL):
+        self._write()
+        self._set(cylinder, False)
+
+    def _set(self, cylinder, value: bool):
+        if cylinder is CylinderType.CYLINDERALL:
+            self.extended = [value, value]
+        else:
+            self.extended[int(cylinder)] = value
+        sim.field.hugging = not any(self.extended)
+
+class _Pressable:
+    # Shared pressed/released callbacks, fired from the physics step
+    def _initPressable(self):
+        self._pressedCallbacks = []
+        self._releasedCallbacks = []
+        self._down = False
+
+    def pressed(self, callback, args=()):
+        self._pressedCallbacks.append((callback, tuple(args)))
+
+    def released(self, callback, args=()):
+        self._releasedCallbacks.append((callback, tuple(args)))
+
+    def _setDown(self, down: bool):
+        if down == self._down: return
+        self._down = down
+        for callback, args in (self._pressedCallbacks if down else self._releasedCallbacks):
+            sim.spawn(callback, args)
+
+class Bumper(_Device, _Pressable):
+    def __init__(self, port):
+        super().__init__(port)
+        self._initPressable()
+
+    def pressing(self) -> bool:
+        self._read()
+        return self._down
+
+class Touchled(_Device, _Pressable):
+    def __init__(self, port):
+        super().__init__(port)
+        self._initPressable()
+        self.color = None
+        self.brightness = 100
+
+    def set_color(self, color):
+        self._write()
+        self.color = color
+
+    def set_brightness(self, value: int):
+        self._write()
+        self.brightness = value
+
+    def set_fade(self, fadeType=None):
+        self._write()
+
+    def on(self, color=None, brightness: int = 100):
+        self._write()
+        if color is not None: self.color = color
+        self.brightness = brightness
+
+    def off(self):
+        self._write()
+        self.brightness = 0
+
+    def pressing(self) -> bool:
+        self._read()
+        return self._down
+
+class _Screen:
+    def __init__(self):
+        self.line = ""
+        self.row = 1
+        self.col = 1
+
+    def _op(self):
+        sim.screenOps += 1
+        sim.busy(sim.config.screenOpSecs)
+
+    def print(self, *args, sep: str = " "):
+        self._op()
+        self.line += sep.join(str(a) for a in args)
+
+    def new_line(self):
+        self._op()
+        sim.screenLines.append((sim.now, self.line))
+        if sim.config.echoScreen: _sys.stdout.write("[{:7.3f}] {}\n".format(sim.now, self.line))
+        self.line = ""
+        self.row += 1
+
+    def next_row(self):
+        self.new_line()
+
+    def print_at(self, *args, x: int = 0, y: int = 0, sep: str = " ", opaque: bool = True):
+        self._op()
+        text = sep.join(str(a) for a in args)
+        sim.screenLines.append((sim.now, text))
+        if sim.config.echoScreen: _sys.stdout.write("[{:7.3f}] @{},{} {}\n".format(sim.now, x, y, text))
+
+    def set_cursor(self, row: int, col: int):
+        self._op()
+        self.row, self.col = row, col
+
+    def column(self) -> int:
+        return self.col
+
+    def row_(self) -> int:
+        return self.row
+
+    def clear_screen(self, color=None):
+        self._op()
+        self.line = ""
+        self.row = 1
+
+    def clear_row(self, row: int = None, color=None):
+        self._op()
+
+    def clear_line(self, row: int = None, color=None):
+        self._op()
+
+    def set_font(self, fontType):
+        self._op()
+
+    def set_pen_width(self, width: int):
+        self._op()
+
+    def set_pen_color(self, color):
+        self._op()
+
+    def set_fill_color(self, color):
+        self._op()
+
+    def set_origin(self, x: int, y: int):
+        self._op()
+
+    def draw_pixel(self, x: int, y: int):
+        self._op()
+
+    def draw_line(self, x1: int, y1: int, x2: int, y2: int):
+        self._op()
+
+    def draw_rectangle(self, x: int, y: int, width: int, height: int, color=None):
+        self._op()
+
+    def draw_circle(self, x: int, y: int, radius: int, color=None):
+        self._op()
+
+    def render(self):
+        self._op()
+        return True
+
+class _Button(_Pressable):
+    def __init__(self, name: str):
+        self.name = name
+        self._initPressable()
+
+    def pressing(self) -> bool:
+        return self._down
+
+    def press(self):
+        # Host hook: a full press and release
+        self._setDown(True)
+        self._setDown(False)
+
+class _Timer:
+    def __init__(self):
+        self.start = 0.0
+
+    def time(self, units=MSEC) -> float:
+        return _fromSeconds(sim.clock() - self.start, units)
+
+    def value(self) -> float:
+        return sim.clock() - self.start
+
+    def clear(self):
+        self.start = sim.clock()
+
+    def reset(self):
+        self.start = sim.clock()
+
+    def system(self) -> int:
+        return int(sim.clock() * 1000)
+
+    def system_high_res(self) -> int:
+        return int(sim.clock() * 1000000)
+
+    def event(self, callback, delay: int, args=()):
+        def fire():
+            sim.sleep(delay / 1000.0)
+            callback(*args)
+        sim.spawn(fire, (), "timer")
+
+class _Battery:
+    def capacity(self) -> int:
+        return 100
+
+    def voltage(self, units=None) -> float:
+        return 7.6
+
+    def current(self, units=None) -> float:
+        return sum(m.amps for m in sim.motors)
+
+class Brain:
+    def __init__(self):
+        self.screen = _Screen()
+        self.timer = _Timer()
+        self.battery = _Battery()
+        self.buttonLeft = _Button("buttonLeft")
+        self.buttonRight = _Button("buttonRight")
+        self.buttonCheck = _Button("buttonCheck")
+        sim.brain = self
+
+    def play_sound(self, sound, volume: int = 50):
+        sim.sounds.append((sim.now, sound))
+
+    def play_note(self, octave: int, note: int, duration: int = 500):
+        pass
+
+    def program_stop(self):
+        raise _Killed()
+
+class DriveTrain:
+    def __init__(self, lm: Motor, rm: Motor, wheelTravel: float = 200, trackWidth: float = 176,
+                 wheelBase: float = 176, units=MM, externalGearRatio: float = 1.0):
+        self.lm = lm
+        self.rm = rm
+        self.wheelTravel = _toMM(wheelTravel, units)
+        self.trackWidth = _toMM(trackWidth, units)
+        self.externalGearRatio = externalGearRatio
+        self.velocityPct = 50.0
+
+    def set_drive_velocity(self, velocity: float, units=PERCENT):
+        self.velocityPct = float(velocity)
+
+    def set_turn_velocity(self, velocity: float, units=PERCENT):
+        self.velocityPct = float(velocity)
+
+    def set_stopping(self, mode):
+        self.lm.set_stopping(mode)
+        self.rm.set_stopping(mode)
+
+    def set_timeout(self, value: float, units=MSEC):
+        self.lm.set_timeout(value, units)
+        self.rm.set_timeout(value, units)
+
+    def drive(self, direction, velocity: float = None, units=PERCENT):
+        self.lm.spin(direction, velocity if velocity is not None else self.velocityPct, units)
+        self.rm.spin(direction, velocity if velocity is not None else self.velocityPct, units)
+
+    def drive_for(self, direction, distance: float, units=MM, velocity: float = None,
+                  units_v=PERCENT, wait: bool = True):
+        turns = _toMM(distance, units) / self.wheelTravel * self.externalGearRatio
+        if velocity is not None:
+            self.lm.set_velocity(velocity, units_v)
+            self.rm.set_velocity(velocity, units_v)
+        self.lm.spin_for(direction, turns, TURNS, wait=False)
+        return self.rm.spin_for(direction, turns, TURNS, wait=wait)
+
+    def turn_for(self, direction, angle: float, units=DEGREES, velocity: float = None,
+                 units_v=PERCENT, wait: bool = True):
+        arc = _math.pi * self.trackWidth * angle / 360.0
+        turns = arc / self.wheelTravel * self.externalGearRatio
+        right = direction is RIGHT
+        if velocity is not None:
+            self.lm.set_velocity(velocity, units_v)
+            self.rm.set_velocity(velocity, units_v)
+        self.lm.spin_for(FORWARD if right else REVERSE, turns, TURNS, wait=False)
+        return self.rm.spin_for(REVERSE if right else FORWARD, turns, TURNS, wait=wait)
+
+    def stop(self, mode=None):
+        self.lm.stop(mode)
+        self.rm.stop(mode)
+
+    def is_done(self) -> bool:
+        return self.lm.is_done() and self.rm.is_done()
+
+    def is_moving(self) -> bool:
+        return not self.is_done()
+
+_hidden = ("sim", "Simulator", "SimConfig", "SimTimeout")
+__all__ = [n for n in list(globals()) if not n.startswith("_") and n not in _hidden]
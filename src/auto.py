@@ -1,68 +1,839 @@
 #AXOBOTL Python Code
 # Extreme Axolotls Robotics team 4028X for 2023-2024 VEX IQ Full Volume Challenge
 from vex import *
-import time
+from array import array
+import math
+
+consolePrint = print  # The real print(), for the connected console. print() below writes to the brain screen.
 
 # The Eye class is useful for us
 # Represents a Distance sensor that broadcasts if it "sees" an object
 
 class Eye:
-    def __init__(self, portNumber: int, distanceThreshold: int, units: DistanceUnits.DistanceUnits = DistanceUnits.MM):
-        self.sensor = Distance(portNumber)
-        self.distanceThreshold: int = distanceThreshold
+    def __init__(self, portNumber: int, distanceThreshold: int, units: DistanceUnits.DistanceUnits = DistanceUnits.MM,
+                 exitDistance: int = 0, debounce: int = 1, activeMs: int = 10, idleMs: int = 100):
+        self.device = Lazy("eye{}".format(portNumber), lambda: Distance(portNumber))
+        self.distanceThreshold: int = distanceThreshold  # Seen once this close...
+        self.exitDistance: int = exitDistance or distanceThreshold * 1.25  # ...lost once farther than this
+        self.debounce: int = debounce  # Samples in a row that must agree before we believe a change
         self.units = units
+        self.activeMs: int = activeMs  # Poll period while something can change what we see
+        self.idleMs: int = idleMs
+        self.periodMs: int = idleMs
+        self.stamp: float = -1000.0
+        self.samples: int = 0
+        self.visible: bool = False
+        self.pending: int = 0
         self.seen: bool = False  # Variables keep us from broadcast()-ing repeatedly
         self.lost: bool = False
         self.eventSeen = None
         self.eventLost = None
+        self.queue = None  # Or post edges to an EventQueue, see postTo()
+        self.seenEvent: int = 0
+        self.lostEvent: int = 0
+        self.installed: bool = False  # Last sample, see Sensors
+        self.distance: float = 0.0
+
+    def __getattr__(self, name):
+        if name == "sensor":
+            # First use: build the Distance sensor, then it's a plain attribute
+            self.sensor = self.device.get()
+            return self.sensor
+        raise AttributeError(name)
 
     def setCallbacks(self, callbackSeen, callbackLost):
         self.eventSeen = Event(callbackSeen)
         self.eventLost = Event(callbackLost)
 
+    def postTo(self, queue, seenEvent: int, lostEvent: int):
+        self.queue = queue
+        self.seenEvent = seenEvent
+        self.lostEvent = lostEvent
+
+    def setActive(self, active: bool):
+        self.periodMs = self.activeMs if active else self.idleMs
+
+    def isDue(self, now: float) -> bool:
+        return now - self.stamp >= self.periodMs * 0.8  # Same early-wake slack as Sensors
+
+    def sample(self, now: float, checkInstalled: bool = True) -> int:
+        # Only Sensors calls this. Everyone else reads the sampled values.
+        # Returns how many smart-port reads it took.
+        reads = 0
+        if checkInstalled:
+            self.installed = self.sensor.installed()
+            reads += 1
+        if self.installed:
+            self.distance = self.sensor.object_distance(self.units)
+            reads += 1
+            self.settle()
+        self.stamp = now
+        self.samples += 1
+        return reads
+
+    def settle(self):
+        # Between the two distances nothing changes, so a ball sitting right
+        # at the edge can't flicker seen/lost/seen
+        if self.visible:
+            changing = self.distance > self.exitDistance
+        else:
+            changing = self.distance <= self.distanceThreshold
+        if not changing:
+            self.pending = 0
+            return
+        self.pending += 1
+        if self.pending >= self.debounce:
+            self.visible = not self.visible
+            self.pending = 0
+
     def isObjectVisible(self) -> bool:
-        return True if self.sensor.object_distance(self.units) <= self.distanceThreshold else False
+        return self.visible
     
     def look(self) -> bool:
-        if self.sensor.installed():
+        if self.installed:
             if self.isObjectVisible():
                 if not self.seen:
                     self.seen = True
                     self.lost = False
                     if self.eventSeen: self.eventSeen.broadcast()
+                    if self.queue: self.queue.post(self.seenEvent)
                     return True
             else:
                 if not self.lost:
                     self.seen = False
                     self.lost = True
                     if self.eventLost: self.eventLost.broadcast()
+                    if self.queue: self.queue.post(self.lostEvent)
         return False
 
+# The CachedMotor class remembers what it last told the motor
+# Every setting and spin/stop goes over the smart port, so sending the same
+# velocity every tick (or max torque that setup() already set) just adds bus
+# traffic and delays the other side of the drivetrain. Commands that repeat
+# the last one are dropped here. Moves the motor finishes by itself
+# (spin_for, spin_to_position) are always sent and forget the last spin/stop.
+# Anything not wrapped here goes straight to the motor.
+# The motor only takes whole rpm, so velocities are compared at that resolution.
+
+MOTOR_RPM_PER_PERCENT = 1.2  # 120 rpm smart motor
+
+class CachedMotor:
+    writes: int = 0  # For all motors
+    saved: int = 0
+
+    def __init__(self, device):
+        self.device = device  # A Lazy Motor: self.motor appears the first time it's needed
+        self.invalidate()
+
+    def invalidate(self):
+        # Forget everything, e.g. after something else drove the motor directly
+        self.lastVelocity = None
+        self.lastStopping = None
+        self.lastTorque = None
+        self.lastTimeout = None
+        self.lastMotion = None  # ("spin", direction, speedKey) or ("stop", mode)
+
+    def speedKey(self, velocity, units):
+        if units == PERCENT: return (units, round(velocity * MOTOR_RPM_PER_PERCENT))
+        if units == RPM: return (units, round(velocity))
+        return (units, velocity)
+
+    def changed(self, old, new) -> bool:
+        if old == new:
+            CachedMotor.saved += 1
+            return False
+        CachedMotor.writes += 1
+        return True
+
+    def set_velocity(self, velocity, units = PERCENT):
+        value = self.speedKey(velocity, units)
+        if self.changed(self.lastVelocity, value):
+            self.motor.set_velocity(velocity, units)
+            self.lastVelocity = value
+
+    def set_stopping(self, mode):
+        if self.changed(self.lastStopping, mode):
+            self.motor.set_stopping(mode)
+            self.lastStopping = mode
+            if self.lastMotion == ("stop", None): self.lastMotion = None  # Now means something else
+
+    def set_max_torque(self, value, units = PERCENT):
+        torque = (value, units)
+        if self.changed(self.lastTorque, torque):
+            self.motor.set_max_torque(value, units)
+            self.lastTorque = torque
+
+    def set_timeout(self, value, units = MSEC):
+        timeout = (value, units)
+        if self.changed(self.lastTimeout, timeout):
+            self.motor.set_timeout(value, units)
+            self.lastTimeout = timeout
+
+    def spin(self, direction, velocity = None, units = PERCENT):
+        motion = ("spin", direction, None if velocity is None else self.speedKey(velocity, units))
+        if self.changed(self.lastMotion, motion):
+            if velocity is None: self.motor.spin(direction)
+            else:
+                self.motor.spin(direction, velocity, units)
+                self.lastVelocity = None  # Not sure the motor keeps it as its velocity
+            self.lastMotion = motion
+
+    def stop(self, mode = None):
+        motion = ("stop", mode)
+        if self.changed(self.lastMotion, motion):
+            if mode is None: self.motor.stop()
+            else: self.motor.stop(mode)
+            self.lastMotion = motion
+
+    def spin_for(self, *args, **kwargs):
+        CachedMotor.writes += 1
+        self.lastMotion = None
+        self.lastVelocity = None
+        return self.motor.spin_for(*args, **kwargs)
+
+    def spin_to_position(self, *args, **kwargs):
+        CachedMotor.writes += 1
+        self.lastMotion = None
+        self.lastVelocity = None
+        return self.motor.spin_to_position(*args, **kwargs)
+
+    # The reads we use every tick, without the __getattr__ detour
+    def position(self, units = DEGREES):
+        return self.motor.position(units)
+
+    def velocity(self, units = PERCENT):
+        return self.motor.velocity(units)
+
+    def current(self, units = CurrentUnits.AMP):
+        return self.motor.current(units)
+
+    def is_done(self) -> bool:
+        return self.motor.is_done()
+
+    def __getattr__(self, name):
+        if name == "motor":
+            # First use: build it, and from then on it's a plain attribute
+            self.motor = self.device.get()
+            return self.motor
+        return getattr(self.motor, name)
+
+# The Lazy class stands in for a device until something first uses it
+# Building a device talks to the brain, so building them all at import slowed
+# boot down and meant nothing could import this file without a robot attached.
+# Every device is registered in DEVICES by name, so the robot's configuration
+# is in one place and we can see what has actually been built. A device kept
+# in a global of the same name replaces its Lazy there once it's built, so hot
+# paths call the device itself rather than going through __getattr__.
+
+DEVICES = {}
+
+class Lazy:
+    def __init__(self, name: str, make):
+        self.name = name
+        self.make = make
+        self.device = None
+        DEVICES[name] = self
+
+    def get(self):
+        if self.device is None:
+            self.device = self.make()
+            if globals().get(self.name) is self: globals()[self.name] = self.device
+        return self.device
+
+    def isBuilt(self) -> bool:
+        return self.device is not None
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
 # Setup
-brain = Brain()
-inertial = Inertial()
-
-wheelLeft = Motor(Ports.PORT7, 2.0, True)  # Gear ratio: 2:1
-wheelRight = Motor(Ports.PORT12, 2.0, False)
-intakeEye = Eye(Ports.PORT6, 80, MM)
-topEye = Eye(Ports.PORT5, 35, MM)
-catEye = Eye(Ports.PORT2, 80, MM)
-catBeltLeft = Motor(Ports.PORT3)
-catBeltRight = Motor(Ports.PORT11,True)
-intakeLeft = Motor(Ports.PORT4, True)
-intakeRight = Motor(Ports.PORT1)
-ledLeft = Touchled(Ports.PORT10)
-ledRight = Touchled(Ports.PORT9)
-buttBumper = Bumper(Ports.PORT8)
-ballHugger = Pneumatic(Ports.PORT10)
-screenColor: Color.DefinedColor = Color.BLUE
-penColor: Color.DefinedColor = Color.WHITE
+brain = Brain()  # Everything needs its timer, so not lazy
+inertial = Lazy("inertial", lambda: Inertial())
+
+wheelLeft = CachedMotor(Lazy("wheelLeft", lambda: Motor(Ports.PORT7, 2.0, True)))  # Gear ratio: 2:1
+wheelRight = CachedMotor(Lazy("wheelRight", lambda: Motor(Ports.PORT12, 2.0, False)))
+# catEye stops the wind, so it reacts on the first sample
+intakeEye = Eye(Ports.PORT6, 80, MM, exitDistance=100, debounce=2, idleMs=50)
+topEye = Eye(Ports.PORT5, 35, MM, exitDistance=45, debounce=2, idleMs=50)
+catEye = Eye(Ports.PORT2, 80, MM, exitDistance=100, debounce=1, idleMs=100)
+catBeltLeft = CachedMotor(Lazy("catBeltLeft", lambda: Motor(Ports.PORT3)))
+catBeltRight = CachedMotor(Lazy("catBeltRight", lambda: Motor(Ports.PORT11,True)))
+intakeLeft = CachedMotor(Lazy("intakeLeft", lambda: Motor(Ports.PORT4, True)))
+intakeRight = CachedMotor(Lazy("intakeRight", lambda: Motor(Ports.PORT1)))
+ledLeft = Lazy("ledLeft", lambda: Touchled(Ports.PORT10))
+ledRight = Lazy("ledRight", lambda: Touchled(Ports.PORT9))
+buttBumper = Lazy("buttBumper", lambda: Bumper(Ports.PORT8))
+ballHugger = Lazy("ballHugger", lambda: Pneumatic(Ports.PORT10))
+# DriveTrain talks to the motors directly: invalidate() the caches after using it
+driveTrain = Lazy("driveTrain", lambda: DriveTrain(wheelLeft.motor,
+                                                   wheelRight.motor,
+                                                   wheelTravel= 145,
+                                                   trackWidth=246,
+                                                   wheelBase=200,
+                                                   units=DistanceUnits.MM,
+                                                   externalGearRatio=2))  # TODO: Is this correct?
 catBeltRunning: bool = False
 intakeRunning: bool = False
-cancelGoStraight: bool = False
 isContinuousCallback = None
 
-wait(15, MSEC)  # Allow events and everything else to initialize
+# The Sensors class is a snapshot of the sensors, read at most once per tick
+# Every decision made in the same tick sees the same data, and each device
+# costs one smart-port read per tick no matter how many places look at it.
+
+class Sensors:
+    def __init__(self, eyes, tickMs: int = 10, installedEveryTicks: int = 50):
+        self.eyes = eyes
+        self.tickMs = tickMs
+        # Loops wake a little early or late, so anything older than most of a
+        # tick counts as stale. Still only one read per tick between loops.
+        self.staleMs = tickMs * 0.8
+        self.installedEveryTicks = installedEveryTicks  # Re-check unplugged eyes now and then
+        self.driveStamp: float = -1000.0
+        self.reads: int = 0  # Smart-port reads, for the profiler
+        self.heading: float = 0.0
+        self.rotation: float = 0.0
+        self.leftRevs: float = 0.0
+        self.rightRevs: float = 0.0
+
+    def refreshEyes(self, force: bool = False):
+        # Each eye has its own poll period, see Eye.setActive()
+        now = brain.timer.time(MSEC)
+        for eye in self.eyes:
+            if force or eye.isDue(now):
+                self.reads += eye.sample(now, eye.samples % self.installedEveryTicks == 0)
+
+    def refreshDrive(self, force: bool = False):
+        now = brain.timer.time(MSEC)
+        if force or now - self.driveStamp >= self.staleMs:
+            self.heading = inertial.heading()
+            self.rotation = inertial.rotation()
+            self.leftRevs = wheelLeft.position(RotationUnits.REV)
+            self.rightRevs = wheelRight.position(RotationUnits.REV)
+            self.driveStamp = now
+            self.reads += 4
+
+    def refresh(self, force: bool = False):
+        self.refreshEyes(force)
+        self.refreshDrive(force)
+
+    def revolutions(self) -> float:
+        return (self.leftRevs + self.rightRevs) / 2.0
+
+    # The catapult belt is only read when a command asks, so these go straight
+    # to the motor; they're here so every read gets counted
+    def catPosition(self) -> float:
+        self.reads += 1
+        return catBeltLeft.position(DEGREES)
+
+    def catDone(self) -> bool:
+        self.reads += 1
+        return catBeltLeft.is_done()
+
+    def catAmps(self) -> float:
+        self.reads += 1
+        return catBeltLeft.current()
+
+sensors = Sensors([intakeEye, topEye, catEye])
+
+# The Telemetry class records raw numbers every tick and formats them later
+# Storage is allocated once, by the first record(), so record() in a control
+# loop never builds strings or grows the heap after that. Once full, the oldest
+# samples are overwritten. With both switches below off nothing is recorded
+# and no storage is allocated at all.
+# The first column is always the time in ms since begin().
+
+DEBUG_TELEMETRY = False  # Dump each move's samples to the console when it ends
+TRACE_TELEMETRY = False  # Write each move as a binary trace for sim/replay.py
+
+class Telemetry:
+    def __init__(self, name: str, fields, capacity: int = 400):
+        self.name = name
+        self.fields = ("ms",) + tuple(fields)
+        self.width = len(self.fields)
+        self.capacity = capacity
+        self.samples = None  # Allocated by the first record()
+        self.count = 0
+        self.startTime = 0.0
+        self.params = ()
+
+    def begin(self, *params):
+        # params are the move's settings, kept with the trace so it can be replayed
+        self.count = 0
+        self.startTime = brain.timer.time(MSEC)
+        self.params = params
+
+    def record(self, a=0.0, b=0.0, c=0.0, d=0.0, e=0.0, f=0.0, g=0.0, h=0.0):
+        # Up to 8 values; extra arguments beyond len(fields) are ignored
+        if not (DEBUG_TELEMETRY or TRACE_TELEMETRY): return
+        w = self.width
+        i = (self.count % self.capacity) * w
+        s = self.samples
+        if s is None: s = self.samples = array("f", [0.0] * (self.capacity * w))
+        s[i] = brain.timer.time(MSEC) - self.startTime
+        if w > 1: s[i + 1] = a
+        if w > 2: s[i + 2] = b
+        if w > 3: s[i + 3] = c
+        if w > 4: s[i + 4] = d
+        if w > 5: s[i + 5] = e
+        if w > 6: s[i + 6] = f
+        if w > 7: s[i + 7] = g
+        if w > 8: s[i + 8] = h
+        self.count += 1
+
+    def size(self) -> int:
+        return min(self.count, self.capacity)
+
+    def row(self, n: int):
+        # n = 0 is the oldest sample still held
+        first = self.count - self.size()
+        i = ((first + n) % self.capacity) * self.width
+        return self.samples[i:i + self.width]
+
+    def last(self, column: int) -> float:
+        if self.count == 0: return 0.0
+        return self.samples[((self.count - 1) % self.capacity) * self.width + column]
+
+    def dump(self, every: int = 1, out = None):
+        # Formatting happens here, after the fact. every=N prints every Nth sample.
+        out = out or consolePrint
+        out("{} ({} of {} samples)".format(self.name, self.size(), self.count))
+        out(", ".join(self.fields))
+        for n in range(0, self.size(), every):
+            out(", ".join("{:.2f}".format(v) for v in self.row(n)))
+
+    def trace(self, out = None):
+        # The IQ brain has nowhere to save a file, so the trace goes to the
+        # console: one header line, then each row's raw float32 bytes as hex.
+        # The header ends with how many samples were recorded, so a move that
+        # outgrew the buffer shows up as truncated rather than complete.
+        out = out or consolePrint
+        out("#TRACE {} {} {} {} {}".format(self.name, ",".join(self.fields), self.size(),
+                                           ",".join("{}".format(p) for p in self.params), self.count))
+        for n in range(self.size()):
+            out("".join("{:02x}".format(b) for b in bytes(self.row(n))))
+        out("#END")
+
+    def finish(self):
+        # Called when a move ends
+        if DEBUG_TELEMETRY: self.dump()
+        if TRACE_TELEMETRY: self.trace()
+
+driveLog = Telemetry("goStraight", ("left", "right", "yawErr", "adjust", "target", "vLeft", "vRight"))
+turnLog = Telemetry("goTurn", ("rotation", "error", "velocity", "target"))
+curveLog = Telemetry("goCurve", ("angleErr", "revs", "speed", "correction", "target", "vLeft", "vRight"))
+pathLog = Telemetry("goPath", ("closest", "lookahead", "curvature", "speed", "left", "right"))
+charLog = Telemetry("characterize", ("command", "vLeft", "vRight"))
+
+# Profiling: how long each control loop iteration and callback takes.
+# Off by default and then free: enable() swaps timed wrappers in for the
+# methods listed in PROFILE_POINTS (end of file), so nothing is wrapped at all
+# until someone asks. Each call then costs two timer reads and a few compares.
+
+PROFILING = False  # run() turns the profiler on. Cheap enough to leave on in matches.
+PROFILE_BUCKETS_US = (100, 250, 500, 1000, 2000, 5000, 10000)  # Upper bounds; one more bucket for longer
+
+# The Histogram class counts durations into fixed buckets (no samples kept)
+
+class Histogram:
+    def __init__(self, name: str):
+        self.name = name
+        self.counts = array("L", [0] * (len(PROFILE_BUCKETS_US) + 1))
+        self.calls = 0
+        self.totalUs = 0
+        self.worstUs = 0
+
+    def record(self, us: int):
+        self.calls += 1
+        self.totalUs += us
+        if us > self.worstUs: self.worstUs = us
+        i = 0
+        for bound in PROFILE_BUCKETS_US:
+            if us <= bound: break
+            i += 1
+        self.counts[i] += 1
+
+    def report(self) -> str:
+        average = self.totalUs / self.calls if self.calls else 0.0
+        buckets = " ".join("<{}:{}".format(b, c) for b, c in zip(PROFILE_BUCKETS_US, self.counts) if c)
+        if self.counts[-1]: buckets += " more:{}".format(self.counts[-1])
+        return "{}: {} calls, {:.0f}us avg, {}us worst | {}".format(
+            self.name, self.calls, average, self.worstUs, buckets)
+
+# The Measure class times a block: with profiler.measure("name"): ...
+# With profiling off it is the shared NOT_MEASURED, which doesn't read the clock
+
+class Measure:
+    def __init__(self, histogram):
+        self.histogram = histogram
+        self.start = 0
+
+    def __enter__(self):
+        if self.histogram: self.start = brain.timer.system_high_res()
+        return self
+
+    def __exit__(self, *exception):
+        if self.histogram: self.histogram.record(brain.timer.system_high_res() - self.start)
+        return False
+
+NOT_MEASURED = Measure(None)
+
+# The Profiler class owns the histograms and the bus counters
+
+class Profiler:
+    def __init__(self):
+        self.histograms = {}
+        self.enabled = False
+        self.originals = []  # (owner, attribute, original) to put back in disable()
+
+    def histogram(self, name: str) -> Histogram:
+        if name not in self.histograms: self.histograms[name] = Histogram(name)
+        return self.histograms[name]
+
+    def measure(self, name: str):
+        return Measure(self.histogram(name)) if self.enabled else NOT_MEASURED
+
+    def timed(self, function, name: str):
+        histogram = self.histogram(name)
+        clock = brain.timer.system_high_res
+        def wrapper(*args):
+            start = clock()
+            result = function(*args)
+            histogram.record(clock() - start)
+            return result
+        return wrapper
+
+    def enable(self):
+        if self.enabled: return
+        self.enabled = True
+        for owner, attribute, name in PROFILE_POINTS:
+            # owner None means a function in this file
+            original = globals()[attribute] if owner is None else getattr(owner, attribute)
+            self.originals.append((owner, attribute, original))
+            if owner is None: globals()[attribute] = self.timed(original, name)
+            else: setattr(owner, attribute, self.timed(original, name))
+
+    def disable(self):
+        for owner, attribute, original in self.originals:
+            if owner is None: globals()[attribute] = original
+            else: setattr(owner, attribute, original)
+        self.originals = []
+        self.enabled = False
+
+    def report(self, out = None):
+        out = out or consolePrint
+        for name in sorted(self.histograms):
+            if self.histograms[name].calls: out(self.histograms[name].report())
+        out("bus: {} sensor reads, {} motor writes ({} not sent)".format(
+            sensors.reads, CachedMotor.writes, CachedMotor.saved))
+
+    def show(self):
+        # The worst offenders on the brain screen: name, average and worst in ms
+        clearScreen(Color.BLACK, Color.WHITE)
+        ranked = sorted(self.histograms.values(), key=lambda h: -h.worstUs)
+        for h in ranked[:SCREEN_LINES]:
+            if h.calls: print("{} {:.1f}/{:.1f}".format(h.name[:9], h.totalUs / h.calls / 1000.0, h.worstUs / 1000.0))
+
+profiler = Profiler()
+
+# Commands do a little work every scheduler tick instead of blocking, so the
+# intake, the catapult and the drive can all be busy at the same time.
+# A command lists the subsystems it needs ("drive", "cat", "intake") in requires;
+# two commands that need the same subsystem never run at once.
+# Vex threads only switch at wait(), so none of this needs locks.
+
+class Command:
+    requires = ()
+
+    def init(self):
+        pass
+
+    def execute(self):
+        pass
+
+    def isFinished(self) -> bool:
+        return True
+
+    def end(self, interrupted: bool):
+        pass
+
+    def withTimeout(self, ms: int):
+        return Race(self, Delay(ms))
+
+class Instant(Command):
+    def __init__(self, callback, requires = ()):
+        self.callback = callback
+        self.requires = requires
+
+    def init(self):
+        self.callback()
+
+class Delay(Command):
+    def __init__(self, ms: int):
+        self.ms = ms
+        self.startTime = 0.0
+
+    def init(self):
+        self.startTime = brain.timer.time(MSEC)
+
+    def isFinished(self) -> bool:
+        return brain.timer.time(MSEC) - self.startTime >= self.ms
+
+class When(Command):
+    # Runs command only if condition() is true when we get to it
+    def __init__(self, condition, command: Command):
+        self.condition = condition
+        self.command = command
+        self.requires = command.requires
+        self.active = False
+
+    def init(self):
+        self.active = self.condition()
+        if self.active: self.command.init()
+
+    def execute(self):
+        if self.active: self.command.execute()
+
+    def isFinished(self) -> bool:
+        return not self.active or self.command.isFinished()
+
+    def end(self, interrupted: bool):
+        if self.active: self.command.end(interrupted)
+
+def requirementsOf(commands):
+    requires = []
+    for command in commands:
+        for r in command.requires:
+            if r not in requires: requires.append(r)
+    return tuple(requires)
+
+def sharesRequirement(a, b) -> bool:
+    for r in a:
+        if r in b: return True
+    return False
+
+class Sequence(Command):
+    def __init__(self, *commands):
+        self.commands = commands
+        self.requires = requirementsOf(commands)
+        self.index = 0
+
+    def init(self):
+        self.index = 0
+        if self.commands: self.commands[0].init()
+
+    def execute(self):
+        # Chain straight into the next command so steps don't each cost a tick
+        while self.index < len(self.commands):
+            command = self.commands[self.index]
+            command.execute()
+            if not command.isFinished():
+                return
+            command.end(False)
+            self.index += 1
+            if self.index < len(self.commands): self.commands[self.index].init()
+
+    def isFinished(self) -> bool:
+        return self.index >= len(self.commands)
+
+    def end(self, interrupted: bool):
+        if interrupted and self.index < len(self.commands):
+            self.commands[self.index].end(True)
+
+class Parallel(Command):
+    # Finishes when every command has finished
+    def __init__(self, *commands):
+        self.commands = commands
+        self.requires = requirementsOf(commands)
+        self.running = []
+
+    def init(self):
+        self.running = list(self.commands)
+        for command in self.running:
+            command.init()
+
+    def execute(self):
+        for command in list(self.running):
+            command.execute()
+            if command.isFinished():
+                command.end(False)
+                self.running.remove(command)
+
+    def isFinished(self) -> bool:
+        return not self.running
+
+    def end(self, interrupted: bool):
+        for command in self.running:
+            command.end(True)
+        self.running = []
+
+class Race(Parallel):
+    # Finishes as soon as any command finishes, interrupting the rest
+    def isFinished(self) -> bool:
+        return len(self.running) < len(self.commands)
+
+# The PeriodicLoop class runs a loop at a fixed rate
+# It waits until the next deadline rather than for a fixed time after the work,
+# so the period doesn't stretch by however long the work took. dt is the time
+# actually measured since the last tick, for controllers that integrate.
+# A tick that starts after its deadline is an overrun; if we're a whole period
+# behind we skip ahead instead of running a burst of catch-up ticks.
+
+class PeriodicLoop:
+    def __init__(self, name: str, periodMs: int):
+        self.name = name
+        self.periodMs = periodMs
+        self.deadline = 0.0
+        self.lastTick = 0.0
+        self.dt: float = periodMs / 1000.0  # Seconds
+        self.ticks: int = 0
+        self.overruns: int = 0
+        self.skipped: int = 0
+        self.worstLateMs: float = 0.0
+        self.started = False
+
+    def start(self):
+        now = brain.timer.time(MSEC)
+        self.deadline = now + self.periodMs
+        self.lastTick = now
+        self.started = True
+
+    def wait(self):
+        if not self.started: self.start()
+        now = brain.timer.time(MSEC)
+        late = now - self.deadline
+        if late < 0:
+            wait(-late, MSEC)
+        else:
+            self.overruns += 1
+            if late > self.worstLateMs: self.worstLateMs = late
+            if late >= self.periodMs:
+                missed = int(late // self.periodMs)
+                self.skipped += missed
+                self.deadline += missed * self.periodMs
+        self.deadline += self.periodMs
+        now = brain.timer.time(MSEC)
+        self.dt = (now - self.lastTick) / 1000.0
+        self.lastTick = now
+        self.ticks += 1
+
+    def report(self) -> str:
+        return "{}: {} ticks, {} overruns, {} skipped, worst {:.1f}ms late".format(
+            self.name, self.ticks, self.overruns, self.skipped, self.worstLateMs)
+
+# The EventQueue class is a fixed-size queue of (event, time) for one reader
+# Posting never blocks or allocates. If the reader falls behind, the oldest
+# events are dropped (and counted) so the newest state always gets through.
+
+class EventQueue:
+    def __init__(self, capacity: int = 16):
+        self.capacity = capacity
+        self.events = array("b", [0] * capacity)
+        self.times = array("f", [0.0] * capacity)
+        self.head = 0
+        self.count = 0
+        self.dropped = 0
+
+    def post(self, event: int):
+        if self.count == self.capacity:
+            self.head = (self.head + 1) % self.capacity
+            self.count -= 1
+            self.dropped += 1
+        i = (self.head + self.count) % self.capacity
+        self.events[i] = event
+        self.times[i] = brain.timer.time(MSEC)
+        self.count += 1
+
+    def isEmpty(self) -> bool:
+        return self.count == 0
+
+    def take(self):
+        # Returns (event, ms when posted); check isEmpty() first
+        i = self.head
+        self.head = (self.head + 1) % self.capacity
+        self.count -= 1
+        return self.events[i], self.times[i]
+
+# Events for the scheduler thread, from threads that mustn't drive motors themselves
+SCHED_STOP_ALL = 0  # Cancel everything and stop the mechanisms
+
+class Scheduler:
+    def __init__(self, tickMs: int = 10):
+        self.tickMs = tickMs
+        self.commands = []
+        self.events = EventQueue(4)
+        self.loop = PeriodicLoop("scheduler", tickMs)
+
+    def isBusy(self, requires) -> bool:
+        for command in self.commands:
+            if sharesRequirement(command.requires, requires): return True
+        return False
+
+    def schedule(self, command: Command, interrupt: bool = False) -> bool:
+        # Returns False if a subsystem is busy (unless interrupt=True)
+        if self.isBusy(command.requires):
+            if not interrupt: return False
+            for other in list(self.commands):
+                if sharesRequirement(other.requires, command.requires): self.cancel(other)
+        command.scheduled = True
+        command.interrupted = False
+        self.commands.append(command)
+        command.init()
+        return True
+
+    def cancel(self, command: Command):
+        if command in self.commands: self.finish(command, True)
+
+    def cancelAll(self):
+        for command in list(self.commands):
+            self.finish(command, True)
+
+    def finish(self, command: Command, interrupted: bool):
+        self.commands.remove(command)
+        command.scheduled = False
+        command.interrupted = interrupted
+        command.end(interrupted)
+
+    def post(self, event: int):
+        # From any thread; handled at the start of the next tick
+        self.events.post(event)
+
+    def handleEvents(self):
+        while not self.events.isEmpty():
+            event, ms = self.events.take()
+            if event == SCHED_STOP_ALL:
+                self.cancelAll()
+                stopAll()
+
+    def tick(self):
+        odometry.update()  # Every tick, even with nothing running, so pushes still count
+        if not self.events.isEmpty(): self.handleEvents()
+        if not self.commands: return
+        sensors.refresh()
+        for command in list(self.commands):
+            if command not in self.commands: continue  # Cancelled earlier in this tick
+            command.execute()
+            if command.isFinished(): self.finish(command, False)
+
+    def dt(self) -> float:
+        # Seconds since the previous tick, as measured
+        return self.loop.dt
+
+    def run(self):
+        self.loop.start()
+        while True: # Loop forever in a thread
+            self.tick()
+            self.loop.wait()
+
+scheduler = Scheduler()
+
+def runCommand(command: Command) -> bool:
+    # Blocking helper: waits for the subsystems, runs command, returns False if interrupted
+    while not scheduler.schedule(command):
+        wait(scheduler.tickMs, MSEC)
+    while command.scheduled:
+        wait(scheduler.tickMs, MSEC)
+    return not command.interrupted
+
 
 def setup():
     clearScreen()
@@ -83,20 +854,11 @@ def setup():
     setupCatBelt()
 
 def clearScreen(screenColor = None, penColor = None):
-    screenColor = screenColor if screenColor is None else screenColor
-    penColor = penColor if penColor is None else penColor
-    brain.screen.clear_screen()
-    brain.screen.set_fill_color(screenColor)
-    brain.screen.set_pen_color(screenColor)
-    brain.screen.draw_rectangle(0, 0, 170, 100, screenColor)
-    brain.screen.set_pen_color(penColor)
-    brain.screen.set_font(FontType.MONO20)
-    brain.screen.set_cursor(1, 1)
+    status.clear(screenColor, penColor)
 
 def brainPrint(message):
-    brain.screen.print(message)
-    brain.screen.new_line()
-    print(message)  # For connected console
+    print(message)
+    consolePrint(message)  # For connected console
 
 def onButtBumperPressed():
     pass
@@ -104,25 +866,7 @@ def onButtBumperPressed():
 def onButtBumperReleased():
     pass
 
-def onIntakeBallSeen():
-    if topEye.isObjectVisible(): stopIntake()
-
-def onIntakeBallLost():
-    pass
-
-def onTopBallSeen():
-    if not isContinuousCallback or not isContinuousCallback():
-        if intakeEye.isObjectVisible(): stopIntake()
-        releaseHug()
-
-def onTopBallLost():
-    if topEye.isObjectVisible():
-        if not catEye.isObjectVisible():
-            stopIntake()
-            windCat()
-        if not topEye.isObjectVisible() and intakeEye.isObjectVisible(): spinIntake(REVERSE)
-
-def updateMotor(motor: Motor,
+def updateMotor(motor: CachedMotor,
                 velocityPercent: float,
                 direction: DirectionType.DirectionType = FORWARD,
                 brakeType: BrakeType.BrakeType = COAST,
@@ -149,38 +893,59 @@ def stopDriveTrain(brakeType: BrakeType.BrakeType = COAST):
     wheelRight.stop(brakeType)
 
 def setupCatBelt(velocity: int = 100):
+    global buttBumperPressed, buttBumperReleased
     updateMotor(catBeltLeft, velocity, brakeType=HOLD, spinNow=False)
     updateMotor(catBeltRight, velocity, brakeType=HOLD, spinNow=False)
+    if buttBumperPressed is None:
+        buttBumperPressed = Event(onButtBumperPressed)
+        buttBumperReleased = Event(onButtBumperReleased)
     buttBumper.pressed(onBumperPressed)
     #buttBumper.released(onBumperReleased)
     ballHugger.pump_on()
 
 def spinIntake(direction: DirectionType.DirectionType):
+    global intakeRunning
     intakeLeft.spin(direction)
     intakeRight.spin(direction) # Motor is configured reverse
     intakeRunning = True
+    if direction == REVERSE: balls.post(INTAKE_ON)
 
 def stopIntake(mode = HOLD):
+    global intakeRunning
     intakeLeft.stop(mode)
     intakeRight.stop(mode)
     intakeRunning = False
+    balls.post(INTAKE_OFF)
 
-def startIntake():
-    if not catEye.isObjectVisible(): windCat()
+def isCatCocked() -> bool:
+    sensors.refreshEyes()  # No-op if checkEyes already polled this tick
+    return catEye.isObjectVisible()
+
+def feedIntake():
     if isContinuousCallback and isContinuousCallback(): hugBall()
     else: releaseHug(stop=True)  # Open up for the next ball
     spinIntake(REVERSE)
 
+class StartIntake(Sequence):
+    def __init__(self):
+        super().__init__(When(lambda: not isCatCocked(), WindCat()),
+                         Instant(feedIntake, ("intake",)))
+
+def startIntake():
+    runCommand(StartIntake())
+
 def reverseIntake():
     spinIntake(FORWARD)
 
 def startBelt():
+    global catBeltRunning
     hugBall()
     catBeltLeft.spin(REVERSE)
     catBeltRight.spin(REVERSE)
     catBeltRunning = True
 
 def stopCatAndBelt():
+    global catBeltRunning
     catBeltLeft.stop(HOLD)
     catBeltRight.stop(HOLD)
     catBeltRunning = False
@@ -190,26 +955,236 @@ def onBumperPressed():
     ledLeft.set_color(Color.GREEN)
     buttBumperPressed.broadcast()
 
-def windCat():  # Up Button
-    releaseHug()
-    catBeltLeft.spin(FORWARD)
-    catBeltRight.spin(FORWARD)
-    for _ in range(3 * 100):  # 3 seconds @ 10ms/loop
-        if catEye.isObjectVisible(): break
-        wait(10, MSEC)
-    # TODO: Check if we still need/want this. Tune it to new Gen3 bot?
-    # Spinning the catapult a little more because sensor placement can't go lower
-    catBeltRight.spin_for(FORWARD, 10, DEGREES, wait = False)
-    catBeltLeft.spin_for(FORWARD, 10, DEGREES)
-    stopCatAndBelt()
+# The Catapult class learns where the arm is from the belt encoders
+# catEye only says the arm is somewhere in a wide window, a sample late. The
+# belt encoder is exact, so every time the eye sees the arm arrive (cocked) or
+# leave (the shot) we keep the belt position. After that, winding and firing
+# are one move straight to the right spot and the eye just confirms it; if it
+# disagrees we fall back to spinning until it sees the arm, which re-learns
+# the position. It also keeps what limits how fast we can shoot: time between
+# shots, time to reload and how hard the belts are pulling.
+
+CAT_CYCLE_DEG = 360.0      # Belt degrees from one shot to the next, until we've measured it
+CAT_OVERWIND_DEG = 10.0    # Past where the eye sees the arm (the eye can't sit any lower)
+CAT_FIRE_DEG = 180.0       # How far firing moves before we know where the release is
+CAT_FIRE_PAST_DEG = 20.0   # Past the learned release, to be sure it let go
+CAT_LEARN_GAIN = 0.5       # How far each new cycle measurement moves the estimate
+CAT_CONFIRM_MS = 50        # How long the eye gets to agree with a learned wind
+CAT_CURRENT_MS = 50        # Belt current sample period while winding
+CAT_STALL_AMPS = 1.0
+CAT_STALL_MS = 300         # Belts pulling this hard for this long: give up on the wind
+
+class Catapult:
+    def __init__(self):
+        self.cycleDeg = CAT_CYCLE_DEG
+        self.cockedAt = None      # Belt position when the eye last saw the arm arrive...
+        self.releasedAt = None    # ...and leave
+        self.resyncs = 0          # Learned winds the eye didn't agree with
+        self.shots = 0
+        self.firstShotMs = 0.0
+        self.lastShotMs = 0.0
+        self.fastestMs = 0.0      # Shortest time between two shots
+        self.winds = 0
+        self.windMs = 0.0
+        self.worstAmps = 0.0
+        self.stalls = 0
+
+    def position(self) -> float:
+        return sensors.catPosition()
+
+    def nextAt(self, edge: float, position: float, past: float) -> float:
+        # The first belt position from here on that's `past` beyond a repeat of edge
+        target = edge + past
+        return target + math.ceil((position - target) / self.cycleDeg) * self.cycleDeg
+
+    def sawCocked(self, position: float):
+        if self.cockedAt is not None:
+            cycle = position - self.cockedAt
+            if 0.5 * self.cycleDeg < cycle < 1.5 * self.cycleDeg:  # One shot apart, not a fluke
+                self.cycleDeg += CAT_LEARN_GAIN * (cycle - self.cycleDeg)
+        self.cockedAt = position
+
+    def sawRelease(self, position: float, ms: float):
+        self.releasedAt = position
+        if self.shots == 0:
+            self.firstShotMs = ms
+        elif self.fastestMs == 0.0 or ms - self.lastShotMs < self.fastestMs:
+            self.fastestMs = ms - self.lastShotMs
+        self.lastShotMs = ms
+        self.shots += 1
+
+    def windTarget(self, position: float):
+        # Where a wind from here should stop, or None if we can't trust what we learned
+        if self.cockedAt is None: return None
+        target = self.nextAt(self.cockedAt, position, CAT_OVERWIND_DEG)
+        # Right after a shot we're still at the release point; that one doesn't count
+        if self.releasedAt is not None and self.nextAt(self.releasedAt, position + CAT_FIRE_PAST_DEG, 0.0) < target:
+            return None  # We'd fire on the way there
+        return target
+
+    def topUp(self, position: float) -> float:
+        # Already cocked: how much further to the overwound position
+        if self.cockedAt is None: return CAT_OVERWIND_DEG
+        half = self.cycleDeg / 2.0
+        short = (self.cockedAt + CAT_OVERWIND_DEG - position + half) % self.cycleDeg - half
+        return min(CAT_OVERWIND_DEG, max(0.0, short))
+
+    def fireTarget(self, position: float) -> float:
+        if self.releasedAt is None: return position + CAT_FIRE_DEG
+        return self.nextAt(self.releasedAt, position, CAT_FIRE_PAST_DEG)
+
+    def wound(self, ms: float, amps: float, stalled: bool):
+        self.winds += 1
+        self.windMs += ms
+        self.worstAmps = max(self.worstAmps, amps)
+        if stalled: self.stalls += 1
+
+    def shotsPerSecond(self) -> float:
+        if self.shots < 2: return 0.0
+        return (self.shots - 1) * 1000.0 / (self.lastShotMs - self.firstShotMs)
+
+    def report(self) -> str:
+        reload = self.windMs / self.winds if self.winds else 0.0
+        return ("catapult: {} shots {:.2f}/s, fastest {:.0f}ms apart, {} winds {:.0f}ms avg, "
+                "{} resyncs, {:.2f}A worst, {} stalls, cycle {:.1f} deg").format(
+                    self.shots, self.shotsPerSecond(), self.fastestMs, self.winds, reload,
+                    self.resyncs, self.worstAmps, self.stalls, self.cycleDeg)
+
+catapult = Catapult()
+
+def moveCat(degrees: float):
+    # Both belts, the motors' own position loop doing the profile
+    catBeltRight.spin_for(FORWARD, degrees, DEGREES, wait=False)
+    catBeltLeft.spin_for(FORWARD, degrees, DEGREES, wait=False)
+
+CAT_SEEK = 0     # Spinning until the eye sees the arm
+CAT_MOVE = 1     # Going to a known position
+CAT_CONFIRM = 2  # There; waiting for the eye to agree
+CAT_DONE = 3
+
+class WindCat(Command):
+    requires = ("cat",)
+
+    def __init__(self, timeoutMs: int = 3000):
+        self.timeoutMs = timeoutMs
+        self.startTime = 0.0
+        self.mode = CAT_DONE
+        self.sawArm = False
+        self.since = 0.0
+        self.sampledAt = 0.0
+        self.pullingSince = 0.0
+        self.amps = 0.0
+        self.stalled = False
+
+    def init(self):
+        releaseHug(stop=False)  # Straight on from FireCat: the belts are still going
+        balls.post(WIND_START)
+        now = brain.timer.time(MSEC)
+        self.startTime = now
+        self.since = now
+        self.sampledAt = now
+        self.pullingSince = now
+        self.amps = 0.0
+        self.stalled = False
+        self.sawArm = catEye.isObjectVisible()
+        position = catapult.position()
+        target = catapult.windTarget(position)
+        if self.sawArm:
+            self.move(catapult.topUp(position))
+        elif target is not None:
+            self.move(target - position)
+        else:
+            self.seek()
+
+    def move(self, degrees: float):
+        self.mode = CAT_MOVE
+        if degrees > 0: moveCat(degrees)
+        else: self.mode = CAT_CONFIRM
+
+    def seek(self):
+        self.mode = CAT_SEEK
+        catBeltLeft.spin(FORWARD)
+        catBeltRight.spin(FORWARD)
+
+    def execute(self):
+        now = brain.timer.time(MSEC)
+        if catEye.isObjectVisible() and not self.sawArm:
+            catapult.sawCocked(catapult.position())
+            self.sawArm = True
+        sampled = self.checkStall(now)
+        if self.stalled or now - self.startTime >= self.timeoutMs:
+            self.mode = CAT_DONE
+        elif self.mode == CAT_SEEK:
+            # TODO: Check if we still need/want the overwind. Tune it to new Gen3 bot?
+            if self.sawArm: self.move(CAT_OVERWIND_DEG)
+        elif self.mode == CAT_MOVE:
+            # Can't be there before the eye sees the arm, so until then only look now and again
+            if (self.sawArm or sampled) and sensors.catDone():
+                self.mode = CAT_CONFIRM
+                self.since = now
+        elif self.mode == CAT_CONFIRM:
+            if self.sawArm:
+                self.mode = CAT_DONE
+            elif now - self.since >= CAT_CONFIRM_MS:
+                catapult.resyncs += 1  # Not where we thought: find the arm the slow way
+                self.seek()
+
+    def checkStall(self, now: float) -> bool:
+        if now - self.sampledAt < CAT_CURRENT_MS: return False
+        self.sampledAt = now
+        amps = sensors.catAmps()
+        self.amps = max(self.amps, amps)
+        if amps < CAT_STALL_AMPS or self.mode == CAT_CONFIRM:
+            self.pullingSince = now
+        elif now - self.pullingSince >= CAT_STALL_MS:
+            self.stalled = True
+        return True
 
-def releaseCat(cancelRewind = None): # Down Button
-    releaseHug()
-    catBeltRight.spin_for(FORWARD, 180, DEGREES, wait=False)
-    catBeltLeft.spin_for(FORWARD, 180, DEGREES)
+    def isFinished(self) -> bool:
+        return self.mode == CAT_DONE
+
+    def end(self, interrupted: bool):
+        stopCatAndBelt()
+        catapult.wound(brain.timer.time(MSEC) - self.startTime, self.amps, self.stalled)
+
+class FireCat(Command):
+    requires = ("cat",)
+
+    def __init__(self):
+        self.sawArm = False
+        self.fired = False
+
+    def init(self):
+        releaseHug()
+        self.sawArm = catEye.isObjectVisible()
+        self.fired = False
+        position = catapult.position()
+        moveCat(catapult.fireTarget(position) - position)
+        balls.post(FIRE_START)
+
+    def execute(self):
+        # The eye losing the arm is the shot. Leave the belts going: the rewind picks up from here.
+        if catEye.isObjectVisible():
+            self.sawArm = True
+        elif self.sawArm and not self.fired:
+            catapult.sawRelease(catapult.position(), brain.timer.time(MSEC))
+            self.fired = True
+
+    def isFinished(self) -> bool:
+        return self.fired or sensors.catDone()
+
+class ReleaseCat(Sequence):
     # cancelWinding lets the caller of releaseCat() know
     # if winding should be cancelled (keeps tension off rubber bands)
-    if (cancelRewind is None or not cancelRewind()): windCat()
+    def __init__(self, cancelRewind = None):
+        super().__init__(FireCat(),
+                         When(lambda: cancelRewind is None or not cancelRewind(), WindCat()))
+
+def windCat():  # Up Button
+    runCommand(WindCat())
+
+def releaseCat(cancelRewind = None): # Down Button
+    runCommand(ReleaseCat(cancelRewind))
 
 def releaseHug(stop: bool = True):
     if stop: stopCatAndBelt()
@@ -228,100 +1203,504 @@ def stopAll():
     if not intakeRunning: ballHugger.pump_off()  # Stop TWICE to shut off the pump
     stopIntake(HOLD)
 
-def onCatSeen():
-    pass
-
-def onCatLost():
-    pass
-
-# Broadcasters
-buttBumperPressed: Event = Event(onButtBumperPressed)
-buttBumperReleased: Event = Event(onButtBumperReleased)
+# Ball handling states
+BALL_EMPTY = 0     # Nothing in the robot, intake off
+BALL_INTAKING = 1  # Intake running, waiting for a ball
+BALL_STAGED = 2    # A ball is inside, waiting behind the catapult arm
+BALL_LOADED = 3    # Ball in the basket, catapult cocked
+BALL_WINDING = 4   # Pulling the catapult arm down
+BALL_FIRING = 5    # Catapult released, waiting for the shot
+BALL_STATES = ("EMPTY", "INTAKING", "STAGED", "LOADED", "WINDING", "FIRING")
+
+# Events: eye edges from checkEyes, and what the intake and catapult were told to do
+INTAKE_SEEN = 0
+INTAKE_LOST = 1
+TOP_SEEN = 2
+TOP_LOST = 3
+CAT_SEEN = 4
+CAT_LOST = 5
+INTAKE_ON = 6
+INTAKE_OFF = 7
+WIND_START = 8
+FIRE_START = 9
+BALL_EVENTS = ("intakeSeen", "intakeLost", "topSeen", "topLost", "catSeen", "catLost",
+               "intakeOn", "intakeOff", "windStart", "fireStart")
+
+# The BallHandler class knows where the balls are
+# Everything that happens to a ball goes through one queue, and only the
+# checkEyes loop handles it, one event at a time. Nothing here blocks: winding
+# and firing are commands, this only reacts to them. Every transition is
+# logged with how long the event waited, and every motor action with how long
+# it took from the eye seeing something to the motor being told.
+
+class BallHandler:
+    def __init__(self):
+        self.queue = EventQueue()
+        self.state = BALL_EMPTY
+        self.since = 0.0          # When we got into this state (ms)
+        self.ballsInside = 0      # Past intakeEye, not in the basket yet
+        self.shots = 0
+        self.catMoving = False    # Winding or firing, even with a ball already loaded
+        self.actions = 0
+        self.totalLatency = 0.0
+        self.worstLatency = 0.0
+        self.log = Telemetry("balls", ("state", "event", "waitedMs"), capacity=64)
+
+    def post(self, event: int):
+        self.queue.post(event)
+
+    def drain(self):
+        if self.queue.isEmpty(): return
+        while not self.queue.isEmpty():
+            event, ms = self.queue.take()
+            self.handle(event, ms)
+        self.setEyeRates()
+
+    def setEyeRates(self):
+        # An eye only needs its fast rate while something can move a ball (or
+        # the arm) past it. The rest of the time it just confirms nothing changed.
+        state = self.state
+        moving = intakeRunning or state == BALL_STAGED
+        intakeEye.setActive(moving)
+        topEye.setActive(moving or self.catMoving)
+        catEye.setActive(self.catMoving)
+
+    def moveTo(self, state: int, event: int, ms: float):
+        now = brain.timer.time(MSEC)
+        self.log.record(state, event, now - ms)
+        self.state = state
+        self.since = now
+
+    def acted(self, ms: float):
+        # Call right after telling a motor what to do about the event posted at ms
+        latency = brain.timer.time(MSEC) - ms
+        self.actions += 1
+        self.totalLatency += latency
+        self.worstLatency = max(self.worstLatency, latency)
+
+    def idleState(self) -> int:
+        if self.ballsInside > 0: return BALL_STAGED
+        return BALL_INTAKING if intakeRunning else BALL_EMPTY
+
+    def handle(self, event: int, ms: float):
+        state = self.state
+        if event == TOP_SEEN:
+            self.ballsInside = max(0, self.ballsInside - 1)
+            if not isContinuousCallback or not isContinuousCallback():
+                if intakeEye.isObjectVisible(): stopIntake()
+                releaseHug(stop=False)  # Mid-wind the belts are the catapult's, not ours to stop
+                self.acted(ms)
+            self.moveTo(BALL_LOADED, event, ms)
+        elif event == INTAKE_SEEN:
+            if state == BALL_LOADED and intakeRunning:
+                stopIntake()  # Don't push the next ball into a loaded catapult
+                self.acted(ms)
+        elif event == INTAKE_LOST:
+            if intakeRunning:
+                self.ballsInside += 1
+                if state == BALL_INTAKING: self.moveTo(BALL_STAGED, event, ms)
+        elif event == INTAKE_ON:
+            if state == BALL_EMPTY: self.moveTo(BALL_INTAKING, event, ms)
+        elif event == INTAKE_OFF:
+            if state == BALL_INTAKING: self.moveTo(BALL_EMPTY, event, ms)
+        elif event == WIND_START:
+            self.catMoving = True
+            if state != BALL_LOADED: self.moveTo(BALL_WINDING, event, ms)
+        elif event == CAT_SEEN:
+            self.catMoving = False
+            if state == BALL_WINDING: self.moveTo(self.idleState(), event, ms)
+        elif event == FIRE_START:
+            self.catMoving = True
+            self.moveTo(BALL_FIRING, event, ms)
+        elif event == CAT_LOST or event == TOP_LOST:
+            # The arm went up or the ball left the basket: that was the shot
+            if state == BALL_FIRING or state == BALL_LOADED:
+                self.shots += 1
+                self.catMoving = False
+                self.moveTo(self.idleState(), event, ms)
+
+    def stateName(self) -> str:
+        return BALL_STATES[self.state]
+
+    def report(self) -> str:
+        average = self.totalLatency / self.actions if self.actions else 0.0
+        return "balls: {} now, {} shots, {} actions {:.1f}ms avg {:.1f}ms worst, {} dropped".format(
+            self.stateName(), self.shots, self.actions, average, self.worstLatency, self.queue.dropped)
+
+    def eyeReport(self) -> str:
+        return "eyes: intake {} samples, top {}, cat {}".format(intakeEye.samples, topEye.samples, catEye.samples)
+
+balls = BallHandler()
+
+# Broadcasters, built when setupCatBelt() wires up the bumper
+buttBumperPressed: Event = None
+buttBumperReleased: Event = None
+
+eyeLoop = PeriodicLoop("checkEyes", 10)
 
 def checkEyes():
-    intakeEye.setCallbacks(onIntakeBallSeen, onIntakeBallLost)
-    topEye.setCallbacks(onTopBallSeen, onTopBallLost)
-    catEye.setCallbacks(onCatSeen, onCatLost)
+    intakeEye.postTo(balls.queue, INTAKE_SEEN, INTAKE_LOST)
+    topEye.postTo(balls.queue, TOP_SEEN, TOP_LOST)
+    catEye.postTo(balls.queue, CAT_SEEN, CAT_LOST)
+    eyeLoop.start()
     while True: # Loop forever in a thread (like "when started" in Vex Blocks)
-        intakeEye.look()
-        topEye.look()
-        catEye.look()
-        wait(10, MSEC)
-
-sensorThread = Thread(checkEyes)
+        eyeTick()
+        eyeLoop.wait()
+
+def eyeTick():
+    sensors.refreshEyes()
+    intakeEye.look()
+    topEye.look()
+    catEye.look()
+    balls.drain()  # Right after looking, so reacting to an eye costs no extra tick
+
+# Wheel travel per turn reported by wheelLeft/wheelRight
+DRIVE_MM_PER_TURN = 400.0 # 200mm travel wheels, 0.5 wheel turns per reported turn
+DRIVE_TRACK_MM = 246.0    # Distance between left and right wheels
+
+# The Odometry class keeps track of where we are on the field
+# The scheduler thread adds up wheel travel along the inertial heading every tick,
+# just before commands run, so they all see the pose from the same sensor reads.
+# pose is a tuple (x mm, y mm, heading deg), replaced whole on every update, so
+# readers always get a consistent set without any locking.
+# Heading is compass-style like the inertial (clockwise, 0 = +y) but doesn't wrap.
+# It's the one frame every heading target is in. setPose(*START_POSE) anchors it
+# to the field when calibration finishes and again as each routine starts.
+
+START_POSE = (250.0, 400.0, 0.0)  # Where we're placed for autonomous: x mm, y mm, heading
+FIELD_WIDTH_MM = 2438.0   # Along x
+FIELD_HEIGHT_MM = 1829.0  # Along y
+
+class Odometry:
+    def __init__(self, mmPerTurn: float = DRIVE_MM_PER_TURN):
+        self.mmPerTurn = mmPerTurn
+        self.pose = (0.0, 0.0, 0.0)
+        self.headingOffset = 0.0  # Field heading minus inertial rotation
+        self.lastLeft = 0.0
+        self.lastRight = 0.0
+        self.lastHeading = 0.0
+        self.maxJumpTurns = 0.5   # Anything bigger in one tick is an encoder reset, not motion
+        self.started = False
+
+    def setPose(self, x: float, y: float, heading: float):
+        sensors.refreshDrive(force=True)
+        self.headingOffset = heading - sensors.rotation
+        self.lastLeft = sensors.leftRevs
+        self.lastRight = sensors.rightRevs
+        self.lastHeading = heading
+        self.pose = (x, y, heading)
+        self.started = True
+
+    def update(self):
+        sensors.refreshDrive()
+        if not self.started:
+            self.setPose(*START_POSE)
+            return
+        left = sensors.leftRevs
+        right = sensors.rightRevs
+        heading = sensors.rotation + self.headingOffset
+        dl = left - self.lastLeft
+        dr = right - self.lastRight
+        if abs(dl) > self.maxJumpTurns or abs(dr) > self.maxJumpTurns:
+            dl = dr = 0.0
+        d = (dl + dr) / 2.0 * self.mmPerTurn
+        x, y, _ = self.pose
+        mid = math.radians((self.lastHeading + heading) / 2.0)  # Arc ~ chord at the mean heading
+        self.pose = (x + d * math.sin(mid), y + d * math.cos(mid), heading)
+        self.lastLeft = left
+        self.lastRight = right
+        self.lastHeading = heading
+
+    def relocalize(self, x: float, y: float):
+        # The wheel travel since we were at (x, y) wasn't real; the heading still is
+        _, _, heading = self.pose
+        self.pose = (x, y, heading)
+
+    def distanceTo(self, x: float, y: float) -> float:
+        px, py, _ = self.pose
+        return math.sqrt((x - px) * (x - px) + (y - py) * (y - py))
+
+    def bearingTo(self, x: float, y: float) -> float:
+        # Compass heading from here to (x, y), -180..180
+        px, py, _ = self.pose
+        return math.degrees(math.atan2(x - px, y - py))
+
+    def fieldToRotation(self, heading: float) -> float:
+        # The inertial rotation() nearest to now that points along a field heading
+        _, _, current = self.pose
+        delta = (heading - current + 180.0) % 360.0 - 180.0
+        return current + delta - self.headingOffset
+
+odometry = Odometry()
+
+sensorThread = None
+schedulerThread = None
+screenThread = None
+
+def startThreads():
+    # Only run() (or a host-side runner) calls this: importing starts nothing
+    global sensorThread, schedulerThread, screenThread
+    if schedulerThread is not None: return
+    sensorThread = Thread(checkEyes)
+    schedulerThread = Thread(scheduler.run)
+    screenThread = Thread(status.run)
+    wait(15, MSEC)  # Allow events and everything else to initialize
+
+def printLoopStats():
+    consolePrint(scheduler.loop.report())
+    consolePrint(eyeLoop.report())
+    consolePrint(balls.report())
+    consolePrint(balls.eyeReport())
+    consolePrint(catapult.report())
+    consolePrint(driveMonitor.report())
+    consolePrint("motors: {} writes, {} repeats not sent".format(CachedMotor.writes, CachedMotor.saved))
+    consolePrint(status.report())
+    consolePrint(selector.report())
+    if profiler.enabled: profiler.report()
 
 MODES = ["CALIBRATE", "4SWITCHES", "NEAR_GOAL"]
 MODE_COLORS = [Color.CYAN, Color.YELLOW_GREEN, Color.BLUE]
 MODE_PEN_COLORS = [Color.BLACK, Color.BLACK, Color.WHITE]
+MODE_ROUTINES = [None, None, "nearGoal"]  # From ROUTINES, for the modes that are one
+MODE_SHOOTS = [False, False, True]  # Arming winds the catapult for these
+
+# The Selector class picks the autonomous and gets it ready before it's needed
+# Left/right only change the mode. The runner thread notices and arms it in the
+# background: builds the drivetrain, makes sure calibration is going, loads the
+# routine and, for a mode that shoots, winds the catapult. Check only asks the
+# runner to go, so the button callback returns straight away and the routine
+# starts from a robot that's already set up. Each start is timed from the press to the routine
+# running and to the wheels first turning (as odometry sees them, so no extra reads).
+
+SEL_ARMING = 0
+SEL_ARMED = 1
+SEL_RUNNING = 2
+SEL_STATES = ("arming", "armed", "running")
+SELECTOR_POLL_MS = 5
+SELECTOR_MOVED_REVS = 0.01  # Wheel turns that count as moving (4mm)
+
+class Selector:
+    def __init__(self):
+        self.mode = 0
+        self.armedMode = -1  # Nothing armed yet
+        self.state = SEL_ARMING
+        self.go = False
+        self.pressedAt = 0.0
+        self.startMs = -1.0  # Press to running, for the last start
+        self.motionMs = -1.0  # Press to the wheels turning, -1 if they didn't
+        self.starts = 0
+
+    def select(self, newMode: int):
+        if self.state == SEL_RUNNING or self.go:
+            print("Running auto already")
+            return
+        self.mode = newMode % len(MODES)
+        fillScreen(MODE_COLORS[self.mode], MODE_PEN_COLORS[self.mode])
+        status.set("mode", MODES[self.mode])
+
+    def start(self):
+        # From the button callback: never blocks
+        if self.state == SEL_RUNNING or self.go:
+            print("Already running")
+        elif not calibration.isReady() and self.mode > 0:  # Red block has no calibration
+            # Calibration runs in the background from boot; never wait for it here
+            if calibration.state == CAL_RUNNING:
+                print("Calibrating {:.1f}s".format(calibration.remainingMs() / 1000.0))
+            else:
+                calibration.start()
+                print("Calibrating...")
+        else:
+            self.pressedAt = brain.timer.time(MSEC)
+            self.go = True
+            if self.armedMode != self.mode: print("Arming...")
+
+    def arm(self, mode: int):
+        self.state = SEL_ARMING
+        setupAutoDriveTrain(calibrate=False)
+        if mode > 0 and calibration.state != CAL_RUNNING and not calibration.isReady(): calibration.start()
+        if MODE_ROUTINES[mode]: routine(MODE_ROUTINES[mode])
+        if MODE_SHOOTS[mode] and not isCatCocked(): runCommand(WindCat())
+        self.armedMode = mode
+        self.state = SEL_ARMED
+
+    def runMode(self, mode: int):
+        self.state = SEL_RUNNING
+        self.startMs = self.motionMs = -1.0
+        if MODE_ROUTINES[mode]:
+            odometry.setPose(*START_POSE)  # See runFromStart()
+            self.runRoutine(routine(MODE_ROUTINES[mode]))
+        elif mode == 0:
+            self.startMs = brain.timer.time(MSEC) - self.pressedAt
+            if calibration.state == CAL_RUNNING:
+                # Asked again: we may have been moved, so start over rather than trust this one
+                calibration.cancel()
+                while calibration.state == CAL_RUNNING: wait(CALIBRATION_POLL_MS, MSEC)
+            runCalibrate()
+        elif mode == 1:
+            self.startMs = brain.timer.time(MSEC) - self.pressedAt
+            run4Switches()
+        self.starts += 1
+        self.armedMode = -1  # Wind up again for next time
+        self.state = SEL_ARMING
+        consolePrint(self.report())
+        print("Done")
 
-
+    def runRoutine(self, command: Command):
+        # runCommand(), watching for the wheels to move
+        while not scheduler.schedule(command):
+            wait(scheduler.tickMs, MSEC)
+        self.startMs = brain.timer.time(MSEC) - self.pressedAt
+        left, right = sensors.leftRevs, sensors.rightRevs
+        while command.scheduled:
+            if (self.motionMs < 0 and (abs(sensors.leftRevs - left) >= SELECTOR_MOVED_REVS
+                                       or abs(sensors.rightRevs - right) >= SELECTOR_MOVED_REVS)):
+                self.motionMs = sensors.driveStamp - self.pressedAt
+                print("Moving {:.0f}ms".format(self.motionMs))
+            wait(scheduler.tickMs, MSEC)
+
+    def run(self):
+        # The runner thread: arms whatever is selected, starts it when asked
+        while True:
+            if self.armedMode != self.mode: self.arm(self.mode)
+            elif self.go:
+                self.runMode(self.mode)
+                self.go = False
+            wait(SELECTOR_POLL_MS, MSEC)
+
+    def report(self) -> str:
+        return "selector: {} {}, {} starts, last start {:.0f}ms, moving {:.0f}ms after press".format(
+            MODES[self.mode], SEL_STATES[self.state], self.starts, self.startMs, self.motionMs)
+
+selector = Selector()
+selectorThread = None
 
 def setupSelector():
+    global selectorThread
     brain.buttonRight.pressed(onBrainButtonRight)
     brain.buttonLeft.pressed(onBrainButtonLeft)
     brain.buttonCheck.pressed(onBrainButtonCheck)
-
-isAutoRunning = False
-isCalibrated = False
-modeNumber = 0
-cancelCalibration = False
+    if selectorThread is None: selectorThread = Thread(selector.run)
 
 def onBrainButtonCheck():
-    global isAutoRunning
-    global isCalibrated
-    global modeNumber
-
-    if isAutoRunning:
-        print("Already running")
-    elif not isCalibrated and modeNumber > 0:  # Red block has no calibration
-        if setupAutoDriveTrain():
-            print("Ready!")
-        else:
-            print("Try again?")
-    else:
-        isAutoRunning = True
-        if modeNumber == 0:
-            runCalibrate()
-        elif modeNumber == 1:
-            run4Switches()
-        elif modeNumber == 2:
-            runNearGoal()
-        isAutoRunning = False
-        print("Done")
+    selector.start()
 
 def onBrainButtonRight():
-    applyMode(modeNumber + 1)
+    applyMode(selector.mode + 1)
 
 def onBrainButtonLeft():
-    applyMode(modeNumber - 1)
-
-def applyMode( newMode):
-    global cancelCalibration
-    if inertial.is_calibrating():
-        cancelCalibration = False
-    if isAutoRunning:
-        print("Running auto already")
-    else:
-        modeNumber = newMode % len(MODES)
-        fillScreen(MODE_COLORS[modeNumber], MODE_PEN_COLORS[modeNumber])
-        print(MODES[modeNumber])
+    applyMode(selector.mode - 1)
+
+def applyMode(newMode):
+    selector.select(newMode)
+
+# The StatusScreen class owns the brain screen
+# The screen is a fixed layout of fields. Everyone else only changes the text
+# in a field, which costs nothing but a string compare; a low-priority thread
+# repaints the fields that changed a few times a second, so screen I/O never
+# happens inside a control loop. print() fills the message lines.
+
+SCREEN_FRAME_MS = 200     # At most 5 repaints a second
+SCREEN_FIELDS_PER_FRAME = 3  # And at most this many fields each time; the rest wait a frame
+SCREEN_LINES = 2          # Message lines print() scrolls through
+# Name, x, y (text baseline) and width in characters. MONO20 fits 16 across, 5 down.
+SCREEN_FIELDS = (
+    ("mode", 0, 18, 16),
+    ("line0", 0, 38, 16),
+    ("line1", 0, 58, 16),
+    ("heading", 0, 78, 7),
+    ("balls", 80, 78, 8),
+    ("error", 0, 98, 16),
+)
+
+class StatusScreen:
+    def __init__(self):
+        self.values = {}
+        self.shown = {}           # What's on the screen now
+        self.formats = {}
+        for name, x, y, width in SCREEN_FIELDS:
+            self.values[name] = ""
+            self.formats[name] = "{:<" + str(width) + "}"  # Pad to overwrite the old text
+        self.lines = 0            # Message lines used since the last clear
+        self.screenColor = Color.BLUE
+        self.penColor = Color.WHITE
+        self.filled = False       # False: the background needs repainting first
+        self.dirty = True
+        self.frames = 0
+        self.fieldsDrawn = 0
+
+    def set(self, name: str, text: str):
+        if self.values[name] != text:
+            self.values[name] = text
+            self.dirty = True
+
+    def show(self, message):
+        # Next message line, scrolling up once they're all used
+        message = str(message)
+        if self.lines < SCREEN_LINES:
+            self.set("line" + str(self.lines), message)
+            self.lines += 1
+            return
+        for n in range(SCREEN_LINES - 1):
+            self.set("line" + str(n), self.values["line" + str(n + 1)])
+        self.set("line" + str(SCREEN_LINES - 1), message)
+
+    def error(self, message: str):
+        self.set("error", message)
+
+    def clear(self, screenColor = None, penColor = None):
+        if screenColor is not None: self.screenColor = screenColor
+        if penColor is not None: self.penColor = penColor
+        for n in range(SCREEN_LINES):
+            self.set("line" + str(n), "")
+        self.lines = 0
+        self.filled = False
+        self.dirty = True
+
+    def draw(self):
+        # One frame: the background if it changed, otherwise the changed fields
+        self.set("heading", "H{:4d}".format(int(sensors.heading)))
+        self.set("balls", balls.stateName())
+        if not self.dirty: return
+        self.frames += 1
+        screen = brain.screen
+        if not self.filled:
+            screen.clear_screen()
+            screen.set_fill_color(self.screenColor)
+            screen.set_pen_color(self.screenColor)
+            screen.draw_rectangle(0, 0, 170, 100, self.screenColor)
+            screen.set_pen_color(self.penColor)
+            screen.set_font(FontType.MONO20)
+            self.filled = True
+            for name in self.values:
+                self.shown[name] = ""  # Blank fields are already right
+            return
+        drawn = 0
+        for name, x, y, width in SCREEN_FIELDS:
+            text = self.values[name]
+            if self.shown[name] == text: continue
+            if drawn == SCREEN_FIELDS_PER_FRAME: return  # Still dirty: next frame
+            screen.print_at(self.formats[name].format(text[:width]), x=x, y=y, opaque=True)
+            self.shown[name] = text
+            self.fieldsDrawn += 1
+            drawn += 1
+        self.dirty = False
+
+    def run(self):
+        while True:
+            with profiler.measure("screen"):
+                self.draw()
+            wait(SCREEN_FRAME_MS, MSEC)
+
+    def report(self) -> str:
+        return "screen: {} frames, {} fields drawn".format(self.frames, self.fieldsDrawn)
+
+status = StatusScreen()
 
 def fillScreen(screenColor, penColor):
-    screenColor = screenColor
-    penColor = penColor
-    brain.screen.clear_screen()
-    brain.screen.set_fill_color(screenColor)
-    brain.screen.set_pen_color(screenColor)
-    brain.screen.draw_rectangle(0, 0, 170, 100, screenColor)
-    brain.screen.set_pen_color(penColor)
-    brain.screen.set_font(FontType.MONO20)
-    brain.screen.set_cursor(1, 1)
-    
-def print( message):
-    brain.screen.set_fill_color(screenColor)
-    brain.screen.set_pen_color(penColor)
-    brain.screen.print(message)
-    brain.screen.new_line()
+    status.clear(screenColor, penColor)
+
+def print(message):
+    status.show(message)
 
 def setupAutoDriveTrain(calibrate=True):
     # Use DriveTrain in autonomous. Easier to do turns.
@@ -329,112 +1708,101 @@ def setupAutoDriveTrain(calibrate=True):
     # Track width: 7-7/8 inches (7.875)
     # Wheel base : 6-1/2 inches (6.5)
 
-    if not DriveTrain:
-        driveTrain = DriveTrain(wheelLeft,
-                                        wheelRight,
-                                        wheelTravel= 145,
-                                        trackWidth=246,
-                                        wheelBase=200,
-                                        units=DistanceUnits.MM,
-                                        externalGearRatio=2)  # TODO: Is this correct?
-        if calibrate:
-            windCat()
-            return calibrate
+    DEVICES["driveTrain"].get()  # Built once, then reused
+    if calibrate:
+        windCat()
+    return True
+
+# Inertial calibration
+CALIBRATION_MS = 2000     # How long the last good calibration took. Printed after each one: paste it here.
+CALIBRATION_POLL_MS = 50
+CAL_IDLE = 0
+CAL_RUNNING = 1
+CAL_READY = 2
+CAL_FAILED = 3
+CAL_CANCELLED = 4
+CAL_STATES = ("idle", "calibrating", "ready", "failed", "cancelled")
+
+# The Calibration class calibrates the inertial in the background
+# start() returns straight away; a thread of its own watches the inertial and
+# everyone else just looks at state, progress() and isReady(). How long the
+# last good calibration took (this run, or CALIBRATION_MS from the last one)
+# says when to expect it done. The inertial has no way to load a saved bias,
+# so the time is all we can carry over between boots.
+
+class Calibration:
+    def __init__(self, expectedMs: float = CALIBRATION_MS):
+        self.state = CAL_IDLE
+        self.expectedMs = expectedMs
+        self.startTime = 0.0
+        self.tookMs = 0.0
+        self.attempts = 0
+        self.cancelled = False
+
+    def start(self) -> bool:
+        # Returns False if one is already running
+        if self.state == CAL_RUNNING: return False
+        inertial.calibrate()
+        self.state = CAL_RUNNING
+        self.cancelled = False
+        self.attempts += 1
+        self.startTime = brain.timer.time(MSEC)
+        Thread(self.watch)
         return True
 
-def calibrate():
-    print("Calibrating...")
-    inertial.calibrate()
-    countdown = 3000/50  
-    while (inertial.is_calibrating()
-            and countdown > 0
-            and not cancelCalibration):
-        wait(50, MSEC)
-        countdown = countdown - 1
-    if cancelCalibration:   
-        print("Cancelled Calibration!")
-        return False
-    elif countdown > 0 and not inertial.is_calibrating():
-        windCat()
+    def cancel(self):
+        # Stops waiting for it; the inertial itself finishes whatever it's doing
+        if self.state == CAL_RUNNING: self.cancelled = True
+
+    def limitMs(self) -> float:
+        return max(3000.0, 2.0 * self.expectedMs)
+
+    def watch(self):
+        while True:
+            wait(CALIBRATION_POLL_MS, MSEC)
+            elapsed = brain.timer.time(MSEC) - self.startTime
+            if self.cancelled:
+                self.state = CAL_CANCELLED
+                status.error("Cancelled Calibration!")
+                return
+            if not inertial.is_calibrating():
+                break
+            if elapsed > self.limitMs():
+                self.state = CAL_FAILED
+                scheduler.post(SCHED_STOP_ALL)  # Motors belong to the scheduler thread
+                status.error("FAILED Calibration")
+                brain.play_sound(SoundType.POWER_DOWN)
+                return
+        self.tookMs = elapsed
+        self.expectedMs = elapsed
+        sensors.refreshDrive(force=True)  # Nobody gets the pre-calibration heading after this
+        odometry.setPose(*START_POSE)  # The heading we had was relative to a drifting gyro
+        self.state = CAL_READY
         print("Calibrated")
         brain.play_sound(SoundType.TADA)
-        isCalibrated = True
-        return True
-    else:
-        stopAll()
-        print("FAILED Calibration")
-        brain.play_sound(SoundType.POWER_DOWN)
-        return False
+        consolePrint("CALIBRATION_MS = {:.0f}".format(elapsed))
 
-# Use negativ4 velocity to go the opposite way
-def goTurn90( velocityPercent: float, timeoutSecs: float = 0.0):
-    leftDir = REVERSE if velocityPercent > 0 else FORWARD
-    rightDir = FORWARD if velocityPercent > 0 else REVERSE
-    wheelLeft.set_velocity(abs(velocityPercent), PERCENT)
-    wheelRight.set_velocity(abs(velocityPercent), PERCENT)
-    wheelLeft.set_max_torque(100, PERCENT)
-    wheelRight.set_max_torque(100, PERCENT)
-    if timeoutSecs > 0.0:
-        wheelLeft.set_timeout(timeoutSecs, SECONDS)
-        wheelRight.set_timeout(timeoutSecs, SECONDS)
-    wheelLeft.spin_for(leftDir,0.44, TURNS, wait=False)
-    wheelRight.spin_for(rightDir, 0.44, TURNS, wait=True)
-    wheelLeft.stop(BRAKE)
-    wheelRight.stop(BRAKE)
-    brain.play_sound(SoundType.TADA)
-    print("{:4.2f}".format(inertial.heading()))
+    def isReady(self) -> bool:
+        return self.state == CAL_READY
 
-def goTurn(
-            velocity: float,
-            angle: float,
-            timeoutSecs: int = 0):
-    # Angle is absolute, relative to the calibrated heading of 0-deg 
-    while True:
-        h = inertial.heading()
-        if h > 180:
-            h -= 360   # Convert larger angles to smaller angles by going the other way.
-        error = angle - h  # Can be positive or negative depending on which way.
-        if abs(error) < 0.1:
-            print("All done. h={:4.2f}".format(h))
-            brain.play_sound(SoundType.FILLUP)
-            break
-        
-        # Taper the final 20-degrees linearly (each wheel halves the v)
-        turnVelocity = velocity/2
-        if abs(error) <= 30:
-            print("TAPERING! error={:4.2f}".format(error))
-            turnVelocity = ((error/30) * velocity)/2
-        # When velocity is TOO slow, the bot won't move
-        if abs(turnVelocity) < 8:
-            turnVelocity = 8 if turnVelocity > 0 else -8
-        print("h={:4.2f} e={:4.2f} adj={:4.2f}".format(h, error, turnVelocity))
-        
-        if angle < 0:
-            wheelLeft.set_velocity(-turnVelocity)
-            wheelRight.set_velocity(turnVelocity)
-        else:
-            wheelLeft.set_velocity(turnVelocity)
-            wheelRight.set_velocity(-turnVelocity)
-
-        wait(10, MSEC)
-    wheelLeft.stop(HOLD)
-    wheelRight.stop(HOLD)
-
-    # Debugging
-    n = 0
-    while True:
-        d = inertial.heading()
-        print("Headig: {:4.2f}".format(d))
-        wait(1, SECONDS)
-        n += 1
-        if n > 10:
-            break
-
-def convertHeadingToYaw(heading):
-        y = heading
-        if heading > 180:
-            y = heading - 360
-        return y
+    def progress(self) -> float:
+        # 0..1, our best guess while it's running
+        if self.state == CAL_READY: return 1.0
+        if self.state != CAL_RUNNING: return 0.0
+        return min(0.99, (brain.timer.time(MSEC) - self.startTime) / self.expectedMs)
+
+    def remainingMs(self) -> float:
+        if self.state != CAL_RUNNING: return 0.0
+        return max(0.0, self.expectedMs - (brain.timer.time(MSEC) - self.startTime))
+
+    def stateName(self) -> str:
+        return CAL_STATES[self.state]
+
+calibration = Calibration()
+
+def calibrate() -> bool:
+    # Starts calibrating in the background, see Calibration
+    return calibration.start()
 
 def clamp(value: float, minValue: float, maxValue: float):
     return max(minValue, min(maxValue, value))
@@ -443,19 +1811,570 @@ def clampDelta(value: float, center: float, delta: float):
     return clamp(value, center - delta, center + delta)
 
 def getAngle():
-    return inertial.rotation()
-
-def resetMotors():
-    wheelLeft.reset_position()
-    wheelRight.reset_position()
+    sensors.refreshDrive()
+    return sensors.rotation
 
 def getMotorsRevolution():
-    return (wheelLeft.position(RotationUnits.REV) + wheelRight.position(RotationUnits.REV)) / 2.0
+    sensors.refreshDrive()
+    return sensors.revolutions()
 
 def setMotorSpeeds(leftSpeed: float, rightSpeed: float):
+    # Both sides back to back, so they change on the same tick. A side that
+    # hasn't changed isn't sent at all.
     wheelLeft.spin(DirectionType.FORWARD, leftSpeed, PERCENT)
     wheelRight.spin(DirectionType.FORWARD, rightSpeed, PERCENT)
 
+# Drive model: wheel turns (as reported by wheelLeft/wheelRight) per second at 100%
+# 120 rpm motor through the 2:1 gear ratio
+DRIVE_TURNS_PER_SEC = 1.0
+DRIVE_MAX_ACCEL = 2.0     # turns/s/s
+DRIVE_MAX_JERK = 12.0     # turns/s/s/s
+DRIVE_KP = 2.0            # turns/s of correction per turn behind the profile
+DRIVE_SETTLE_MS = 300     # How long to keep creeping after the profile ends
+DRIVE_YAW_GAIN = 50.0 / 90.0  # goStraight: percent of wheel speed per degree off course
+DRIVE_YAW_DEADBAND = 0.1  # goStraight: ignore smaller heading changes (degrees)
+
+# Drive feedforward, fitted per side by characterizeDrive(): the percent that
+# holds a wheel speed v (turns/s) while accelerating at a (turns/s/s) is
+#     kS * sign(planned) + kV * v + kA * a
+# kS is what it takes to get moving at all. It goes the way the plan is moving
+# (or accelerating, from a standstill), never the way the feedback happens to
+# push: encoder noise would flip it every tick at the start and end of a move.
+# With this doing most of the work, the feedback in each move only has to
+# correct what's left over.
+DRIVE_LEFT = 0
+DRIVE_RIGHT = 3
+DRIVE_FEEDFORWARD = array("f", [6.37, 93.98, 9.104,    # Left kS, kV, kA
+                                6.37, 93.98, 9.104])   # Right
+
+def feedforward(side: int, turnsPerSec: float, acceleration: float = 0.0, planned = None) -> float:
+    # planned is the planned velocity without feedback (turnsPerSec when None).
+    # Nothing planned and no acceleration planned means no kS.
+    ff = DRIVE_FEEDFORWARD
+    percent = ff[side + 1] * turnsPerSec + ff[side + 2] * acceleration
+    direction = turnsPerSec if planned is None else planned
+    if direction == 0.0: direction = acceleration
+    if direction > 0.0: return percent + ff[side]
+    if direction < 0.0: return percent - ff[side]
+    return percent
+
+# The MotionProfile class plans a whole move up front
+# It's the quickest rest-to-rest move that respects the velocity, acceleration
+# and jerk limits (an S-curve; maxJerk = 0 gives a plain trapezoid). The plan is
+# stored as position/velocity/acceleration tables with one entry per control
+# tick, so the control loop only has to look up where it should be.
+
+class MotionProfile:
+    def __init__(self, distance: float, maxVelocity: float, maxAcceleration: float,
+                 maxJerk: float = 0.0, periodMs: int = 10):
+        self.distance = abs(distance)
+        self.maxAcceleration = maxAcceleration
+        self.maxJerk = maxJerk
+        self.periodMs = periodMs
+        v = abs(maxVelocity)
+        if self.distance <= 0.0 or v <= 0.0 or maxAcceleration <= 0.0:
+            v = 0.0
+        elif 2.0 * self.accelDistance(v) > self.distance:
+            # Too short to reach full speed: find the peak we do reach
+            low, high = 0.0, v
+            for _ in range(30):
+                mid = (low + high) / 2.0
+                if 2.0 * self.accelDistance(mid) > self.distance: high = mid
+                else: low = mid
+            v = low
+        self.peakVelocity = v
+        self.shape(v)
+        cruise = (self.distance - 2.0 * self.accelDistance(v)) / v if v > 0.0 else 0.0
+        self.duration = 2.0 * self.accelTime + cruise  # Seconds
+        self.count = int(self.duration * 1000.0 / periodMs) + 2
+        n = self.count
+        self.position = array("f", [0.0] * n)
+        self.velocity = array("f", [0.0] * n)
+        self.acceleration = array("f", [0.0] * n)
+        dt = periodMs / 1000.0
+        x = 0.0
+        last = 0.0
+        for k in range(n):
+            t = k * dt
+            vk = self.velocityAt(t)
+            if k > 0: x += (last + vk) * dt / 2.0
+            self.velocity[k] = vk
+            self.acceleration[k] = self.accelerationAt(t)
+            self.position[k] = x
+            last = vk
+        # Integration error is tiny, but make sure we plan to end exactly on target
+        if x > 0.0:
+            scale = self.distance / x
+            for k in range(n):
+                self.position[k] *= scale
+
+    def shape(self, v: float):
+        # Sets jerk time, constant-acceleration time and peak acceleration for reaching v
+        a = self.maxAcceleration
+        j = self.maxJerk
+        if j <= 0.0:
+            self.jerkTime, self.holdTime, self.peakAcceleration = 0.0, (v / a if a > 0 else 0.0), a
+        elif v * j <= a * a:
+            self.jerkTime = math.sqrt(v / j)
+            self.holdTime = 0.0
+            self.peakAcceleration = j * self.jerkTime
+        else:
+            self.jerkTime = a / j
+            self.holdTime = v / a - self.jerkTime
+            self.peakAcceleration = a
+        self.accelTime = 2.0 * self.jerkTime + self.holdTime
+
+    def accelDistance(self, v: float) -> float:
+        self.shape(v)
+        return v * self.accelTime / 2.0
+
+    def rampVelocity(self, t: float) -> float:
+        # Velocity t seconds into the speed-up
+        j = self.maxJerk
+        tj = self.jerkTime
+        if tj <= 0.0: return min(self.peakVelocity, self.peakAcceleration * t)
+        if t < tj: return j * t * t / 2.0
+        if t < tj + self.holdTime: return j * tj * tj / 2.0 + self.peakAcceleration * (t - tj)
+        u = max(0.0, self.accelTime - t)
+        return self.peakVelocity - j * u * u / 2.0
+
+    def rampAcceleration(self, t: float) -> float:
+        tj = self.jerkTime
+        if tj <= 0.0: return self.peakAcceleration if t < self.accelTime else 0.0
+        if t < tj: return self.maxJerk * t
+        if t < tj + self.holdTime: return self.peakAcceleration
+        return self.maxJerk * max(0.0, self.accelTime - t)
+
+    def velocityAt(self, t: float) -> float:
+        if t <= 0.0 or t >= self.duration: return 0.0
+        if t < self.accelTime: return self.rampVelocity(t)
+        if t > self.duration - self.accelTime: return self.rampVelocity(self.duration - t)
+        return self.peakVelocity
+
+    def accelerationAt(self, t: float) -> float:
+        if t <= 0.0 or t >= self.duration: return 0.0
+        if t < self.accelTime: return self.rampAcceleration(t)
+        if t > self.duration - self.accelTime: return -self.rampAcceleration(self.duration - t)
+        return 0.0
+
+    def index(self, elapsedMs: float) -> int:
+        k = int(elapsedMs / self.periodMs)
+        return k if k < self.count else self.count - 1
+
+    def isDone(self, elapsedMs: float) -> bool:
+        return elapsedMs >= self.duration * 1000.0
+
+TURN_WHEEL_TURNS_PER_DEG = math.radians(DRIVE_TRACK_MM / 2.0) / DRIVE_MM_PER_TURN  # Each wheel, turning in place
+TURN_DEG_PER_SEC = DRIVE_TURNS_PER_SEC / 100.0 / TURN_WHEEL_TURNS_PER_DEG  # Per percent
+TURN_MAX_ACCEL = 720.0    # deg/s/s
+TURN_MAX_JERK = 7200.0    # deg/s/s/s
+TURN_KP = 4.0             # deg/s of correction per degree behind the profile
+TURN_SETTLE_DEG = 1.0     # Done once this close...
+TURN_SETTLE_DPS = 5.0     # ...and turning slower than this (deg/s)...
+TURN_SETTLE_MS = 60       # ...for this long
+TURN_DEADLINE_MS = 1000   # Without a timeout, give up this long after the profile ends
+TURN_REPLAN_DEG = 5.0     # A turn planned ahead is used if it's off by less than this
+
+# The DriveMonitor class notices when a move isn't going the way it was told
+# Every tick the active move reports what it just told the wheels. The monitor
+# checks the tick that just ended against the previous command:
+#   impact  the wheels fall behind and the inertial felt a jolt harder than
+#           anything we'd plan
+#   slip    the wheels say we're turning much faster than the inertial does
+#   stall   a wheel turning far slower than the feedforward model says its
+#           command should, for a while, and the motor pulling hard
+# The accelerometer and motor current cost extra reads, so they're only read
+# once the encoders already look wrong. Each of these becomes a DRIVE_* event for the move.
+
+DRIVE_IMPACT_G = 0.5          # Planned moves stay under 0.1g
+DRIVE_IMPACT_BEHIND = 0.75    # Wheels slower than this much of the expected speed: look for a jolt
+DRIVE_SLIP_DPS = 20.0         # Wheels vs inertial turn rate, plus...
+DRIVE_SLIP_FRACTION = 0.5     # ...this much of the inertial rate (wheels scrub in turns)
+DRIVE_SLIP_MS = 60
+DRIVE_STALL_MIN_TPS = 0.1     # Commands slower than this (turns/s) can't tell a stall from creeping
+DRIVE_STALL_FRACTION = 0.25   # Slower than this much of the expected speed...
+DRIVE_STALL_MS = 150          # ...for this long (the drive takes ~90ms to respond)
+DRIVE_STALL_AMPS = 1.2        # Current at 100% and not moving; we need half that per percent
+
+DRIVE_OK = 0
+DRIVE_STALL = 1
+DRIVE_SLIP = 2
+DRIVE_IMPACT = 3
+DRIVE_EVENTS = ("ok", "stall", "slip", "impact")
+
+class DriveMonitor:
+    def __init__(self):
+        self.lastLeft = 0.0
+        self.lastRight = 0.0
+        self.lastRotation = 0.0
+        self.lastMs = 0.0
+        self.leftPct = 0.0        # What the wheels were told last tick
+        self.rightPct = 0.0
+        self.stallSince = -1.0
+        self.slipSince = -1.0
+        self.goodPose = (0.0, 0.0, 0.0)  # Odometry before anything looked wrong
+        self.counts = [0, 0, 0, 0]
+        self.detectMs = 0.0       # From first sign to event, added up
+
+    def begin(self):
+        sensors.refreshDrive()
+        self.lastLeft = sensors.leftRevs
+        self.lastRight = sensors.rightRevs
+        self.lastRotation = sensors.rotation
+        self.lastMs = brain.timer.time(MSEC)
+        self.leftPct = 0.0
+        self.rightPct = 0.0
+        self.stallSince = -1.0
+        self.slipSince = -1.0
+        self.goodPose = odometry.pose
+
+    def expected(self, side: int, percent: float) -> float:
+        # Wheel speed (turns/s) the feedforward says a command settles at
+        ff = DRIVE_FEEDFORWARD
+        push = abs(percent) - ff[side]
+        if push <= 0.0: return 0.0
+        return push / ff[side + 1]
+
+    def update(self, leftPct: float, rightPct: float) -> int:
+        # Call right after telling the wheels leftPct/rightPct
+        now = brain.timer.time(MSEC)
+        event = DRIVE_OK
+        if now > self.lastMs:
+            dt = (now - self.lastMs) / 1000.0
+            left = (sensors.leftRevs - self.lastLeft) / dt
+            right = (sensors.rightRevs - self.lastRight) / dt
+            gyro = (sensors.rotation - self.lastRotation) / dt
+            event = self.check(now, left, right, gyro)
+            self.lastLeft = sensors.leftRevs
+            self.lastRight = sensors.rightRevs
+            self.lastRotation = sensors.rotation
+            self.lastMs = now
+        self.leftPct = leftPct
+        self.rightPct = rightPct
+        return event
+
+    def check(self, now: float, left: float, right: float, gyro: float) -> int:
+        behind = stalling = False
+        for side, percent, speed in ((DRIVE_LEFT, self.leftPct, left), (DRIVE_RIGHT, self.rightPct, right)):
+            expected = self.expected(side, percent)
+            if expected < DRIVE_STALL_MIN_TPS: continue
+            if abs(speed) < DRIVE_IMPACT_BEHIND * expected: behind = True
+            if abs(speed) < DRIVE_STALL_FRACTION * expected: stalling = True
+
+        # Hitting something slows the wheels first, so only then is the accelerometer worth a read
+        if behind:
+            sensors.reads += 1
+            if abs(inertial.acceleration(YAXIS)) >= DRIVE_IMPACT_G: return self.raised(DRIVE_IMPACT, now, now)
+
+        wheels = math.degrees((left - right) * DRIVE_MM_PER_TURN / DRIVE_TRACK_MM)  # Clockwise, like the inertial
+        if abs(wheels - gyro) > DRIVE_SLIP_DPS + DRIVE_SLIP_FRACTION * abs(gyro):
+            if self.slipSince < 0.0: self.slipSince = now
+            if now - self.slipSince >= DRIVE_SLIP_MS: return self.raised(DRIVE_SLIP, self.slipSince, now)
+        else:
+            self.slipSince = -1.0
+
+        if not stalling:
+            self.stallSince = -1.0
+        else:
+            if self.stallSince < 0.0: self.stallSince = now
+            if now - self.stallSince >= DRIVE_STALL_MS:
+                # Slow could just be a sluggish start: a stalled motor is pushing hard
+                sensors.reads += 2
+                amps = max(wheelLeft.current(), wheelRight.current())
+                pushing = max(abs(self.leftPct), abs(self.rightPct)) / 100.0
+                if amps >= 0.5 * DRIVE_STALL_AMPS * pushing: return self.raised(DRIVE_STALL, self.stallSince, now)
+        if self.slipSince < 0.0 and self.stallSince < 0.0: self.goodPose = odometry.pose
+        return DRIVE_OK
+
+    def raised(self, event: int, since: float, now: float) -> int:
+        self.counts[event] += 1
+        self.detectMs += now - since
+        self.stallSince = -1.0
+        self.slipSince = -1.0
+        return event
+
+    def report(self) -> str:
+        events = sum(self.counts)
+        return "drive: {} stalls, {} slips, {} impacts, {:.0f}ms to detect avg".format(
+            self.counts[DRIVE_STALL], self.counts[DRIVE_SLIP], self.counts[DRIVE_IMPACT],
+            self.detectMs / events if events else 0.0)
+
+driveMonitor = DriveMonitor()
+
+# The DriveMove class is what the drive moves share: reacting to DriveMonitor events
+# responses says what to do about each event, indexed by DRIVE_*:
+#   DRIVE_CONTINUE    note it and carry on
+#   DRIVE_ABORT       stop here, the move is as done as it's going to get
+#   DRIVE_BACK_OFF    reverse a little to get off whatever we hit, then stop
+#   DRIVE_RELOCALIZE  the wheels lied: put odometry back where it was before
+#                     the trouble started (keeping the inertial heading) and carry on
+# Only ABORT and BACK_OFF end the move. A move calls startMonitor() in init(),
+# and in execute() returns early while isRecovering(), and passes what it told
+# the wheels to monitor().
+
+DRIVE_CONTINUE = 0
+DRIVE_ABORT = 1
+DRIVE_BACK_OFF = 2
+DRIVE_RELOCALIZE = 3
+# By event. Routines push into walls and the goal on purpose, so a stall
+# carries on unless the move asks for something else.
+DRIVE_RESPONSES = (DRIVE_CONTINUE, DRIVE_CONTINUE, DRIVE_RELOCALIZE, DRIVE_ABORT)
+DRIVE_BACK_OFF_PCT = 20.0
+DRIVE_BACK_OFF_MS = 150
+
+class DriveMove(Command):
+    requires = ("drive",)
+    responses = DRIVE_RESPONSES
+    event = DRIVE_OK
+    response = DRIVE_CONTINUE
+    recoverUntil = 0.0
+
+    def startMonitor(self):
+        self.event = DRIVE_OK
+        self.response = DRIVE_CONTINUE
+        driveMonitor.begin()
+
+    def monitor(self, leftPct: float, rightPct: float) -> bool:
+        # True if an event has taken over the move
+        event = driveMonitor.update(leftPct, rightPct)
+        if event == DRIVE_OK: return False
+        response = self.responses[event]
+        if response == DRIVE_CONTINUE: return False
+        status.error(DRIVE_EVENTS[event].upper() + "!")
+        if response == DRIVE_RELOCALIZE:
+            x, y, _ = driveMonitor.goodPose
+            odometry.relocalize(x, y)
+            return False
+        self.event = event
+        self.response = response
+        if response == DRIVE_BACK_OFF:
+            setMotorSpeeds(math.copysign(DRIVE_BACK_OFF_PCT, -leftPct) if leftPct else 0.0,
+                           math.copysign(DRIVE_BACK_OFF_PCT, -rightPct) if rightPct else 0.0)
+            self.recoverUntil = brain.timer.time(MSEC) + DRIVE_BACK_OFF_MS
+        return True
+
+    def isRecovering(self) -> bool:
+        return self.event != DRIVE_OK
+
+    def recovered(self) -> bool:
+        # Once recovering: has whatever we're doing about it finished?
+        return self.response != DRIVE_BACK_OFF or brain.timer.time(MSEC) >= self.recoverUntil
+
+# The TurnTo class turns in place to a heading
+# It works on the continuous inertial rotation() so there's no wrapping at
+# +/-180 to get wrong, and always goes the short way round. The turn follows an
+# angular MotionProfile: the profile's rate and acceleration drive the wheels
+# directly (feedforward) and a small correction keeps us on the planned angle.
+# It ends when the heading has been close and steady for a moment, or at the
+# deadline, whichever comes first.
+
+class TurnTo(DriveMove):
+    requires = ("drive",)
+
+    def __init__(self, velocity: float, angle: float, timeoutSecs: float = 0, relative: bool = False,
+                 responses = None, plannedFrom: float = None):
+        # Angle is a field heading, or degrees clockwise from here if relative.
+        # plannedFrom is the heading we expect to start from, to plan the turn now.
+        if responses: self.responses = responses
+        self.velocity = abs(velocity)
+        self.angle = angle
+        self.timeoutSecs = timeoutSecs
+        self.relative = relative
+        self.profile = None
+        self.planned = None
+        self.plannedDelta = 0.0
+        if plannedFrom is not None:
+            self.plannedDelta = angle if relative else (angle - plannedFrom + 180.0) % 360.0 - 180.0
+            self.planned = MotionProfile(self.plannedDelta, self.velocity * TURN_DEG_PER_SEC,
+                                         TURN_MAX_ACCEL, TURN_MAX_JERK)
+        self.start = 0.0
+        self.target = 0.0
+        self.direction = 1.0
+        self.startTime = 0.0
+        self.deadlineMs = 0.0
+        self.lastRotation = 0.0
+        self.lastMs = 0.0
+        self.rate = 0.0
+        self.settledSince = -1.0
+        self.done = False
+
+    def init(self):
+        sensors.refreshDrive(force=True)
+        self.start = sensors.rotation
+        if self.relative: self.target = self.start + self.angle
+        else: self.target = odometry.fieldToRotation(self.angle)
+        delta = self.target - self.start
+        self.direction = 1.0 if delta >= 0.0 else -1.0
+        if (self.planned is not None and abs(delta - self.plannedDelta) <= TURN_REPLAN_DEG
+                and (delta >= 0.0) == (self.plannedDelta >= 0.0)):
+            self.profile = self.planned  # Close enough: the correction takes up the difference
+        else:
+            self.profile = MotionProfile(delta, self.velocity * TURN_DEG_PER_SEC, TURN_MAX_ACCEL, TURN_MAX_JERK)
+        self.startTime = brain.timer.time(MSEC)
+        if self.timeoutSecs > 0: self.deadlineMs = self.timeoutSecs * 1000.0
+        else: self.deadlineMs = self.profile.duration * 1000.0 + TURN_DEADLINE_MS
+        self.lastRotation = self.start
+        self.lastMs = self.startTime
+        self.rate = 0.0
+        self.settledSince = -1.0
+        self.done = False
+        wheelLeft.set_velocity(0, PERCENT)
+        wheelRight.set_velocity(0, PERCENT)
+        wheelLeft.spin(FORWARD)
+        wheelRight.spin(FORWARD)
+        self.startMonitor()
+        # The profile can be one planned ahead for a slightly different turn
+        turnLog.begin(self.target - self.start, self.velocity, TURN_MAX_ACCEL, TURN_MAX_JERK,
+                      self.direction * self.profile.distance)
+
+    def execute(self):
+        if self.isRecovering():
+            self.done = self.recovered()
+            return
+        now = brain.timer.time(MSEC)
+        elapsedMs = now - self.startTime
+        rotation = sensors.rotation
+        if now > self.lastMs:
+            self.rate = (rotation - self.lastRotation) * 1000.0 / (now - self.lastMs)
+            self.lastRotation = rotation
+            self.lastMs = now
+        error = self.target - rotation
+        if abs(error) < TURN_SETTLE_DEG and abs(self.rate) < TURN_SETTLE_DPS:
+            if self.settledSince < 0.0: self.settledSince = now
+            if now - self.settledSince >= TURN_SETTLE_MS: self.done = True
+        else:
+            self.settledSince = -1.0
+        if self.done or elapsedMs >= self.deadlineMs:
+            self.done = True
+            return
+
+        profile = self.profile
+        k = profile.index(elapsedMs)
+        planned = self.target - self.direction * (profile.distance - profile.position[k])  # Ends on target
+        rate = self.direction * profile.velocity[k] + TURN_KP * (planned - rotation)
+        acceleration = self.direction * profile.acceleration[k]
+        # kS goes the way the plan turns; once the profile is over, a real miss
+        # still gets it towards the target. Inside half the settle band it
+        # would only rock us about the target.
+        push = self.direction * profile.velocity[k]
+        if push == 0.0: push = error
+        if abs(error) < TURN_SETTLE_DEG / 2.0: push = 0.0
+        # Clockwise is left wheel forward, right wheel back
+        wheel = rate * TURN_WHEEL_TURNS_PER_DEG
+        wheelAcceleration = acceleration * TURN_WHEEL_TURNS_PER_DEG
+        leftVelocity = clamp(feedforward(DRIVE_LEFT, wheel, wheelAcceleration, push), -100.0, 100.0)
+        rightVelocity = clamp(feedforward(DRIVE_RIGHT, -wheel, -wheelAcceleration, -push), -100.0, 100.0)
+        turnLog.record(rotation, error, leftVelocity, planned)
+        wheelLeft.set_velocity(leftVelocity, PERCENT)
+        wheelRight.set_velocity(rightVelocity, PERCENT)
+        if self.monitor(leftVelocity, rightVelocity): self.done = self.recovered()
+
+    def isFinished(self) -> bool:
+        return self.done
+
+    def end(self, interrupted: bool):
+        wheelLeft.stop(HOLD)
+        wheelRight.stop(HOLD)
+        turnLog.finish()
+
+def goTurn(
+            velocity: float,
+            angle: float,
+            timeoutSecs: int = 0):
+    runCommand(TurnTo(velocity, angle, timeoutSecs))
+
+# Quarter turn left for positive velocity, right for negative
+def goTurn90(velocityPercent: float, timeoutSecs: float = 0.0):
+    runCommand(TurnTo(velocityPercent, -90.0 if velocityPercent > 0 else 90.0, timeoutSecs, relative=True))
+
+class DriveCurve(DriveMove):
+    requires = ("drive",)
+
+    def __init__(self,
+                 targetAngle: float,
+                 targetSpeed: float,
+                 targetRevolutions: float,
+                 maxAcceleration: float = 150.0,
+                 maxAngleSpeed: float = 50.0,
+                 maxAngleAcceleration: float = 300.0,
+                 angleTolerance: float = 1.0,
+                 kP: float = 1.0,
+                 maxJerk: float = 1500.0,
+                 responses = None):
+        # Speeds are in percent, accelerations in percent/s and jerk in percent/s/s
+        if responses: self.responses = responses
+        self.targetAngle = targetAngle
+        self.targetSpeed = targetSpeed
+        self.targetRevolutions = targetRevolutions
+        self.maxAcceleration = maxAcceleration
+        self.maxAngleSpeed = maxAngleSpeed
+        self.maxAngleAcceleration = maxAngleAcceleration
+        self.angleTolerance = angleTolerance
+        self.kP = kP
+        self.maxJerk = maxJerk
+        self.direction = 1.0 if targetSpeed >= 0 else -1.0
+        toTurns = DRIVE_TURNS_PER_SEC / 100.0
+        self.profile = MotionProfile(targetRevolutions, abs(targetSpeed) * toTurns,
+                                     maxAcceleration * toTurns, maxJerk * toTurns, scheduler.tickMs)
+        self.startTime = 0.0
+        self.startRevolutions = 0.0
+        self.lastCorrection = 0.0
+        self.done = False
+
+    def limitAcceleration(self, desired: float, current: float, maxAcceleration: float):
+        # Uses the measured tick time, so a late tick doesn't slow the ramp down
+        return clampDelta(desired, current, maxAcceleration*scheduler.dt())
+
+    def init(self):
+        self.lastCorrection = 0.0
+        self.done = False
+        # Measure from here rather than zeroing the encoders (odometry needs them)
+        self.startRevolutions = getMotorsRevolution()
+        self.startTime = brain.timer.time(MSEC)
+        self.startMonitor()
+        curveLog.begin(self.targetSpeed, self.targetRevolutions, self.maxAcceleration, self.maxAngleSpeed,
+                       self.maxAngleAcceleration, self.angleTolerance, self.kP, self.maxJerk)
+
+    def execute(self):
+        if self.isRecovering():
+            self.done = self.recovered()
+            return
+        currentAngle = getAngle()
+        error = currentAngle - self.targetAngle
+        correction = self.kP * error
+        correction = clamp(correction, -self.maxAngleSpeed, self.maxAngleSpeed)
+        correction = self.limitAcceleration(correction, self.lastCorrection, self.maxAngleAcceleration)
+        elapsed = brain.timer.time(MSEC) - self.startTime
+        profile = self.profile
+        k = profile.index(elapsed)
+        revolutions = self.direction * (getMotorsRevolution() - self.startRevolutions)
+        achievedRevolutions = revolutions >= self.targetRevolutions
+        settled = profile.isDone(elapsed - DRIVE_SETTLE_MS)
+        if achievedRevolutions or settled:
+            leftBase = rightBase = 0.0
+        else:
+            turnsPerSec = self.direction * (profile.velocity[k] + DRIVE_KP * (profile.position[k] - revolutions))
+            acceleration = self.direction * profile.acceleration[k]
+            planned = self.direction * profile.velocity[k]
+            leftBase = feedforward(DRIVE_LEFT, turnsPerSec, acceleration, planned)
+            rightBase = feedforward(DRIVE_RIGHT, turnsPerSec, acceleration, planned)
+        desiredSpeed = (leftBase + rightBase) / 2.0
+        leftSpeed = clamp(leftBase - correction, -100.0, 100.0)
+        rightSpeed = clamp(rightBase + correction, -100.0, 100.0)
+        setMotorSpeeds(leftSpeed, rightSpeed)
+        curveLog.record(error, revolutions, desiredSpeed, correction, profile.position[k], leftSpeed, rightSpeed)
+        self.lastCorrection = correction
+        achievedDesiredAngle = abs(error) < self.angleTolerance
+        # Not desiredSpeed == 0: that's also true on the first tick, before the profile gets going
+        self.done = (achievedRevolutions or settled) and achievedDesiredAngle
+        if self.monitor(leftSpeed, rightSpeed): self.done = self.recovered()
+
+    def isFinished(self) -> bool:
+        return self.done
+
+    def end(self, interrupted: bool):
+        curveLog.finish()
+
 def goCurve(targetAngle: float,
             targetSpeed: float,
             targetRevolutions: float,
@@ -464,123 +2383,799 @@ def goCurve(targetAngle: float,
             maxAngleAcceleration: float = 300.0,
             angleTolerance: float = 1.0,
             kP: float = 1.0,
-            deltaTime: float = 20e-3):
-    def limitAcceleration(desired: float, current: float, maxAcceleration: float):
-        return clampDelta(desired, current, maxAcceleration*deltaTime)
-    
-    lastSpeed = 0.0
-    lastCorrection = 0.0
-    resetMotors()
-    
-    while True:
-        currentAngle = getAngle()
-        error = currentAngle - targetAngle
-        correction = kP * error
-        correction = clamp(correction, -maxAngleSpeed, maxAngleSpeed)
-        correction = limitAcceleration(correction, lastCorrection, maxAngleAcceleration)
-        achievedRevolutions = getMotorsRevolution() >= targetRevolutions
-        requiredSpeed = 0.0 if achievedRevolutions else targetSpeed
-        desiredSpeed = limitAcceleration(requiredSpeed, lastSpeed, maxAcceleration)
-        leftSpeed = clamp(desiredSpeed - correction, -100.0, 100.0)
-        rightSpeed = clamp(desiredSpeed + correction, -100.0, 100.0)
-        setMotorSpeeds(leftSpeed, rightSpeed)
-        lastSpeed = desiredSpeed
-        lastCorrection = correction
-        achievedDesiredAngle = abs(error) < angleTolerance
-        if desiredSpeed == 0.0 and achievedDesiredAngle:
-            break
-        wait(deltaTime, SECONDS)
-
-def goStraight(
-                inches: float,
-                velocity: float,
-                timeoutSecs: int = 0,
-                requiredYaw: float = 360, # Default of 360 means ignore
-                wheelDiameterMM: int = 200,
-                driveGearRatio: float = 0.5,
-                ):
-    cancelGoStraight = False
-    taperTurns = 0.75     # Turns remaining on wheels before start tapering
-    convertINtoMM = 25.4
-    wheelDiameterMM = 200
-    distanceMM = inches * convertINtoMM
-    turnsNeeded = (distanceMM / wheelDiameterMM) * driveGearRatio
-
-    wheelLeft.set_velocity(velocity, PERCENT)
-    wheelRight.set_velocity(velocity, PERCENT)
-    wheelLeft.set_position(0, RotationUnits.REV)
-    wheelRight.set_position(0, RotationUnits.REV)
-    wheelLeft.spin(FORWARD)
-    wheelRight.spin(FORWARD)
-    # Force the robot to get to a certain angle heading
-    if abs(requiredYaw) <= 180:
-        baseYaw = requiredYaw
-    else:
-        baseYaw = convertHeadingToYaw(inertial.heading()) # Where did we start?
-    h = 0 
-    damper = 1.0
-
-    print("***********************")
-    startTime = time.time()
-    while not cancelGoStraight:
-        i = convertHeadingToYaw(inertial.heading())
-        d = i - baseYaw
-        if abs(d) > 0.1: # Ignore small changes
+            maxJerk: float = 1500.0):
+    runCommand(DriveCurve(targetAngle, targetSpeed, targetRevolutions, maxAcceleration,
+                          maxAngleSpeed, maxAngleAcceleration, angleTolerance, kP, maxJerk))
+
+class DriveStraight(DriveMove):
+    requires = ("drive",)
+
+    def __init__(self,
+                 inches: float,
+                 velocity: float,
+                 timeoutSecs: int = 0,
+                 requiredYaw: float = 360, # Default of 360 means ignore
+                 wheelDiameterMM: int = 200,
+                 driveGearRatio: float = 0.5,
+                 maxAcceleration: float = DRIVE_MAX_ACCEL,
+                 maxJerk: float = DRIVE_MAX_JERK,
+                 responses = None,
+                 ):
+        if responses: self.responses = responses
+        convertINtoMM = 25.4
+        distanceMM = inches * convertINtoMM
+        self.turnsNeeded = (distanceMM / wheelDiameterMM) * driveGearRatio
+        self.velocity = velocity
+        self.direction = 1.0 if velocity >= 0 else -1.0
+        # Plan the whole move now so the loop only looks things up
+        self.profile = MotionProfile(self.turnsNeeded, abs(velocity) * DRIVE_TURNS_PER_SEC / 100.0,
+                                     maxAcceleration, maxJerk, scheduler.tickMs)
+        self.timeoutSecs = timeoutSecs
+        self.requiredYaw = requiredYaw
+        self.baseYaw = 0.0
+        self.startLeft = 0.0
+        self.startRight = 0.0
+        self.startTime = 0.0
+        self.done = False
+
+    def init(self):
+        wheelLeft.set_velocity(0, PERCENT)
+        wheelRight.set_velocity(0, PERCENT)
+        wheelLeft.spin(FORWARD)
+        wheelRight.spin(FORWARD)
+        sensors.refreshDrive(force=True)
+        # Measure from here rather than zeroing the encoders (odometry needs them)
+        self.startLeft = sensors.leftRevs
+        self.startRight = sensors.rightRevs
+        # Force the robot to get to a certain angle heading
+        if abs(self.requiredYaw) <= 180:
+            self.baseYaw = self.requiredYaw
+        else:
+            _, _, self.baseYaw = odometry.pose # Where did we start?
+        self.done = False
+        self.startTime = brain.timer.time(SECONDS)
+        self.startMonitor()
+        driveLog.begin(self.turnsNeeded, self.velocity, self.profile.maxAcceleration, self.profile.maxJerk)
+
+    def execute(self):
+        if self.isRecovering():
+            self.done = self.recovered()
+            return
+        turnsNeeded = self.turnsNeeded
+        _, _, heading = odometry.pose
+        d = (heading - self.baseYaw + 180.0) % 360.0 - 180.0
+        if abs(d) > DRIVE_YAW_DEADBAND: # Ignore small changes
             # Don't change velocity by more than 50% on either wheel
             # Adjust in proportion to delta of the 45 degrees
-            adjustment = (50 * d)/90
+            adjustment = DRIVE_YAW_GAIN * d
         else:
             adjustment = 0
 
-        # Taper speed as we approach our target # of turns
-        leftPos = wheelLeft.position(RotationUnits.REV)
-        rightPos = wheelRight.position(RotationUnits.REV)
+        # Follow the profile: its velocity, plus a nudge if we're behind or ahead of it
+        leftPos = sensors.leftRevs - self.startLeft
+        rightPos = sensors.rightRevs - self.startRight
         turns = (leftPos + rightPos) / 2  # Take an average...why not?
-        remaining = turnsNeeded - abs(turns)
-        leftVelocity = 0
-        rightVelocity = 0
-        if remaining <= 0.0:
-            velocity = 0
+        elapsedMs = (brain.timer.time(SECONDS) - self.startTime) * 1000.0
+        profile = self.profile
+        k = profile.index(elapsedMs)
+        target = profile.position[k]
+        turnsPerSec = self.direction * (profile.velocity[k] + DRIVE_KP * (target - abs(turns)))
+        acceleration = self.direction * profile.acceleration[k]
+        planned = self.direction * profile.velocity[k]
+        if abs(turns) >= turnsNeeded:
+            turnsPerSec = acceleration = planned = 0.0
             adjustment = 0
-        elif remaining <= taperTurns:   # Set new velocity when not many turns are left
-            damper = (remaining / taperTurns) if remaining >= 0 else 0.0
-            leftVelocity = (velocity * damper)
-            rightVelocity = (velocity * damper)
-            if (abs(leftVelocity) < 20): # velocity too low doesn't work well
-                leftVelocity = 20 if velocity > 0 else -20
-            if (abs(rightVelocity) < 20): # velocity too low doesn't work well
-                rightVelocity = 20 if velocity > 0 else -20
-            leftVelocity -= adjustment
-            rightVelocity += adjustment
-        else:
-            leftVelocity = velocity - adjustment
-            rightVelocity = velocity + adjustment
+        leftVelocity = feedforward(DRIVE_LEFT, turnsPerSec, acceleration, planned) - adjustment
+        rightVelocity = feedforward(DRIVE_RIGHT, turnsPerSec, acceleration, planned) + adjustment
             
         wheelLeft.set_velocity(leftVelocity)
         wheelRight.set_velocity(rightVelocity)
 
-        print("{:4.1f}, {:4.1f}: h={:4.1f} d={:4.1f} a={:4.1f} damper={:4.1f} v1={:4.1f} v2={:4.1f}".format(leftPos, rightPos, h, d, adjustment, damper, leftVelocity, rightVelocity))
-        if (abs(turns) >= turnsNeeded):
+        driveLog.record(leftPos, rightPos, d, adjustment, target, leftVelocity, rightVelocity)
+        if self.monitor(leftVelocity, rightVelocity):
+            self.done = self.recovered()
+        elif (abs(turns) >= turnsNeeded):
             print("DONE: turns={:4.1f} needed={:4.1f} error={:4.1f}".format(turns, turnsNeeded, turns - turnsNeeded))
-            break
-        wait(10, MSEC)
+            self.done = True
+
+        # Stopped just short after the profile ended: close enough
+        elif profile.isDone(elapsedMs - DRIVE_SETTLE_MS):
+            print("SHORT: turns={:4.2f} needed={:4.2f}".format(turns, turnsNeeded))
+            self.done = True
 
         # Check timeout
-        if (timeoutSecs > 0 and ((time.time() - startTime) >= timeoutSecs)):
+        elif (self.timeoutSecs > 0 and ((brain.timer.time(SECONDS) - self.startTime) >= self.timeoutSecs)):
             brain.play_sound(SoundType.DOOR_CLOSE)
-            print("TIMEOUT!")
-            break
+            status.error("TIMEOUT!")
+            self.done = True
+
+    def isFinished(self) -> bool:
+        return self.done
 
-    wheelLeft.set_velocity(0)
-    wheelRight.set_velocity(0)
-    wheelLeft.stop()
-    wheelRight.stop()
-    if cancelGoStraight:
-        print("CANCELLED")
-        cancelGoStraight = False  # Reset this
+    def end(self, interrupted: bool):
+        wheelLeft.set_velocity(0)
+        wheelRight.set_velocity(0)
+        wheelLeft.stop()
+        wheelRight.stop()
+        if interrupted:
+            status.error("CANCELLED")
+        driveLog.finish()
+
+def goStraight(
+                inches: float,
+                velocity: float,
+                timeoutSecs: int = 0,
+                requiredYaw: float = 360, # Default of 360 means ignore
+                wheelDiameterMM: int = 200,
+                driveGearRatio: float = 0.5,
+                ):
+    return runCommand(DriveStraight(inches, velocity, timeoutSecs, requiredYaw, wheelDiameterMM, driveGearRatio))
+
+
+class DriveTo(Command):
+    # Turn towards a field point, then drive to it. Planned from wherever we
+    # actually are when it starts, so errors from earlier moves don't add up.
+    # Negative velocity backs up to the point instead.
+    requires = ("drive",)
+
+    def __init__(self, x: float, y: float, velocity: float, turnSpeed: float = 50.0):
+        self.x = x
+        self.y = y
+        self.velocity = velocity
+        self.turnSpeed = turnSpeed
+        self.steps = None
+
+    def init(self):
+        heading = odometry.bearingTo(self.x, self.y)
+        if self.velocity < 0: heading += 180.0
+        rotation = odometry.fieldToRotation(heading)
+        turns = odometry.distanceTo(self.x, self.y) / DRIVE_MM_PER_TURN
+        # The turn only needs to get close, the drive holds the heading the rest of the way
+        turn = DriveCurve(rotation, 0.0, 0.0, maxAngleSpeed=self.turnSpeed, angleTolerance=2.0, kP=4.0)
+        self.steps = Sequence(turn.withTimeout(2000), DriveCurve(rotation, self.velocity, turns))
+        self.steps.init()
+
+    def execute(self):
+        self.steps.execute()
+
+    def isFinished(self) -> bool:
+        return self.steps.isFinished()
+
+    def end(self, interrupted: bool):
+        self.steps.end(interrupted)
+        setMotorSpeeds(0.0, 0.0)
+
+def goTo(x: float, y: float, velocity: float):
+    return runCommand(DriveTo(x, y, velocity))
+
+# The Path class turns a few waypoints into something we can drive through
+# without stopping. Everything expensive happens here, before the match:
+# points every spacingMm, the curvature at each one, and a target speed that
+# slows for tight bends and ramps down to zero at the end.
+# Waypoints are (x, y) in mm, field frame (same as odometry). Speeds in percent.
+
+class Path:
+    def __init__(self,
+                 waypoints,
+                 maxSpeed: float = 60.0,
+                 maxAcceleration: float = 150.0,
+                 maxLateralAcceleration: float = 800.0,
+                 spacingMm: float = 25.0):
+        # maxAcceleration is percent/s, maxLateralAcceleration is mm/s/s
+        self.xs = array("f")
+        self.ys = array("f")
+        self.addPoints(waypoints, spacingMm)
+        self.count = len(self.xs)
+        self.last = self.count - 1
+        self.distance = array("f", [0.0] * self.count)  # Along the path from the start
+        for i in range(1, self.count):
+            self.distance[i] = self.distance[i - 1] + self.gap(i - 1, i)
+        self.curvature = array("f", [0.0] * self.count)
+        for i in range(1, self.last):
+            self.curvature[i] = self.curvatureAt(i)
+        self.speed = array("f", [0.0] * self.count)
+        self.planSpeeds(maxSpeed, maxAcceleration, maxLateralAcceleration)
+
+    def addPoints(self, waypoints, spacingMm: float):
+        x0, y0 = waypoints[0]
+        self.xs.append(x0)
+        self.ys.append(y0)
+        for x1, y1 in waypoints[1:]:
+            length = math.sqrt((x1 - x0) * (x1 - x0) + (y1 - y0) * (y1 - y0))
+            steps = max(1, int(math.ceil(length / spacingMm)))
+            for k in range(1, steps + 1):
+                self.xs.append(x0 + (x1 - x0) * k / steps)
+                self.ys.append(y0 + (y1 - y0) * k / steps)
+            x0, y0 = x1, y1
+
+    def gap(self, i: int, j: int) -> float:
+        dx = self.xs[j] - self.xs[i]
+        dy = self.ys[j] - self.ys[i]
+        return math.sqrt(dx * dx + dy * dy)
+
+    def curvatureAt(self, i: int) -> float:
+        # 1/radius of the circle through this point and its neighbours
+        a = self.gap(i - 1, i)
+        b = self.gap(i, i + 1)
+        c = self.gap(i - 1, i + 1)
+        cross = ((self.xs[i] - self.xs[i - 1]) * (self.ys[i + 1] - self.ys[i - 1]) -
+                 (self.ys[i] - self.ys[i - 1]) * (self.xs[i + 1] - self.xs[i - 1]))
+        if a * b * c == 0.0: return 0.0
+        return 2.0 * abs(cross) / (a * b * c)
+
+    def planSpeeds(self, maxSpeed: float, maxAcceleration: float, maxLateralAcceleration: float):
+        toMM = DRIVE_TURNS_PER_SEC * DRIVE_MM_PER_TURN / 100.0  # percent -> mm/s
+        for i in range(self.count):
+            speed = maxSpeed
+            k = self.curvature[i]
+            if k > 0.0:
+                speed = min(speed, math.sqrt(maxLateralAcceleration / k) / toMM)
+            self.speed[i] = speed
+        # Walk back from the end so every point can still stop in time:
+        # v^2 = v_next^2 + 2*a*d
+        accel = maxAcceleration * toMM
+        self.speed[self.last] = 0.0
+        for i in range(self.last - 1, -1, -1):
+            d = self.distance[i + 1] - self.distance[i]
+            reachable = math.sqrt((self.speed[i + 1] * toMM) ** 2 + 2.0 * accel * d) / toMM
+            self.speed[i] = min(self.speed[i], reachable)
+
+class FollowPath(DriveMove):
+    # Pure pursuit: each tick, steer along the arc that reaches a point
+    # lookaheadMm further down the path. Both the closest point and the
+    # lookahead point only ever move forward, so each tick checks a few points
+    # instead of the whole path.
+    # reverse drives the path backwards (robot's back first).
+    requires = ("drive",)
+
+    def __init__(self,
+                 path: Path,
+                 lookaheadMm: float = 250.0,
+                 reverse: bool = False,
+                 maxAcceleration: float = 150.0,
+                 minSpeed: float = 8.0,
+                 toleranceMm: float = 20.0,
+                 timeoutMs: int = 10000,
+                 responses = None):
+        if responses: self.responses = responses
+        self.path = path
+        self.lookaheadMm = lookaheadMm
+        self.reverse = reverse
+        self.maxAcceleration = maxAcceleration
+        self.minSpeed = minSpeed  # Path speed ends at 0, keep creeping until we're there
+        self.toleranceMm = toleranceMm
+        self.timeoutMs = timeoutMs
+        self.closest = 0
+        self.lookahead = 0
+        self.speed = 0.0
+        self.startTime = 0.0
+        self.done = False
+
+    def init(self):
+        self.closest = 0
+        self.lookahead = 0
+        self.speed = 0.0
+        self.done = False
+        self.startTime = brain.timer.time(MSEC)
+        self.startMonitor()
+        pathLog.begin()
+
+    def distanceFrom(self, x: float, y: float, i: int) -> float:
+        dx = self.path.xs[i] - x
+        dy = self.path.ys[i] - y
+        return math.sqrt(dx * dx + dy * dy)
+
+    def findClosest(self, x: float, y: float):
+        path = self.path
+        best = self.distanceFrom(x, y, self.closest)
+        i = self.closest
+        window = min(path.last, self.lookahead + 1)  # Never look past the lookahead point
+        while i < window:
+            d = self.distanceFrom(x, y, i + 1)
+            if d > best: break
+            best = d
+            i += 1
+        self.closest = i
+
+    def findLookahead(self, x: float, y: float):
+        i = max(self.lookahead, self.closest)
+        while i < self.path.last and self.distanceFrom(x, y, i) < self.lookaheadMm:
+            i += 1
+        self.lookahead = i
+
+    def execute(self):
+        if self.isRecovering():
+            self.done = self.recovered()
+            return
+        path = self.path
+        x, y, heading = odometry.pose
+        if self.reverse: heading += 180.0
+        self.findClosest(x, y)
+        self.findLookahead(x, y)
+        # Sideways offset of the lookahead point (right is positive) gives the arc
+        theta = math.radians(heading)
+        dx = path.xs[self.lookahead] - x
+        dy = path.ys[self.lookahead] - y
+        lateral = dx * math.cos(theta) - dy * math.sin(theta)
+        distance = math.sqrt(dx * dx + dy * dy)
+        curvature = 0.0 if distance == 0.0 else 2.0 * lateral / (distance * distance)
+        # Speed comes from the plan, limited so it can't jump from standstill
+        target = max(path.speed[self.closest], self.minSpeed)
+        dt = scheduler.dt()
+        lastSpeed = self.speed
+        self.speed = min(target, self.speed + self.maxAcceleration * dt)
+        # Path speeds are percent of full speed; feedforward turns them into commands
+        toTurns = DRIVE_TURNS_PER_SEC / 100.0
+        turnsPerSec = self.speed * toTurns
+        acceleration = (self.speed - lastSpeed) * toTurns / dt if dt > 0.0 else 0.0
+        half = curvature * DRIVE_TRACK_MM / 2.0
+        left = (turnsPerSec * (1.0 + half), acceleration * (1.0 + half))
+        right = (turnsPerSec * (1.0 - half), acceleration * (1.0 - half))
+        if self.reverse: left, right = (-right[0], -right[1]), (-left[0], -left[1])
+        leftSpeed = feedforward(DRIVE_LEFT, left[0], left[1])
+        rightSpeed = feedforward(DRIVE_RIGHT, right[0], right[1])
+        leftSpeed = clamp(leftSpeed, -100.0, 100.0)
+        rightSpeed = clamp(rightSpeed, -100.0, 100.0)
+        setMotorSpeeds(leftSpeed, rightSpeed)
+        pathLog.record(self.closest, self.lookahead, curvature, self.speed, leftSpeed, rightSpeed)
+        atEnd = self.lookahead == path.last and self.distanceFrom(x, y, path.last) < self.toleranceMm
+        timedOut = brain.timer.time(MSEC) - self.startTime > self.timeoutMs
+        self.done = atEnd or timedOut
+        if self.monitor(leftSpeed, rightSpeed): self.done = self.recovered()
+
+    def isFinished(self) -> bool:
+        return self.done
+
+    def end(self, interrupted: bool):
+        setMotorSpeeds(0.0, 0.0)
+        pathLog.finish()
+
+def goPath(waypoints, maxSpeed: float = 60.0, reverse: bool = False):
+    return runCommand(FollowPath(Path(waypoints, maxSpeed), reverse=reverse))
+
+# Characterization: quasistatic and step tests on the drive, fitted per side
+CHAR_RAMP_PCT_PER_SEC = 4.0  # Quasistatic: command creeps up this slowly (no acceleration to speak of)
+CHAR_RAMP_MAX_PCT = 40.0     # ...until it gets here. About 80cm of straight driving.
+CHAR_STEP_PCT = 50.0         # Step test, driven backwards toward where we started
+CHAR_STEP_MS = 1500
+CHAR_REST_MS = 1000          # Coast to a stop between the tests
+CHAR_MOVING = 0.02           # Slower than this (turns/s) isn't moving yet
+CHAR_MIN_PCT = 2.0           # Only fit kA while well short of the step's top speed
+
+# The LineFit class is least squares for y = a + b*x, without keeping the samples
+# (a few hundred samples would cost more memory than the brain wants to spare).
+
+class LineFit:
+    def __init__(self):
+        self.n = 0
+        self.sx = 0.0
+        self.sy = 0.0
+        self.sxx = 0.0
+        self.sxy = 0.0
+
+    def add(self, x: float, y: float):
+        self.n += 1
+        self.sx += x
+        self.sy += y
+        self.sxx += x * x
+        self.sxy += x * y
+
+    def solve(self):
+        # Returns (a, b), or None with too little spread in x to tell
+        d = self.n * self.sxx - self.sx * self.sx
+        if self.n < 2 or d <= 0.0: return None
+        b = (self.n * self.sxy - self.sx * self.sy) / d
+        return (self.sy - b * self.sx) / self.n, b
+
+    def slope(self):
+        # Best b for y = b*x (no a)
+        return self.sxy / self.sxx if self.sxx > 0.0 else None
+
+CHAR_RAMP = 0
+CHAR_REST = 1
+CHAR_STEP = 2
+
+# The Characterize class measures what the drive does for a given command
+# First a quasistatic test: the command creeps up so slowly that acceleration
+# doesn't matter, and command against speed gives kS (where the line starts)
+# and kV (its slope). Then a step test: a sudden command, and whatever the
+# steady-state part doesn't explain while the wheels speed up is kA.
+# Needs about a metre of clear floor in front of the robot. The fit replaces
+# DRIVE_FEEDFORWARD right away and is printed to the console so it can be
+# pasted into the code.
+
+class Characterize(Command):
+    requires = ("drive",)
+
+    def __init__(self):
+        self.phase = CHAR_RAMP
+        self.phaseStart = 0.0
+        self.command = 0.0
+        self.fits = (LineFit(), LineFit())
+        self.accelFits = (LineFit(), LineFit())
+        self.gains = [None, None]
+        self.lastMs = 0.0
+        self.last = (0.0, 0.0)      # Wheel positions (turns)
+        self.speeds = (0.0, 0.0)    # Turns per second
+        self.done = False
+
+    def init(self):
+        self.fits = (LineFit(), LineFit())
+        self.accelFits = (LineFit(), LineFit())
+        self.gains = [None, None]
+        self.done = False
+        self.command = 0.0
+        sensors.refreshDrive(force=True)
+        self.last = (sensors.leftRevs, sensors.rightRevs)
+        self.speeds = (0.0, 0.0)
+        self.lastMs = brain.timer.time(MSEC)
+        self.startPhase(CHAR_RAMP)
+        charLog.begin(CHAR_RAMP_PCT_PER_SEC, CHAR_RAMP_MAX_PCT, CHAR_STEP_PCT, CHAR_STEP_MS)
+
+    def startPhase(self, phase: int):
+        self.phase = phase
+        self.phaseStart = brain.timer.time(MSEC)
+
+    def measure(self, now: float):
+        # Speeds from this tick's encoder snapshot; returns the accelerations
+        dt = (now - self.lastMs) / 1000.0
+        if dt <= 0.0: return 0.0, 0.0
+        positions = (sensors.leftRevs, sensors.rightRevs)
+        speeds = ((positions[0] - self.last[0]) / dt, (positions[1] - self.last[1]) / dt)
+        accelerations = ((speeds[0] - self.speeds[0]) / dt, (speeds[1] - self.speeds[1]) / dt)
+        self.last = positions
+        self.speeds = speeds
+        self.lastMs = now
+        return accelerations
+
+    def execute(self):
+        now = brain.timer.time(MSEC)
+        previous = self.speeds
+        accelerations = self.measure(now)
+        elapsedMs = now - self.phaseStart
+        commanded = self.command  # What the wheels were told last tick
+        if self.phase == CHAR_RAMP:
+            for side in (0, 1):
+                if self.speeds[side] > CHAR_MOVING: self.fits[side].add(self.speeds[side], commanded)
+            self.command = CHAR_RAMP_PCT_PER_SEC * elapsedMs / 1000.0
+            if self.command > CHAR_RAMP_MAX_PCT:
+                self.command = 0.0
+                self.startPhase(CHAR_REST)
+        elif self.phase == CHAR_REST:
+            if elapsedMs >= CHAR_REST_MS:
+                for side in (0, 1): self.gains[side] = self.fits[side].solve()
+                if self.gains[0] is None or self.gains[1] is None:
+                    consolePrint("CHARACTERIZE: the wheels never moved")
+                    self.done = True
+                    return
+                self.command = -CHAR_STEP_PCT
+                self.startPhase(CHAR_STEP)
+        else:
+            for side in (0, 1):
+                # Backwards, so flip everything round to fit like it was forwards
+                # Acceleration is measured across the last two ticks, so use the speed from between them
+                speed = -(self.speeds[side] + previous[side]) / 2.0
+                acceleration = -accelerations[side]
+                kS, kV = self.gains[side]
+                unexplained = -commanded - kS - kV * speed  # Percent that went into speeding up
+                if unexplained > CHAR_MIN_PCT:
+                    # Acceleration is the noisy one (differences of differences), so it goes on
+                    # the y side where least squares expects the noise
+                    self.accelFits[side].add(unexplained, acceleration)
+            if elapsedMs >= CHAR_STEP_MS:
+                self.command = 0.0
+                self.done = True
+        charLog.record(commanded, self.speeds[0], self.speeds[1])
+        setMotorSpeeds(self.command, self.command)
+
+    def isFinished(self) -> bool:
+        return self.done
+
+    def end(self, interrupted: bool):
+        setMotorSpeeds(0.0, 0.0)
+        charLog.finish()
+        if interrupted or self.gains[0] is None or self.gains[1] is None: return
+        for side, offset in ((0, DRIVE_LEFT), (1, DRIVE_RIGHT)):
+            kS, kV = self.gains[side]
+            slope = self.accelFits[side].slope()  # Acceleration per percent
+            kA = 1.0 / slope if slope and slope > 0.0 else DRIVE_FEEDFORWARD[offset + 2]
+            # The ramp wasn't quite zero acceleration: take out what kA says that cost
+            kS -= kA * CHAR_RAMP_PCT_PER_SEC / kV
+            DRIVE_FEEDFORWARD[offset] = max(0.0, kS)
+            DRIVE_FEEDFORWARD[offset + 1] = kV
+            DRIVE_FEEDFORWARD[offset + 2] = kA
+        ff = DRIVE_FEEDFORWARD
+        consolePrint("DRIVE_FEEDFORWARD = array(\"f\", [{:.2f}, {:.2f}, {:.3f},    # Left kS, kV, kA".format(ff[0], ff[1], ff[2]))
+        consolePrint("                                {:.2f}, {:.2f}, {:.3f}])   # Right".format(ff[3], ff[4], ff[5]))
+
+def characterizeDrive():
+    runCommand(Characterize())
+
+# Routines are tables of steps rather than code, so changing a distance or a
+# speed is changing a number. Each row is (start, action, args, deadlineMs):
+#   THEN  start once every earlier step has finished
+#   NEXT  start once the row above has finished (a second track keeps going)
+#   WITH  start together with the row above
+# A deadline of 0 means none; otherwise a step still running that long after it
+# started is ended early. "routine" rows pull in another routine's steps.
+# "goto" and "path" take field points in mm, in the odometry frame, and are
+# planned from wherever we really are, so they take out what earlier moves missed.
+# loadRoutine() checks a table, builds every command (and so plans every motion
+# profile and turn) before the match, and flattens it into one Routine.
+
+THEN = 0
+NEXT = 1
+WITH = 2
+ROUTINE_STARTS = ("THEN", "NEXT", "WITH")
+
+# An argument range is (low, high), or (low, high, also) when one more value
+# outside it means something
+KEEP_HEADING = 360  # A straight that holds whatever heading it starts with
+FIELD_POINTS = ((0, FIELD_WIDTH_MM), (0, FIELD_HEIGHT_MM))  # An argument that's some (x, y) points
+
+# Action: (argument ranges, what to build from the arguments and the heading we'll be at)
+ROUTINE_ACTIONS = {
+    "straight": (((0, 200), (-100, 100), (-180, 180, KEEP_HEADING)),  # inches, velocity, field heading
+                 lambda a, heading: DriveStraight(a[0], a[1], requiredYaw=a[2])),
+    "turn": (((0, 100), (-180, 180)),  # velocity, field heading
+             lambda a, heading: TurnTo(a[0], a[1], plannedFrom=heading)),
+    "curve": (((-180, 180), (-100, 100), (0, 20)),  # heading, speed, wheel turns
+              lambda a, heading: DriveCurve(a[0], a[1], a[2])),
+    "goto": (FIELD_POINTS + ((-100, 100),),  # x, y, velocity (negative backs up to it)
+             lambda a, heading: DriveTo(a[0], a[1], a[2])),
+    "path": (((-100, 100), FIELD_POINTS),  # speed (negative backs along it), waypoints
+             lambda a, heading: FollowPath(Path(a[1], abs(a[0])), reverse=a[0] < 0)),
+    "wait": (((0, 15000),), lambda a, heading: Delay(a[0])),  # ms
+    "intake": ((), lambda a, heading: StartIntake()),
+    "wind": ((), lambda a, heading: WindCat()),
+    "release": ((), lambda a, heading: ReleaseCat()),
+    "fire": ((), lambda a, heading: FireCat()),
+    "routine": (None, None),  # Name of another routine
+}
+
+AUTO_LOOP = (
+    # The catapult rewinds from the last shot while we drive out for more balls
+    (THEN, "intake", (), 0),
+    (WITH, "straight", (55, 65, -90), 5000),
+    (NEXT, "straight", (60, -65, -90), 5000),
+    (NEXT, "straight", (10, -15, -90), 5000),
+    (THEN, "wait", (100,), 0),
+    (THEN, "release", (), 0),
+    (THEN, "wait", (100,), 0),
+    (THEN, "fire", (), 0),
+)
+
+NEAR_GOAL = (
+    (THEN, "intake", (), 0),  # Winds the catapult first if it needs it
+    (WITH, "straight", (10, 40, 0), 5000),
+    (NEXT, "turn", (25, -90), 4000),  # Turns to face goal
+    (NEXT, "straight", (40, -50, -90), 4000),  # Go back
+    #(NEXT, "straight", (20, 40, -90), 3000),  # Collects ball
+    (NEXT, "straight", (35, -50, -90), 5000),  # Drives to goal
+    (THEN, "wait", (1000,), 0),
+    (THEN, "release", (), 0),
+    (THEN, "wait", (100,), 0),
+    (THEN, "fire", (), 0),
+    (THEN, "routine", "autoLoop", 0),
+    (THEN, "routine", "autoLoop", 0),
+    (THEN, "routine", "autoLoop", 0),
+    (THEN, "routine", "autoLoop", 0),
+    (THEN, "routine", "autoLoop", 0),
+    (THEN, "wind", (), 0),
+)
+
+ROUTINES = {"autoLoop": AUTO_LOOP, "nearGoal": NEAR_GOAL}
+
+STEP_WAITING = 0
+STEP_RUNNING = 1
+STEP_DONE = 2
+
+# The Routine class runs a loaded routine's steps, each from its own slot
+# Step i starts once the first joinBefore[i] steps have all finished and step
+# waitFor[i] (if not -1) has too. A step that finishes lets whatever was waiting
+# on it start and run in the same tick, like Sequence does.
+
+class Routine(Command):
+    def __init__(self, name: str, names, commands, waitFor, joinBefore, deadlines):
+        n = len(commands)
+        self.name = name
+        self.names = tuple(names)
+        self.commands = tuple(commands)
+        self.requires = requirementsOf(self.commands)
+        self.waitFor = array("h", waitFor)
+        self.joinBefore = array("h", joinBefore)
+        self.deadlines = array("f", deadlines)
+        self.states = bytearray(n)
+        self.startedAt = array("f", [0.0] * n)
+        self.ranAt = array("l", [-1] * n)  # Which tick each step last executed in
+        self.ticks = 0
+        self.first = 0  # Every step before this has finished
+        self.late = 0
+
+    def init(self):
+        for i in range(len(self.commands)):
+            self.states[i] = STEP_WAITING
+            self.ranAt[i] = -1
+        self.ticks = 0
+        self.first = 0
+        self.late = 0
+        # Start what starts straight away, like Sequence does; it first runs next tick
+        now = brain.timer.time(MSEC)
+        i = 0
+        while i < len(self.commands) and self.joinBefore[i] == 0:
+            if self.waitFor[i] < 0:
+                self.commands[i].init()
+                self.states[i] = STEP_RUNNING
+                self.startedAt[i] = now
+            i += 1
+
+    def execute(self):
+        commands = self.commands
+        states = self.states
+        n = len(commands)
+        tick = self.ticks
+        self.ticks += 1
+        now = brain.timer.time(MSEC)
+        i = self.first
+        while i < n and self.joinBefore[i] <= self.first:
+            state = states[i]
+            finished = False
+            if state == STEP_WAITING:
+                other = self.waitFor[i]
+                if other < 0 or states[other] == STEP_DONE:
+                    commands[i].init()
+                    states[i] = state = STEP_RUNNING
+                    self.startedAt[i] = now
+            if state == STEP_RUNNING and self.ranAt[i] != tick:
+                self.ranAt[i] = tick
+                command = commands[i]
+                deadline = self.deadlines[i]
+                if deadline > 0 and now - self.startedAt[i] >= deadline:
+                    command.end(True)
+                    self.late += 1
+                    brain.play_sound(SoundType.DOOR_CLOSE)
+                    status.error("LATE " + self.names[i])
+                    finished = True
+                else:
+                    command.execute()
+                    if command.isFinished():
+                        command.end(False)
+                        finished = True
+            if finished:
+                states[i] = STEP_DONE
+                while self.first < n and states[self.first] == STEP_DONE: self.first += 1
+                i = self.first  # Anything waiting on this step can go now
+            else:
+                i += 1
+
+    def isFinished(self) -> bool:
+        return self.first >= len(self.commands)
+
+    def end(self, interrupted: bool):
+        if not interrupted: return
+        for i in range(self.first, len(self.commands)):
+            if self.states[i] == STEP_RUNNING: self.commands[i].end(True)
+            self.states[i] = STEP_DONE
+
+def checkStep(name: str, row: int, step):
+    # Raises ValueError if this row can't be right
+    where = "{} row {}".format(name, row)
+    if not isinstance(step, tuple) or len(step) != 4:
+        raise ValueError("{}: want (start, action, args, deadlineMs)".format(where))
+    start, action, args, deadlineMs = step
+    if start not in (THEN, NEXT, WITH): raise ValueError("{}: unknown start {}".format(where, start))
+    if action not in ROUTINE_ACTIONS: raise ValueError("{}: unknown action {}".format(where, action))
+    if not isinstance(deadlineMs, (int, float)) or deadlineMs < 0:
+        raise ValueError("{}: deadline {} isn't a time".format(where, deadlineMs))
+    if action == "routine":
+        if not isinstance(args, str) or args not in ROUTINES:
+            raise ValueError("{}: unknown routine {}".format(where, args))
+        if start != THEN: raise ValueError("{}: a routine can only start with THEN".format(where))
+        return
+    ranges = ROUTINE_ACTIONS[action][0]
+    if not isinstance(args, tuple) or len(args) != len(ranges):
+        raise ValueError("{}: {} takes a tuple of {} arguments".format(where, action, len(ranges)))
+    for value, limits in zip(args, ranges):
+        low, high = limits[0], limits[1]
+        if isinstance(low, tuple):  # FIELD_POINTS: a path needs two at least
+            if not isinstance(value, tuple) or len(value) < 2:
+                raise ValueError("{}: {} wants a tuple of (x, y) points".format(where, action))
+            for point in value:
+                if not isinstance(point, tuple) or len(point) != 2:
+                    raise ValueError("{}: {} point {} isn't (x, y)".format(where, action, point))
+                for v, (pointLow, pointHigh) in zip(point, (low, high)):
+                    if not isinstance(v, (int, float)) or not pointLow <= v <= pointHigh:
+                        raise ValueError("{}: {} point {} is off the field".format(where, action, point))
+        elif not isinstance(value, (int, float)):
+            raise ValueError("{}: {} {} isn't a number".format(where, action, value))
+        elif not low <= value <= high and not (len(limits) > 2 and value == limits[2]):
+            raise ValueError("{}: {} {} not in {}..{}".format(where, action, value, low, high))
+
+def loadRoutine(name: str, steps = None, loading = ()) -> Routine:
+    # Checks a routine and builds it, with any routines it includes, into one flat Routine
+    if steps is None:
+        if name not in ROUTINES: raise ValueError("no routine {}".format(name))
+        steps = ROUTINES[name]
+    names, commands, waitFor, joinBefore, deadlines, tracks = [], [], [], [], [], []
+    heading = None  # Where the moves so far will have left us pointing, if we know
+    for row in range(len(steps)):
+        step = steps[row]
+        checkStep(name, row, step)
+        start, action, args, deadlineMs = step
+        i = len(commands)
+        if start != THEN and (row == 0 or steps[row - 1][1] == "routine"):
+            raise ValueError("{} row {}: {} needs a step above it".format(name, row, ROUTINE_STARTS[start]))
+        if action == "routine":
+            if args in loading or args == name: raise ValueError("{} includes itself".format(name))
+            inner = loadRoutine(args, None, loading + (name,))
+            offset = len(commands)
+            names.extend(inner.names)
+            commands.extend(inner.commands)
+            waitFor.extend(w + offset if w >= 0 else -1 for w in inner.waitFor)
+            joinBefore.extend(j + offset for j in inner.joinBefore)
+            deadlines.extend(inner.deadlines)
+            tracks.extend(range(offset, len(commands)))  # Only rows in the same block are compared
+            heading = None  # Not worth following through another routine
+            continue
+        if start == THEN:
+            after, join, track = -1, i, i
+        elif start == NEXT:
+            after, join, track = i - 1, joinBefore[i - 1], tracks[i - 1]
+        else:
+            after, join, track = waitFor[i - 1], joinBefore[i - 1], i
+        command = ROUTINE_ACTIONS[action][1](args, heading)
+        # Steps that can run at the same time mustn't want the same subsystem
+        for j in range(join, i):
+            if tracks[j] != track and sharesRequirement(commands[j].requires, command.requires):
+                raise ValueError("{} row {}: {} and {} both need {}".format(
+                    name, row, names[j], action, "/".join(command.requires)))
+        if action == "straight" and args[2] != KEEP_HEADING: heading = args[2]
+        elif action == "turn": heading = args[1]
+        elif action == "curve": heading = args[0]
+        elif action in ("goto", "path"): heading = None  # Depends on where we'll really be
+        names.append(action)
+        commands.append(command)
+        waitFor.append(after)
+        joinBefore.append(join)
+        deadlines.append(deadlineMs)
+        tracks.append(track)
+    return Routine(name, names, commands, waitFor, joinBefore, deadlines)
+
+loadedRoutines = {}
+
+def loadRoutines():
+    # Before the match, so pressing go starts moving straight away
+    for name in ROUTINES:
+        loadedRoutines[name] = loadRoutine(name)
+
+def routine(name: str) -> Routine:
+    if name not in loadedRoutines: loadedRoutines[name] = loadRoutine(name)
+    return loadedRoutines[name]
+
+def runFromStart(name: str):
+    # From where we were placed: the routine's headings and points are field ones
+    odometry.setPose(*START_POSE)
+    return runCommand(routine(name))
+
+# Where the profiler looks: (class or None for a function here, name, histogram)
+PROFILE_POINTS = (
+    (Scheduler, "tick", "scheduler"),
+    (None, "eyeTick", "checkEyes"),
+    (BallHandler, "handle", "eyeEvent"),
+    (DriveStraight, "execute", "goStraight"),
+    (DriveCurve, "execute", "goCurve"),
+    (TurnTo, "execute", "goTurn"),
+    (FollowPath, "execute", "goPath"),
+    (Characterize, "execute", "characterize"),
+)
 
 def run():
     setup()
+    if PROFILING: profiler.enable()
+    startThreads()
+    calibration.start()  # Ready by the time anyone has picked a mode
+    loadRoutines()
+    setupSelector()  # Arms the first mode straight away
     fillScreen(Color.BLUE_VIOLET, Color.WHITE)
     print("Extreme")
     print("Axolotls!")
@@ -599,33 +3194,10 @@ def runCalibrate():
     calibrate()
 
 def autoLoop():
-    startIntake()
-    goStraight(55, 65, timeoutSecs=5, requiredYaw=-90)
-    goStraight(60, -65, timeoutSecs=5, requiredYaw=-90)
-    goStraight(10, -15, timeoutSecs=5, requiredYaw=-90)
-    #intake.stop(COAST)
-    wait(100, MSEC)
-    releaseCat()
-    wait(100, MSEC)
-    releaseCat()
-    windCat()
+    runFromStart("autoLoop")
 
 def run4Switches():
     pass
 
 def runNearGoal():
-    windCat()
-    startIntake()
-    goStraight(10, 40, timeoutSecs=5,requiredYaw=0)
-    goTurn90(25, 4) # Turns to face goal
-    goStraight(40, -50, timeoutSecs=4, requiredYaw=-90) # go back
-    #goStraight(20, 40, timeoutSecs=3, requiredYaw=-90) #collects ball
-    goStraight(35, -50, timeoutSecs=5, requiredYaw=-90) #Drives to goal
-    #intake.stop(COAST)
-    wait(1000,MSEC)
-    releaseCat()
-    wait(100,MSEC)
-    releaseCat()
-    windCat()
-    for i in range(5):
-        autoLoop()
\ No newline at end of file
+    runFromStart("nearGoal")
@@ -0,0 +1,55 @@
+# Tests run src/auto.py against the simulated vex module in sim/vex.py
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for d in (os.path.join(ROOT, "src"), os.path.join(ROOT, "sim")):
+    if d not in sys.path: sys.path.insert(0, d)
+
+import simrun
+import vex
+
+@pytest.fixture
+def auto():
+    # A fresh field, clock and auto.py; no threads running
+    return simrun.loadAuto(startThreads=False)
+
+@pytest.fixture
+def robot(auto):
+    # The same, with its threads running like run() does on the brain
+    auto.startThreads()
+    return auto
+
+def inSim(body, deadline: float = 30.0):
+    # Runs body on the simulator's main thread and returns what it returned
+    result = []
+    vex.sim.run(lambda: result.append(body()), deadline)
+    return result[0]
+
+class Probe:
+    # A command that records what the scheduler did to it
+    def __init__(self, auto, ticks: int = 1, requires = ()):
+        self.calls = []
+        self.ticks = ticks
+        self.requires = requires
+        self.executed = 0
+        probe = self
+        class Recorded(auto.Command):
+            def init(self):
+                probe.calls.append("init")
+                probe.executed = 0
+            def execute(self):
+                probe.calls.append("execute")
+                probe.executed += 1
+            def isFinished(self):
+                return probe.executed >= probe.ticks
+            def end(self, interrupted):
+                probe.calls.append("interrupted" if interrupted else "end")
+        self.command = Recorded()
+        self.command.requires = requires
+
+@pytest.fixture
+def probe(auto):
+    return lambda ticks=1, requires=(): Probe(auto, ticks, requires)
@@ -0,0 +1,45 @@
+import pytest
+
+class Motor:
+    # Records what reached the motor
+    def __init__(self):
+        self.sent = []
+    def __getattr__(self, name):
+        return lambda *args: self.sent.append((name,) + args)
+
+class Device:
+    def __init__(self, motor):
+        self.motor = motor
+    def get(self):
+        return self.motor
+
+@pytest.fixture
+def motor(auto):
+    fake = Motor()
+    return auto.CachedMotor(Device(fake)), fake
+
+def test_repeats_are_not_sent(auto, motor):
+    cached, fake = motor
+    for _ in range(3):
+        cached.set_velocity(50, auto.PERCENT)
+        cached.spin(auto.FORWARD)
+    cached.set_velocity(50.2, auto.PERCENT)  # The same whole rpm
+    assert [s[0] for s in fake.sent] == ["set_velocity", "spin"]
+    cached.set_velocity(60, auto.PERCENT)
+    cached.stop(auto.HOLD)
+    cached.stop(auto.HOLD)
+    assert [s[0] for s in fake.sent] == ["set_velocity", "spin", "set_velocity", "stop"]
+
+def test_moves_the_motor_finishes_are_always_sent(auto, motor):
+    cached, fake = motor
+    cached.spin(auto.FORWARD, 40, auto.PERCENT)
+    cached.spin_for(auto.FORWARD, 90, auto.DEGREES)
+    cached.spin(auto.FORWARD, 40, auto.PERCENT)  # spin_for replaced the spin
+    assert [s[0] for s in fake.sent] == ["spin", "spin_for", "spin"]
+
+def test_invalidate_forgets_everything(auto, motor):
+    cached, fake = motor
+    cached.set_max_torque(100)
+    cached.invalidate()  # Something else drove the motor directly
+    cached.set_max_torque(100)
+    assert [s[0] for s in fake.sent] == ["set_max_torque", "set_max_torque"]
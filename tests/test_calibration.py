@@ -0,0 +1,31 @@
+import simrun
+import vex
+
+from conftest import Probe, inSim
+
+def test_a_failed_calibration_stops_everything_from_the_scheduler():
+    config = vex.SimConfig()
+    config.calibrationSecs = 10.0  # Past limitMs()
+    auto = simrun.loadAuto(config)
+    a = Probe(auto, 10 ** 6, ("cat",))
+    posted = []
+    post = auto.scheduler.post
+    auto.scheduler.post = lambda event: (posted.append(event), post(event))
+    def body():
+        auto.scheduler.schedule(a.command)
+        auto.calibrate()
+        while auto.calibration.state == auto.CAL_RUNNING: auto.wait(50, auto.MSEC)
+        auto.wait(20, auto.MSEC)
+    inSim(body)
+    assert auto.calibration.state == auto.CAL_FAILED
+    assert posted == [auto.SCHED_STOP_ALL]
+    assert a.calls[-1] == "interrupted"
+
+def test_calibrate_mode_starts_a_running_calibration_over(robot):
+    def body():
+        robot.calibrate()
+        robot.wait(1000, robot.MSEC)
+        robot.selector.runMode(0)
+        return robot.calibration.attempts, robot.calibration.state
+    attempts, state = inSim(body)
+    assert attempts == 2 and state == robot.CAL_RUNNING
@@ -0,0 +1,41 @@
+import pytest
+
+from conftest import inSim
+
+@pytest.fixture
+def catapult(auto):
+    return auto.Catapult()
+
+def test_nothing_learned_means_no_wind_target(catapult):
+    assert catapult.windTarget(0.0) is None
+
+def test_winds_to_the_next_cocked_position_plus_the_overwind(auto, catapult):
+    catapult.sawCocked(100.0)
+    over = auto.CAT_OVERWIND_DEG
+    assert catapult.windTarget(100.0 + over - 5.0) == 100.0 + over
+    assert catapult.windTarget(150.0) == 100.0 + over + 360.0
+
+def test_the_cycle_is_learned_from_one_shot_apart(auto, catapult):
+    catapult.sawCocked(100.0)
+    catapult.sawCocked(450.0)
+    assert catapult.cycleDeg == 360.0 - auto.CAT_LEARN_GAIN * 10.0
+    catapult.sawCocked(500.0)  # Nowhere near a cycle: a fluke, not learned from
+    assert catapult.cycleDeg == 360.0 - auto.CAT_LEARN_GAIN * 10.0
+
+def test_no_wind_target_if_it_would_pass_the_release(catapult):
+    catapult.sawCocked(100.0)
+    catapult.sawRelease(300.0, 0.0)
+    assert catapult.windTarget(250.0) is None  # The release at 300 comes before the cocked 470
+    assert catapult.windTarget(300.0) == 470.0  # Just fired: the release doesn't count
+
+def test_the_rewind_after_a_shot_goes_where_the_first_wind_learned(robot, monkeypatch):
+    catapult = robot.catapult
+    targets = []
+    windTarget = catapult.windTarget
+    monkeypatch.setattr(catapult, "windTarget", lambda position: targets.append(windTarget(position)) or targets[-1])
+    inSim(lambda: (robot.windCat(), robot.releaseCat()))  # Firing rewinds straight after
+    assert targets[0] is None and targets[1] is not None
+    assert catapult.cockedAt is not None and catapult.releasedAt is not None
+    assert catapult.winds == 2 and catapult.shots == 1
+    assert catapult.resyncs == 0  # The eye agreed with the learned position
+    assert robot.catEye.isObjectVisible()
@@ -0,0 +1,76 @@
+from conftest import inSim
+
+def tick(command, times: int = 1):
+    for _ in range(times):
+        command.execute()
+
+def test_sequence_chains_finished_steps_in_one_tick(auto, probe):
+    a, b, c = probe(1), probe(1), probe(2)
+    seq = auto.Sequence(a.command, b.command, c.command)
+    seq.init()
+    assert a.calls == ["init"] and b.calls == []
+    tick(seq)
+    assert a.calls == ["init", "execute", "end"]
+    assert b.calls == ["init", "execute", "end"]
+    assert c.calls == ["init", "execute"]
+    assert not seq.isFinished()
+    tick(seq)
+    assert c.calls[-1] == "end" and seq.isFinished()
+
+def test_sequence_interrupt_ends_only_the_current_step(auto, probe):
+    a, b = probe(5), probe(1)
+    seq = auto.Sequence(a.command, b.command)
+    seq.init()
+    tick(seq)
+    seq.end(True)
+    assert a.calls[-1] == "interrupted"
+    assert b.calls == []
+
+def test_parallel_finishes_when_all_have(auto, probe):
+    a, b = probe(1), probe(3)
+    par = auto.Parallel(a.command, b.command)
+    par.init()
+    tick(par)
+    assert a.calls[-1] == "end" and not par.isFinished()
+    tick(par, 2)
+    assert b.calls[-1] == "end" and par.isFinished()
+
+def test_race_finishes_with_the_first_and_interrupts_the_rest(auto, probe):
+    a, b = probe(1), probe(3)
+    race = auto.Race(a.command, b.command)
+    race.init()
+    tick(race)
+    assert race.isFinished()
+    race.end(False)
+    assert a.calls[-1] == "end"
+    assert b.calls[-1] == "interrupted"
+
+def test_when_skips_the_command_if_the_condition_is_false(auto, probe):
+    a = probe(1)
+    skipped = auto.When(lambda: False, a.command)
+    skipped.init()
+    assert skipped.isFinished() and a.calls == []
+
+def test_requirements_are_merged_without_repeats(auto, probe):
+    a, b = probe(requires=("drive",)), probe(requires=("cat", "drive"))
+    assert auto.Sequence(a.command, b.command).requires == ("drive", "cat")
+    assert auto.sharesRequirement(("cat",), ("intake", "cat"))
+    assert not auto.sharesRequirement(("cat",), ("drive",))
+
+def test_scheduler_refuses_busy_subsystems_unless_interrupting(auto, probe):
+    a, b = probe(10, ("drive",)), probe(1, ("drive",))
+    assert auto.scheduler.schedule(a.command)
+    assert not auto.scheduler.schedule(b.command)
+    assert auto.scheduler.schedule(b.command, interrupt=True)
+    assert a.calls[-1] == "interrupted" and a.command.interrupted
+
+def test_with_timeout_interrupts_a_command_that_runs_too_long(robot, probe):
+    a = probe(10 ** 6)
+    finished = inSim(lambda: robot.runCommand(a.command.withTimeout(50)))
+    assert finished
+    assert a.calls[-1] == "interrupted"
+
+def test_delay_waits_on_the_clock(robot):
+    start = inSim(lambda: robot.brain.timer.time(robot.MSEC))
+    elapsed = inSim(lambda: (robot.runCommand(robot.Delay(200)), robot.brain.timer.time(robot.MSEC))[1]) - start
+    assert 200 <= elapsed < 240
@@ -0,0 +1,32 @@
+import pytest
+
+@pytest.fixture
+def slipping(auto, monkeypatch):
+    # Started at (100, 200), then the wheels spun: the next monitor() sees a slip
+    def start(move):
+        auto.odometry.pose = (100.0, 200.0, 30.0)
+        move.startMonitor()
+        auto.odometry.pose = (400.0, 500.0, 30.0)
+    monkeypatch.setattr(auto.driveMonitor, "update", lambda left, right: auto.DRIVE_SLIP)
+    return start
+
+def test_a_slip_relocalizes_and_the_move_carries_on(auto, slipping):
+    move = auto.DriveStraight(10, 40)
+    slipping(move)
+    assert not move.monitor(40.0, 40.0)
+    assert not move.isRecovering()
+    assert auto.odometry.pose == (100.0, 200.0, 30.0)  # The heading was never in doubt
+
+def test_only_abort_ends_a_move(auto, slipping):
+    responses = (auto.DRIVE_CONTINUE, auto.DRIVE_ABORT, auto.DRIVE_ABORT, auto.DRIVE_ABORT)
+    move = auto.DriveStraight(10, 40, responses=responses)
+    slipping(move)
+    assert move.monitor(40.0, 40.0)
+    assert move.isRecovering() and move.recovered()
+
+def test_pushing_into_a_wall_keeps_going_by_default(auto, monkeypatch):
+    monkeypatch.setattr(auto.driveMonitor, "update", lambda left, right: auto.DRIVE_STALL)
+    move = auto.DriveStraight(10, -50)
+    move.startMonitor()
+    assert not move.monitor(-50.0, -50.0)
+    assert not move.isRecovering()
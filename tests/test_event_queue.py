@@ -0,0 +1,23 @@
+def test_events_come_out_in_the_order_posted(auto):
+    q = auto.EventQueue(4)
+    for event in (3, 1, 2):
+        q.post(event)
+    taken = []
+    while not q.isEmpty():
+        taken.append(q.take()[0])
+    assert taken == [3, 1, 2]
+
+def test_full_queue_drops_the_oldest(auto):
+    q = auto.EventQueue(3)
+    for event in range(5):
+        q.post(event)
+    assert q.dropped == 2
+    assert [q.take()[0] for _ in range(3)] == [2, 3, 4]
+    assert q.isEmpty()
+
+def test_queue_wraps_around(auto):
+    q = auto.EventQueue(2)
+    for event in range(6):
+        q.post(event)
+        assert q.take()[0] == event
+    assert q.dropped == 0
@@ -0,0 +1,37 @@
+import pytest
+
+@pytest.fixture
+def eye(auto):
+    # A spare port, so the robot's own eyes are left alone
+    return lambda **settings: auto.Eye(auto.Ports.PORT2, 80, auto.MM, **settings)
+
+def seen(eye, *distances):
+    # What the eye believes after each sample
+    result = []
+    for distance in distances:
+        eye.distance = distance
+        eye.settle()
+        result.append(eye.isObjectVisible())
+    return result
+
+def test_between_the_two_distances_nothing_changes(eye):
+    e = eye(exitDistance=100)
+    assert seen(e, 90, 80, 95, 100, 101) == [False, True, True, True, False]
+    assert seen(e, 85, 99) == [False, False]  # Closer than exitDistance isn't close enough to be seen
+
+def test_exit_distance_defaults_to_a_quarter_further(eye):
+    assert eye().exitDistance == 100.0
+
+def test_a_change_needs_debounce_samples_in_a_row(eye):
+    e = eye(exitDistance=100, debounce=2)
+    assert seen(e, 70, 90, 70, 70) == [False, False, False, True]  # The 90 starts the count again
+    assert seen(e, 120, 90, 120, 120) == [True, True, True, False]
+
+def test_an_active_eye_polls_faster(eye):
+    e = eye(activeMs=10, idleMs=100)
+    e.stamp = 0.0
+    assert not e.isDue(50.0)
+    e.setActive(True)
+    assert e.isDue(10.0) and not e.isDue(7.0)  # Up to a fifth early counts, like Sensors
+    e.setActive(False)
+    assert e.periodMs == 100
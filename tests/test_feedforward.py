@@ -0,0 +1,27 @@
+import pytest
+
+from conftest import inSim
+
+def test_ks_follows_the_plan_not_the_feedback(auto):
+    kS = auto.DRIVE_FEEDFORWARD[auto.DRIVE_LEFT]
+    kV = auto.DRIVE_FEEDFORWARD[auto.DRIVE_LEFT + 1]
+    # Planned backwards, feedback pulling forwards harder: kS still pushes backwards
+    assert auto.feedforward(auto.DRIVE_LEFT, 0.05, 0.0, -0.02) == pytest.approx(kV * 0.05 - kS)
+    # Standing start: the planned acceleration says which way
+    assert auto.feedforward(auto.DRIVE_LEFT, 0.01, -0.5, 0.0) < auto.feedforward(auto.DRIVE_LEFT, 0.01, 0.0, 0.0)
+    # Nothing planned: feedback only, no kS either way
+    assert auto.feedforward(auto.DRIVE_LEFT, 0.001, 0.0, 0.0) == pytest.approx(kV * 0.001)
+    assert auto.feedforward(auto.DRIVE_LEFT, -0.001, 0.0, 0.0) == pytest.approx(-kV * 0.001)
+    # Without a plan the velocity given is the plan
+    assert auto.feedforward(auto.DRIVE_RIGHT, -0.5) == pytest.approx(-kV * 0.5 - kS)
+
+def test_backing_up_never_commands_forwards(robot, monkeypatch):
+    auto = robot
+    monkeypatch.setattr(auto, "TRACE_TELEMETRY", True)
+    inSim(lambda: auto.goStraight(10, -50))
+    log = auto.driveLog
+    assert log.count > 10
+    for n in range(log.size()):
+        row = log.row(n)
+        vLeft, vRight = row[log.fields.index("vLeft")], row[log.fields.index("vRight")]
+        assert vLeft <= 0.5 and vRight <= 0.5  # Only the yaw adjustment may cross zero
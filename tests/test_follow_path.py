@@ -0,0 +1,30 @@
+from conftest import inSim
+
+def followFrom(auto, path, x, y, heading=0.0):
+    # One tick of FollowPath with odometry saying we're at (x, y)
+    move = auto.FollowPath(path)
+    def tick():
+        move.init()
+        auto.odometry.pose = (x, y, heading)
+        move.execute()
+        return move.isFinished()
+    return move, inSim(tick)
+
+def test_finishes_once_the_last_point_is_near_and_in_sight(auto):
+    path = auto.Path(((500.0, 500.0), (500.0, 700.0)))
+    move, done = followFrom(auto, path, 500.0, 690.0)
+    assert done and move.lookahead == path.last
+    move, done = followFrom(auto, path, 500.0, 600.0)  # Heading for it, not there yet
+    assert not done and move.lookahead == path.last
+
+def test_passing_close_to_the_end_early_doesnt_finish(auto):
+    # A U-turn that ends 5mm from where it starts
+    path = auto.Path(((500.0, 500.0), (500.0, 1000.0), (505.0, 1000.0), (505.0, 500.0)))
+    move, done = followFrom(auto, path, 500.0, 500.0)
+    assert not done and move.lookahead < path.last
+
+def test_the_plan_stops_at_the_end(auto):
+    path = auto.Path(((500.0, 500.0), (500.0, 1500.0)), maxSpeed=60.0)
+    assert path.speed[path.last] == 0.0
+    assert max(path.speed) == 60.0
+    assert all(a >= b for a, b in zip(path.speed[path.count // 2:], path.speed[path.count // 2 + 1:]))
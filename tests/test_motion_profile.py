@@ -0,0 +1,27 @@
+import pytest
+
+@pytest.mark.parametrize("distance, velocity, acceleration, jerk", [
+    (2.0, 1.0, 2.0, 20.0),    # Reaches full speed
+    (0.1, 1.0, 2.0, 20.0),    # Too short to: triangular
+    (90.0, 120.0, 720.0, 0.0),  # No jerk limit
+    (-3.0, 1.0, 2.0, 20.0),   # Direction is the caller's business
+])
+def test_profile_ends_on_target_and_stopped(auto, distance, velocity, acceleration, jerk):
+    p = auto.MotionProfile(distance, velocity, acceleration, jerk)
+    assert p.position[-1] == pytest.approx(abs(distance), rel=1e-5)
+    assert p.velocity[0] == 0.0 and p.velocity[-1] == 0.0
+    assert max(p.velocity) <= abs(velocity) + 1e-6
+    assert max(abs(a) for a in p.acceleration) <= acceleration + 1e-6
+    assert all(b >= a - 1e-6 for a, b in zip(p.position, p.position[1:]))  # Never backs up
+
+def test_profile_is_done_at_its_duration(auto):
+    p = auto.MotionProfile(2.0, 1.0, 2.0, 20.0)
+    ms = p.duration * 1000.0
+    assert not p.isDone(ms - 1.0)
+    assert p.isDone(ms)
+    assert p.index(ms + 10000.0) == p.count - 1  # Holds the last point after the end
+
+def test_empty_profile_is_done_straight_away(auto):
+    p = auto.MotionProfile(0.0, 1.0, 2.0, 20.0)
+    assert p.duration == 0.0 and p.isDone(0.0)
+    assert p.position[p.index(0.0)] == 0.0
@@ -0,0 +1,41 @@
+import math
+
+import pytest
+
+@pytest.fixture
+def drive(auto, monkeypatch):
+    # Odometry on hand-fed wheel and inertial readings instead of the simulator's
+    monkeypatch.setattr(auto.sensors, "refreshDrive", lambda force=False: None)
+    def set(left, right, rotation):
+        auto.sensors.leftRevs, auto.sensors.rightRevs, auto.sensors.rotation = left, right, rotation
+    set(0.0, 0.0, 0.0)
+    return set
+
+def test_a_quarter_circle_ends_where_it_should(auto, drive):
+    odometry = auto.odometry
+    odometry.setPose(1000.0, 500.0, 0.0)
+    radius, half = 600.0, auto.DRIVE_TRACK_MM / 2.0
+    for degrees in range(1, 91):  # Clockwise about (1600, 500), 1 degree a tick
+        angle = math.radians(degrees)
+        drive((radius + half) * angle / auto.DRIVE_MM_PER_TURN,
+              (radius - half) * angle / auto.DRIVE_MM_PER_TURN, float(degrees))
+        odometry.update()
+    x, y, heading = odometry.pose
+    assert x == pytest.approx(1600.0, abs=0.5)
+    assert y == pytest.approx(1100.0, abs=0.5)
+    assert heading == 90.0
+
+def test_the_start_heading_is_kept_as_an_offset(auto, drive):
+    drive(0.0, 0.0, 30.0)  # The inertial reads 30 when we're facing the field's -90
+    auto.odometry.setPose(0.0, 0.0, -90.0)
+    drive(0.25, 0.25, 30.0)
+    auto.odometry.update()
+    x, y, heading = auto.odometry.pose
+    assert (x, y, heading) == (pytest.approx(-auto.DRIVE_MM_PER_TURN / 4.0), pytest.approx(0.0), -90.0)
+    assert auto.odometry.fieldToRotation(0.0) == pytest.approx(120.0)
+
+def test_an_encoder_reset_isnt_motion(auto, drive):
+    auto.odometry.setPose(500.0, 500.0, 0.0)
+    drive(-40.0, -40.0, 0.0)
+    auto.odometry.update()
+    assert auto.odometry.pose == (500.0, 500.0, 0.0)
@@ -0,0 +1,33 @@
+import pytest
+
+from conftest import inSim
+
+def run(auto, workMs, periodMs=10):
+    # One tick per entry of workMs, each doing that much work first.
+    # Returns the loop and the time each tick came back (ms from start).
+    loop = auto.PeriodicLoop("t", periodMs)
+    def body():
+        loop.start()
+        start = auto.brain.timer.time(auto.MSEC)
+        stamps = []
+        for ms in workMs:
+            auto.wait(ms, auto.MSEC)
+            loop.wait()
+            stamps.append(auto.brain.timer.time(auto.MSEC) - start)
+        return stamps
+    return loop, inSim(body)
+
+def test_the_period_doesnt_stretch_with_the_work(auto):
+    loop, stamps = run(auto, [3, 7, 1, 5])
+    assert stamps == pytest.approx([10, 20, 30, 40], abs=0.5)
+    assert loop.dt == pytest.approx(0.010, abs=0.0005)
+    assert loop.ticks == 4 and loop.overruns == 0
+
+def test_a_long_tick_skips_ahead_instead_of_catching_up(auto):
+    loop, stamps = run(auto, [3, 25, 3, 3])
+    # The 25ms tick ran past two deadlines: it returns at once, the deadline it
+    # missed outright is dropped and the next tick is back on the 10ms grid
+    assert loop.overruns == 1 and loop.skipped == 1
+    assert loop.worstLateMs == pytest.approx(15, abs=0.5)
+    assert stamps == pytest.approx([10, 35, 40, 50], abs=0.5)
+    assert loop.dt == pytest.approx(0.010, abs=0.0005)
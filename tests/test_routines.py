@@ -0,0 +1,105 @@
+import pytest
+
+@pytest.fixture
+def steps(auto, probe, monkeypatch):
+    # steps(2, 1, ...) -> probes taking that many ticks, and a "probe" action
+    # whose argument picks one of them, so tables can be built out of probes
+    made = []
+    monkeypatch.setitem(auto.ROUTINE_ACTIONS, "probe", (((0, 9),), lambda a, heading: made[a[0]].command))
+    def build(*ticks):
+        made[:] = [probe(t) for t in ticks]
+        return made
+    return build
+
+def started(probes):
+    return [n for n, p in enumerate(probes) if p.calls]
+
+def finished(probes):
+    return [n for n, p in enumerate(probes) if p.calls and p.calls[-1] == "end"]
+
+def test_routine_tables_load(auto):
+    for name in auto.ROUTINES:
+        routine = auto.loadRoutine(name)
+        assert len(routine.commands) > 0
+    # Included routines are flattened into the one that includes them
+    assert len(auto.loadRoutine("nearGoal").commands) > len(auto.NEAR_GOAL)
+
+def test_path_and_goto_steps_load(auto):
+    auto.loadRoutine("t", (
+        (auto.THEN, "goto", (1000, 654, -50), 0),
+        (auto.THEN, "path", (40, ((1000, 654), (700, 900), (500, 900))), 5000),
+        (auto.THEN, "straight", (10, 40, auto.KEEP_HEADING), 0),
+    ))
+
+@pytest.mark.parametrize("step, message", [
+    ([0, "wait", (100,), 0], "want"),                      # Not a tuple
+    ((0, "wait", (100,)), "want"),                         # Too short
+    ((7, "wait", (100,), 0), "unknown start"),
+    ((0, "fly", (), 0), "unknown action"),
+    ((0, "wait", (100,), -1), "deadline"),
+    ((0, "wait", 100, 0), "tuple of 1"),                   # args not a tuple
+    ((0, "wait", [100], 0), "tuple of 1"),
+    ((0, "straight", (10, 40), 0), "tuple of 3"),
+    ((0, "wait", ("soon",), 0), "isn't a number"),
+    ((0, "wait", (20000,), 0), "not in"),
+    ((0, "straight", (10, 40, 270), 0), "not in"),          # Past +-180 and not KEEP_HEADING
+    ((0, "straight", (10, 40, -181), 0), "not in"),
+    ((0, "goto", (3000, 654, 50), 0), "not in"),            # Off the field
+    ((0, "path", (40, ((100, 100),)), 0), "points"),       # One point isn't a path
+    ((0, "path", (40, ((100, 100), (100, 5000))), 0), "off the field"),
+    ((0, "path", (40, ((100, 100), (100,))), 0), r"isn't \(x, y\)"),
+    ((0, "routine", "nowhere", 0), "unknown routine"),
+    ((0, "routine", ["autoLoop"], 0), "unknown routine"),
+    ((1, "routine", "autoLoop", 0), "only start with THEN"),
+])
+def test_check_step_rejects(auto, step, message):
+    with pytest.raises(ValueError, match=message):
+        auto.loadRoutine("bad", (step,))
+
+def test_load_rejects_a_table_that_cant_run(auto, monkeypatch):
+    with pytest.raises(ValueError, match="needs a step above"):
+        auto.loadRoutine("bad", ((auto.WITH, "wait", (100,), 0),))
+    with pytest.raises(ValueError, match="both need"):
+        auto.loadRoutine("bad", ((auto.THEN, "straight", (10, 40, 0), 0),
+                                 (auto.WITH, "turn", (25, 90), 0)))
+    monkeypatch.setitem(auto.ROUTINES, "loop", ((auto.THEN, "routine", "loop", 0),))
+    with pytest.raises(ValueError, match="includes itself"):
+        auto.loadRoutine("loop")
+
+def test_then_waits_for_everything_above(auto, steps):
+    T, W = auto.THEN, auto.WITH
+    probes = steps(1, 3, 1)
+    routine = auto.loadRoutine("t", ((T, "probe", (0,), 0), (W, "probe", (1,), 0), (T, "probe", (2,), 0)))
+    routine.init()
+    assert started(probes) == [0, 1]  # WITH starts together with the row above
+    routine.execute()
+    assert finished(probes) == [0] and started(probes) == [0, 1]
+    routine.execute()
+    routine.execute()
+    # The last THEN starts in the same tick the step it waited for finished
+    assert finished(probes) == [0, 1, 2] and routine.isFinished()
+
+def test_next_starts_a_second_track(auto, steps):
+    T, W, N = auto.THEN, auto.WITH, auto.NEXT
+    probes = steps(4, 1, 1, 1)
+    routine = auto.loadRoutine("t", ((T, "probe", (0,), 0), (W, "probe", (1,), 0),
+                                     (N, "probe", (2,), 0), (T, "probe", (3,), 0)))
+    routine.init()
+    routine.execute()
+    # Row 2 follows row 1 while row 0 keeps going
+    assert finished(probes) == [1, 2] and probes[0].calls[-1] == "execute"
+    routine.execute()
+    routine.execute()
+    assert started(probes) == [0, 1, 2]  # Row 3 still waits for row 0
+    routine.execute()
+    assert finished(probes) == [0, 1, 2, 3] and routine.isFinished()
+
+def test_interrupting_a_routine_ends_what_is_running(auto, steps):
+    T, W = auto.THEN, auto.WITH
+    probes = steps(5, 5, 1)
+    routine = auto.loadRoutine("t", ((T, "probe", (0,), 0), (W, "probe", (1,), 0), (T, "probe", (2,), 0)))
+    routine.init()
+    routine.execute()
+    routine.end(True)
+    assert probes[0].calls[-1] == "interrupted" and probes[1].calls[-1] == "interrupted"
+    assert probes[2].calls == []
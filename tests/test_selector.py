@@ -0,0 +1,10 @@
+from conftest import inSim
+
+def test_arming_winds_the_catapult_only_for_modes_that_shoot(robot, monkeypatch):
+    winds = []
+    init = robot.WindCat.init
+    monkeypatch.setattr(robot.WindCat, "init", lambda self: (winds.append(1), init(self)))
+    inSim(lambda: robot.selector.arm(1))
+    assert winds == []
+    inSim(lambda: robot.selector.arm(2))
+    assert winds == [1]
@@ -0,0 +1,21 @@
+import vex
+
+from conftest import inSim
+
+def test_every_smart_port_read_is_counted(robot):
+    # Winding and firing read the catapult belt outside the per-tick snapshot
+    inSim(lambda: (robot.windCat(), robot.releaseCat()))
+    assert robot.sensors.reads == vex.sim.reads
+
+def test_measure_doesnt_read_the_clock_while_profiling_is_off(auto, monkeypatch):
+    reads = []
+    clock = auto.brain.timer.system_high_res
+    monkeypatch.setattr(auto.brain.timer, "system_high_res", lambda: reads.append(1) or clock())
+    with auto.profiler.measure("screen"):
+        pass
+    assert reads == []
+    auto.profiler.enable()
+    with auto.profiler.measure("screen"):
+        pass
+    auto.profiler.disable()
+    assert len(reads) == 2 and auto.profiler.histogram("screen").calls == 1
@@ -0,0 +1,60 @@
+import pytest
+
+class Screen:
+    # Stands in for brain.screen and keeps what was printed
+    def __init__(self):
+        self.printed = []
+        self.clears = 0
+    def print_at(self, text, x, y, opaque):
+        self.printed.append((text, x, y))
+    def clear_screen(self):
+        self.clears += 1
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+@pytest.fixture
+def screen(auto, monkeypatch):
+    fake = Screen()
+    monkeypatch.setattr(auto.brain, "screen", fake)
+    return fake
+
+def test_messages_scroll_up(auto):
+    status = auto.StatusScreen()
+    for message in ("one", "two", "three"):
+        status.show(message)
+    assert (status.values["line0"], status.values["line1"]) == ("two", "three")
+
+def test_only_changed_fields_are_drawn(auto, screen):
+    status = auto.StatusScreen()
+    status.draw()  # First frame is the background
+    assert screen.clears == 1 and screen.printed == []
+    status.draw()  # Heading and balls are the only fields with anything in them
+    assert sorted(text.strip() for text, x, y in screen.printed) == sorted(["H   0", auto.balls.stateName()])
+    screen.printed = []
+    status.draw()
+    assert screen.printed == [] and status.frames == 2  # Nothing changed: not even a frame
+    status.error("STALL!")
+    status.draw()
+    assert [text.strip() for text, x, y in screen.printed] == ["STALL!"]
+
+def test_a_frame_draws_a_few_fields_and_leaves_the_rest(auto, screen):
+    status = auto.StatusScreen()
+    status.draw()
+    status.set("mode", "NEAR_GOAL")
+    status.show("Calibrating...")
+    status.show("Ready")
+    status.error("SLIP!")
+    status.draw()
+    assert len(screen.printed) == auto.SCREEN_FIELDS_PER_FRAME and status.dirty
+    status.draw()
+    assert len(screen.printed) == 6 and not status.dirty
+
+def test_text_is_cut_to_the_field_and_padded_over_the_old(auto, screen):
+    status = auto.StatusScreen()
+    status.draw()
+    status.error("a message longer than the screen")
+    status.draw()
+    assert ("a message longer", 0, 98) in screen.printed
+    status.error("ok")
+    status.draw()
+    assert screen.printed[-1] == ("ok" + " " * 14, 0, 98)
@@ -0,0 +1,16 @@
+from conftest import inSim
+
+def test_nothing_is_kept_while_telemetry_is_off(robot):
+    inSim(lambda: robot.goStraight(10, 50))
+    for log in (robot.driveLog, robot.turnLog, robot.curveLog, robot.pathLog, robot.charLog, robot.balls.log):
+        assert log.samples is None and log.count == 0
+
+def test_the_buffer_wraps_once_full(auto, monkeypatch):
+    monkeypatch.setattr(auto, "DEBUG_TELEMETRY", True)
+    log = auto.Telemetry("t", ("value",), capacity=4)
+    log.begin()
+    for value in range(6):
+        log.record(value)
+    assert len(log.samples) == 8
+    assert log.size() == 4 and [log.row(n)[1] for n in range(4)] == [2.0, 3.0, 4.0, 5.0]
+    assert log.last(1) == 5.0